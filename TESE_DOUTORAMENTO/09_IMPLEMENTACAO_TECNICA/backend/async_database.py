@@ -0,0 +1,109 @@
+"""
+Async Database Access for FastAPI Routes
+
+Same query API as DatabaseConnection (query_to_dict, query_to_dataframe,
+execute_query, execute_returning) but awaitable, so `async def` routes can
+run their queries concurrently on the event loop.
+
+- AsyncDatabaseConnection: psycopg 3 AsyncConnectionPool. psycopg 3 keeps
+  the %s placeholders and the psycopg2 type conversions (Decimal, date,
+  json), so existing SQL runs unchanged.
+- ThreadedAsyncDatabase: fallback when psycopg 3 is not installed; runs
+  the calls of a (pooled) DatabaseConnection in worker threads.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    from psycopg.conninfo import make_conninfo
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+    PSYCOPG_ASYNC_AVAILABLE = True
+except ImportError:
+    PSYCOPG_ASYNC_AVAILABLE = False
+
+
+class AsyncDatabaseConnection:
+    """Async connection pool (psycopg 3) with the DatabaseConnection query API"""
+
+    def __init__(self, host: str, port: int, database: str, user: str, password: str,
+                 min_size: int = 1, max_size: int = 10, timeout: float = 30.0):
+        if not PSYCOPG_ASYNC_AVAILABLE:
+            raise RuntimeError("psycopg 3 not installed: pip install 'psycopg[binary,pool]'")
+        self.database = database
+        self.pool = AsyncConnectionPool(
+            make_conninfo(host=host, port=port, dbname=database, user=user, password=password),
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            open=False
+        )
+
+    @classmethod
+    def from_settings(cls, db, **kwargs) -> "AsyncDatabaseConnection":
+        """Pool with the same connection settings as a DatabaseConnection"""
+        return cls(db.host, db.port, db.database, db.user, db.password, **kwargs)
+
+    async def open(self):
+        await self.pool.open(wait=True)
+        logger.info(f"✅ Async pool ready for {self.database} ({self.pool.max_size} connections max)")
+
+    async def close(self):
+        await self.pool.close()
+        logger.info("🔒 Async pool closed")
+
+    async def query_to_dict(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        async with self.pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+    async def query_to_dataframe(self, query: str, params: Optional[tuple] = None) -> pd.DataFrame:
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+                columns = [column.name for column in cursor.description]
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    async def execute_query(self, query: str, params: Optional[tuple] = None) -> None:
+        # The pool commits when the connection block exits without error
+        async with self.pool.connection() as conn:
+            await conn.execute(query, params)
+
+    async def execute_returning(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        async with self.pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+
+class ThreadedAsyncDatabase:
+    """Awaitable wrapper running DatabaseConnection calls in worker threads"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def query_to_dict(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.db.query_to_dict, query, params)
+
+    async def query_to_dataframe(self, query: str, params: Optional[tuple] = None) -> pd.DataFrame:
+        return await asyncio.to_thread(self.db.query_to_dataframe, query, params)
+
+    async def execute_query(self, query: str, params: Optional[tuple] = None) -> None:
+        await asyncio.to_thread(self.db.execute_query, query, params)
+
+    async def execute_returning(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.db.execute_returning, query, params)
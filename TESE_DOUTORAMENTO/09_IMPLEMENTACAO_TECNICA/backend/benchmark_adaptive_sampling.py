@@ -0,0 +1,164 @@
+"""
+Benchmark: adaptive frame sampling vs dense detection
+
+Runs the detector on every frame of a clip (baseline) and again with an
+AdaptiveSampler, then reports inference cost and how much of the dense
+result the adaptive run still recovers:
+- ball recall: dense frames with a ball that have an adaptive frame with
+  a ball within --tolerance frames
+- player recall: dense player boxes matched (IoU >= --iou) to a player
+  box on the nearest adaptive frame within --tolerance frames
+
+Usage:
+    python benchmark_adaptive_sampling.py match.mp4 --max-seconds 120
+"""
+
+import argparse
+import bisect
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from computer_vision.detector import FootballDetector
+from computer_vision.adaptive_sampler import AdaptiveSampler
+from computer_vision.tracker import iou_matrix
+
+
+def run(detector, video_path, end_frame, confidence, sampler=None):
+    """(result, frames sent to the model, seconds)"""
+    images = [0]
+    detect_batch = detector.detect_batch
+
+    def counting_detect_batch(frames, confidence=0.5):
+        images[0] += len(frames)
+        return detect_batch(frames, confidence=confidence)
+
+    detector.detect_batch = counting_detect_batch
+    try:
+        start = time.perf_counter()
+        result = detector.process_video_pipelined(
+            video_path, confidence=confidence, end_frame=end_frame, sampler=sampler
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        del detector.detect_batch
+    return result, images[0], elapsed
+
+
+def boxes(frame, class_name):
+    return np.array([d['bbox'] for d in frame['detections'] if d['class_name'] == class_name]).reshape(-1, 4)
+
+
+def recall(dense, adaptive, tolerance, iou_threshold):
+    adaptive_frames = sorted(adaptive)
+
+    def nearest(frame_number):
+        i = bisect.bisect_left(adaptive_frames, frame_number)
+        candidates = adaptive_frames[max(0, i - 1):i + 1]
+        best = min(candidates, key=lambda f: abs(f - frame_number), default=None)
+        return best if best is not None and abs(best - frame_number) <= tolerance else None
+
+    ball_frames = ball_hits = 0
+    players = player_hits = 0
+    for frame_number, frame in dense.items():
+        match = nearest(frame_number)
+        if len(boxes(frame, 'ball')):
+            ball_frames += 1
+            i = bisect.bisect_left(adaptive_frames, frame_number - tolerance)
+            j = bisect.bisect_right(adaptive_frames, frame_number + tolerance)
+            ball_hits += any(len(boxes(adaptive[f], 'ball')) for f in adaptive_frames[i:j])
+
+        dense_players = boxes(frame, 'player')
+        players += len(dense_players)
+        if match is None or not len(dense_players):
+            continue
+        iou = iou_matrix(dense_players, boxes(adaptive[match], 'player'))
+        if iou.size:
+            rows, cols = linear_sum_assignment(-iou)
+            player_hits += int((iou[rows, cols] >= iou_threshold).sum())
+
+    return {
+        'ball_frames': ball_frames,
+        'ball_recall': ball_hits / ball_frames if ball_frames else None,
+        'player_boxes': players,
+        'player_recall': player_hits / players if players else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive sampling vs dense detection")
+    parser.add_argument("video", help="Video file")
+    parser.add_argument("--max-seconds", type=float, default=60.0,
+                        help="Only benchmark the first N seconds (default: 60)")
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=int, default=12,
+                        help="Frames between a dense frame and its adaptive match (default: 12)")
+    parser.add_argument("--iou", type=float, default=0.3, help="IoU for a player match (default: 0.3)")
+    parser.add_argument("--method", choices=("diff", "flow"), default="diff")
+    parser.add_argument("--min-interval", type=int, default=2)
+    parser.add_argument("--max-interval", type=int, default=25)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print(f"❌ Could not open video: {args.video}")
+        sys.exit(1)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    end_frame = int(args.max_seconds * fps) if args.max_seconds else None
+    detector = FootballDetector()
+
+    print("=" * 60)
+    print(f"Adaptive sampling benchmark: {Path(args.video).name}")
+    print("=" * 60)
+
+    print("\n🔍 Dense baseline (every frame)")
+    dense, dense_images, dense_time = run(detector, args.video, end_frame, args.confidence)
+    print(f"   {dense_images} frames detected in {dense_time:.1f}s")
+
+    print(f"\n🔍 Adaptive ({args.method}, {args.min_interval}-{args.max_interval} frames)")
+    sampler = AdaptiveSampler(min_interval=args.min_interval, max_interval=args.max_interval,
+                              method=args.method)
+    adaptive, adaptive_images, adaptive_time = run(detector, args.video, end_frame, args.confidence, sampler)
+    print(f"   {adaptive_images} frames detected in {adaptive_time:.1f}s")
+    print(f"   {adaptive['video_info']['sampling']}")
+
+    scores = recall(dense['frame_detections'], adaptive['frame_detections'], args.tolerance, args.iou)
+    report = {
+        'video': args.video,
+        'frames': len(dense['frame_detections']),
+        'dense': {'inference_frames': dense_images, 'seconds': round(dense_time, 2)},
+        'adaptive': {'inference_frames': adaptive_images, 'seconds': round(adaptive_time, 2),
+                     'sampling': adaptive['video_info']['sampling']},
+        'inference_reduction': 1 - adaptive_images / max(1, dense_images),
+        'speedup': dense_time / max(adaptive_time, 1e-9),
+        'tolerance_frames': args.tolerance,
+        **scores
+    }
+
+    print("\n📊 Results")
+    print(f"   Inference frames: {dense_images} -> {adaptive_images} ({report['inference_reduction']:.0%} fewer)")
+    print(f"   Wall time:        {dense_time:.1f}s -> {adaptive_time:.1f}s ({report['speedup']:.1f}x)")
+    if scores['ball_recall'] is not None:
+        print(f"   Ball recall:      {scores['ball_recall']:.1%} of {scores['ball_frames']} frames (±{args.tolerance})")
+    if scores['player_recall'] is not None:
+        print(f"   Player recall:    {scores['player_recall']:.1%} of {scores['player_boxes']} boxes (IoU≥{args.iou})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
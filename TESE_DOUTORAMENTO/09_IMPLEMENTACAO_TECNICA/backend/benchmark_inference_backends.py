@@ -0,0 +1,147 @@
+"""
+Benchmark: inference backends (torch vs ONNX vs ONNX INT8) on a sample clip
+
+Decodes frames from a clip once, runs every backend over the same frames
+and reports:
+- throughput (frames/s) and model load time
+- agreement with the reference backend (default torch): per-class box
+  matching at IoU >= --iou gives precision/recall, mean IoU of matched
+  boxes and mean absolute confidence difference
+
+Usage:
+    python benchmark_inference_backends.py match.mp4 --frames 200 --step 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from computer_vision.detector import FootballDetector
+from computer_vision.inference_backends import INFERENCE_BACKENDS
+from computer_vision.tracker import iou_matrix
+
+
+def read_frames(video_path, count, step):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    frames = []
+    frame_count = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_count % step == 0:
+            frames.append(frame)
+        frame_count += 1
+    cap.release()
+    return frames
+
+
+def run_backend(model_path, backend, frames, batch_size, confidence):
+    start = time.perf_counter()
+    detector = FootballDetector(model_path, backend=backend)
+    load_time = time.perf_counter() - start
+
+    detector.detect_batch(frames[:batch_size], confidence=confidence)  # warm-up
+    detections = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        detections.extend(detector.detect_batch(frames[i:i + batch_size], confidence=confidence))
+    elapsed = time.perf_counter() - start
+    return detections, {'load_s': round(load_time, 2), 'seconds': round(elapsed, 2),
+                        'fps': round(len(frames) / max(elapsed, 1e-9), 2)}
+
+
+def agreement(reference, candidate, iou_threshold):
+    """Match boxes of the same class frame by frame (Hungarian on IoU)"""
+    matched = ref_total = cand_total = 0
+    ious, confidence_diffs = [], []
+    for ref_frame, cand_frame in zip(reference, candidate):
+        ref_total += len(ref_frame)
+        cand_total += len(cand_frame)
+        for class_id in {d['class_id'] for d in ref_frame}:
+            ref = [d for d in ref_frame if d['class_id'] == class_id]
+            cand = [d for d in cand_frame if d['class_id'] == class_id]
+            if not cand:
+                continue
+            iou = iou_matrix(np.array([d['bbox'] for d in ref]), np.array([d['bbox'] for d in cand]))
+            rows, cols = linear_sum_assignment(-iou)
+            for r, c in zip(rows, cols):
+                if iou[r, c] >= iou_threshold:
+                    matched += 1
+                    ious.append(iou[r, c])
+                    confidence_diffs.append(abs(ref[r]['confidence'] - cand[c]['confidence']))
+    return {
+        'reference_boxes': ref_total,
+        'boxes': cand_total,
+        'recall': round(matched / ref_total, 4) if ref_total else None,
+        'precision': round(matched / cand_total, 4) if cand_total else None,
+        'mean_iou': round(float(np.mean(ious)), 4) if ious else None,
+        'confidence_mae': round(float(np.mean(confidence_diffs)), 4) if confidence_diffs else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare detector inference backends on a clip")
+    parser.add_argument("video", help="Sample clip")
+    parser.add_argument("--model", default=None, help="YOLOv8 weights (default: yolov8x.pt)")
+    parser.add_argument("--backends", nargs="+", choices=INFERENCE_BACKENDS, default=list(INFERENCE_BACKENDS),
+                        help="Backends to run; the first is the accuracy reference")
+    parser.add_argument("--frames", type=int, default=200, help="Frames to run (default: 200)")
+    parser.add_argument("--step", type=int, default=5, help="Use every Nth frame of the clip (default: 5)")
+    parser.add_argument("--batch", type=int, default=8, help="Frames per model call")
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for a matching box (default: 0.5)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames, args.step)
+    if not frames:
+        print(f"❌ No frames read from {args.video}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Inference backend comparison: {Path(args.video).name} ({len(frames)} frames)")
+    print("=" * 60)
+
+    report = {'video': args.video, 'frames': len(frames), 'batch': args.batch, 'backends': {}}
+    reference = None
+    for backend in args.backends:
+        print(f"\n🔍 {backend}")
+        detections, timing = run_backend(args.model, backend, frames, args.batch, args.confidence)
+        result = dict(timing)
+        if reference is None:
+            reference = detections
+            result['reference'] = True
+        else:
+            result.update(agreement(reference, detections, args.iou))
+        report['backends'][backend] = result
+        print(f"   load {timing['load_s']:.1f}s, {timing['fps']:.1f} frames/s")
+        if 'recall' in result:
+            print(f"   vs {args.backends[0]}: recall {result['recall']}, precision {result['precision']}, "
+                  f"mean IoU {result['mean_iou']}, confidence MAE {result['confidence_mae']}")
+
+    print("\n📊 Throughput")
+    base_fps = report['backends'][args.backends[0]]['fps']
+    for backend, result in report['backends'].items():
+        print(f"   {backend:10s} {result['fps']:8.1f} frames/s ({result['fps'] / max(base_fps, 1e-9):.2f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: cold-start vs warm detector latency
+
+- Import: cost of importing computer_vision.detector (should not load torch)
+- Cold start: fresh Python process importing the detector, loading the
+  weights and running one batch (what a request paid before the warm pool)
+- Warm: batches through an already loaded DetectorPool
+- Remote (--server): batches through a running inference_server.py
+
+Usage:
+    python benchmark_model_serving.py --iterations 20 --batch 8
+    python benchmark_model_serving.py --server 127.0.0.1:6010
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+COLD_START_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+import numpy as np
+start = time.perf_counter()
+from computer_vision.detector import FootballDetector
+imported = time.perf_counter()
+torch_loaded = 'torch' in sys.modules
+detector = FootballDetector({model!r})
+loaded = time.perf_counter()
+frames = [np.zeros(({height}, {width}, 3), np.uint8)] * {batch}
+detector.detect_batch(frames)
+done = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'torch_on_import': torch_loaded,
+                  'load_s': loaded - imported, 'first_batch_s': done - loaded,
+                  'total_s': done - start}}))
+"""
+
+
+def cold_start(args):
+    script = COLD_START_SCRIPT.format(backend=str(backend_path), model=args.model,
+                                      width=args.width, height=args.height, batch=args.batch)
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def latencies(detect_batch, frames, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        detect_batch(frames)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings)
+    return {'median_s': float(np.median(timings)), 'p95_s': float(np.percentile(timings, 95)),
+            'iterations': iterations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start vs warm detector latency")
+    parser.add_argument("--model", default=None, help="YOLOv8 weights (default: yolov8x.pt)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=8, help="Frames per model call")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--server", help="host:port of a running inference_server.py")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    frames = [np.zeros((args.height, args.width, 3), np.uint8)] * args.batch
+    report = {'batch': args.batch, 'resolution': [args.width, args.height]}
+
+    print("=" * 60)
+    print("Detector serving benchmark")
+    print("=" * 60)
+
+    print("\n🔍 Cold start (new process: import + load + first batch)")
+    report['cold'] = cold_start(args)
+    cold = report['cold']
+    print(f"   import {cold['import_s']:.2f}s (torch loaded on import: {cold['torch_on_import']}), "
+          f"load {cold['load_s']:.2f}s, first batch {cold['first_batch_s']:.2f}s, total {cold['total_s']:.2f}s")
+
+    from computer_vision.detector import FootballDetector
+    from computer_vision.model_server import DetectorPool, RemoteFootballDetector
+
+    print("\n🔍 Warm pool (in-process)")
+    pool = DetectorPool(size=1, factory=lambda: FootballDetector(args.model))
+    pool.warm()
+    with pool.acquire() as detector:
+        detector.detect_batch(frames)  # first call allocates buffers
+        report['warm'] = latencies(detector.detect_batch, frames, args.iterations)
+    warm = report['warm']
+    print(f"   median {warm['median_s'] * 1000:.1f}ms, p95 {warm['p95_s'] * 1000:.1f}ms per batch")
+
+    if args.server:
+        print(f"\n🔍 Inference server {args.server}")
+        start = time.perf_counter()
+        remote = RemoteFootballDetector(args.server)
+        connect = time.perf_counter() - start
+        remote.detect_batch(frames)
+        report['remote'] = {'connect_s': connect, **latencies(remote.detect_batch, frames, args.iterations)}
+        print(f"   connect {connect * 1000:.1f}ms, median {report['remote']['median_s'] * 1000:.1f}ms, "
+              f"p95 {report['remote']['p95_s'] * 1000:.1f}ms per batch")
+        remote.client.close()
+
+    print("\n📊 Results")
+    print(f"   First request, cold:  {cold['total_s']:.2f}s")
+    print(f"   First request, warm:  {warm['median_s']:.3f}s ({cold['total_s'] / max(warm['median_s'], 1e-9):.0f}x faster)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Content-adaptive Frame Sampling
+
+Decides which frames go through the detector from cheap measurements on
+downscaled frames instead of a fixed sample_rate:
+- Motion: mean absolute grey-level difference (or Farneback optical-flow
+  magnitude) between probed frames
+- Pitch visibility: share of pitch-green pixels (crowd shots, close-ups
+  and replay graphics show little grass)
+- Scene cuts: a large jump in difference forces a detection
+
+Fast play is detected every min_interval frames; stoppages and
+off-pitch shots only every max_interval frames.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveSampler:
+    """
+    Frame-by-frame detection scheduler
+
+    Call should_probe(frame_number) for every decoded frame; for probed
+    frames pass the image to observe(), which returns True when the frame
+    should be detected. Frames are expected in increasing order.
+    """
+
+    def __init__(self, min_interval: int = 2, max_interval: int = 25,
+                 low_motion: float = 1.5, high_motion: float = 6.0,
+                 scene_cut: float = 35.0, min_pitch_ratio: float = 0.2,
+                 method: str = "diff", size: tuple = (160, 90)):
+        """
+        Args:
+            min_interval: Frames between detections during fast play (also the probe step)
+            max_interval: Frames between detections during stoppages / off-pitch shots
+            low_motion: Motion score (per frame) at or below which sampling is sparsest
+            high_motion: Motion score at or above which sampling is densest
+            scene_cut: Grey-level difference that marks a cut (detect immediately)
+            min_pitch_ratio: Below this share of green pixels the shot is treated as off-pitch
+            method: "diff" (frame difference) or "flow" (Farneback optical flow, slower)
+            size: Downscaled (width, height) used for the measurements
+        """
+        if method not in ("diff", "flow"):
+            raise ValueError(f"Unknown sampling method: {method}")
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.low_motion = low_motion
+        self.high_motion = high_motion
+        self.scene_cut = scene_cut
+        self.min_pitch_ratio = min_pitch_ratio
+        self.method = method
+        self.size = size
+        self.reset()
+
+    def config(self) -> Dict:
+        """Constructor arguments (to rebuild the sampler in a worker process)"""
+        return {
+            'min_interval': self.min_interval, 'max_interval': self.max_interval,
+            'low_motion': self.low_motion, 'high_motion': self.high_motion,
+            'scene_cut': self.scene_cut, 'min_pitch_ratio': self.min_pitch_ratio,
+            'method': self.method, 'size': self.size
+        }
+
+    def reset(self):
+        self._previous = None
+        self._previous_frame = None
+        self._motion = None
+        self._last_detection = None
+        self.probes = 0
+        self.detections = 0
+        self.scene_cuts = 0
+        self.off_pitch_probes = 0
+
+    def should_probe(self, frame_number: int) -> bool:
+        return self._previous_frame is None or frame_number - self._previous_frame >= self.min_interval
+
+    def _measure(self, grey: np.ndarray, gap: int) -> tuple:
+        """(difference, motion per frame) between the previous probe and grey"""
+        difference = float(cv2.absdiff(grey, self._previous).mean())
+        if self.method == "flow":
+            flow = cv2.calcOpticalFlowFarneback(self._previous, grey, None, 0.5, 2, 9, 2, 5, 1.1, 0)
+            motion = float(np.sqrt((flow ** 2).sum(axis=2)).mean())
+        else:
+            motion = difference
+        return difference, motion / max(1, gap)
+
+    def _pitch_ratio(self, small: np.ndarray) -> float:
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        green = cv2.inRange(hsv, (35, 40, 40), (85, 255, 255))
+        return float(np.count_nonzero(green)) / green.size
+
+    def interval(self) -> int:
+        """Current frames between detections for the smoothed motion"""
+        if self._motion is None:
+            return self.min_interval
+        span = max(self.high_motion - self.low_motion, 1e-6)
+        activity = min(max((self._motion - self.low_motion) / span, 0.0), 1.0)
+        return int(round(self.max_interval - activity * (self.max_interval - self.min_interval)))
+
+    def observe(self, frame_number: int, frame: np.ndarray) -> bool:
+        """Measure a probed frame; True if it should be detected"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        grey = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        self.probes += 1
+
+        detect = False
+        if self._previous is None:
+            detect = True
+        else:
+            difference, motion = self._measure(grey, frame_number - self._previous_frame)
+            if difference >= self.scene_cut:
+                # Cut to another camera / replay: start again from this shot
+                self.scene_cuts += 1
+                self._motion = None
+                detect = True
+            else:
+                self._motion = motion if self._motion is None else 0.6 * self._motion + 0.4 * motion
+                if self._pitch_ratio(small) < self.min_pitch_ratio:
+                    self.off_pitch_probes += 1
+                    self._motion = min(self._motion, self.low_motion)
+            # The interval follows the current motion, so sampling speeds up
+            # as soon as play gets faster
+            detect = detect or frame_number - self._last_detection >= self.interval()
+
+        self._previous = grey
+        self._previous_frame = frame_number
+        if detect:
+            self.detections += 1
+            self._last_detection = frame_number
+        return detect
+
+    def stats(self) -> Dict:
+        return {
+            'method': self.method,
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'probed_frames': self.probes,
+            'detected_frames': self.detections,
+            'scene_cuts': self.scene_cuts,
+            'off_pitch_probes': self.off_pitch_probes
+        }
+
+
+def merge_sampling_stats(stats: list) -> Optional[Dict]:
+    """Sum per-segment sampler stats (process_video_parallel)"""
+    stats = [s for s in stats if s]
+    if not stats:
+        return None
+    merged = dict(stats[0])
+    for key in ('probed_frames', 'detected_frames', 'scene_cuts', 'off_pitch_probes'):
+        merged[key] = sum(s[key] for s in stats)
+    return merged
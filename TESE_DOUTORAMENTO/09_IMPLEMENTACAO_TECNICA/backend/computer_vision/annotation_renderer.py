@@ -0,0 +1,130 @@
+"""
+Annotated Video Rendering from Stored Detections
+
+Draws the detections stored in video_detections onto the source video:
+- Only the requested clip is decoded (seek to the start frame, stop at
+  the end frame), in a single pass
+- Detections are streamed per frame from a server-side cursor as NumPy
+  box arrays, so memory stays flat for full matches
+- The output is written to a temporary file and renamed when complete
+"""
+
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .detection_store import CLASS_IDS, CLASS_NAMES, iter_frame_boxes
+
+logger = logging.getLogger(__name__)
+
+# BGR colour per class id
+CLASS_COLORS = {
+    CLASS_IDS['ball']: (0, 255, 0),          # Green
+    CLASS_IDS['player']: (255, 0, 0),        # Blue
+    CLASS_IDS['goalkeeper']: (0, 0, 255),    # Red
+    CLASS_IDS['referee']: (255, 255, 0)      # Cyan
+}
+DEFAULT_COLOR = (128, 128, 128)
+
+
+def clip_frame_range(fps: float, start_time: Optional[float] = None,
+                     end_time: Optional[float] = None) -> Tuple[int, Optional[int]]:
+    """
+    [start_frame, end_frame) for a clip in seconds; end_frame is None
+    (read to the end of the video) when end_time is not given
+    """
+    start_frame = 0 if start_time is None else max(0, int(round(start_time * fps)))
+    if end_time is None:
+        return start_frame, None
+    return start_frame, max(start_frame, int(round(end_time * fps)))
+
+
+def draw_frame_boxes(frame: np.ndarray, boxes: np.ndarray, class_ids: np.ndarray,
+                     confidences: np.ndarray) -> np.ndarray:
+    """Draw boxes and class/confidence labels in place"""
+    for (x1, y1, x2, y2), class_id, confidence in zip(boxes.tolist(), class_ids.tolist(), confidences.tolist()):
+        color = CLASS_COLORS.get(class_id, DEFAULT_COLOR)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+
+        label = f"{CLASS_NAMES.get(class_id, 'unknown')}: {confidence:.2f}"
+        label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+        cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), (x1 + label_size[0], y1), color, -1)
+        cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    return frame
+
+
+def render_annotated_video(db, analysis_id: str, video_path: str, output_path: str,
+                           start_time: Optional[float] = None,
+                           end_time: Optional[float] = None) -> Dict:
+    """
+    Render the stored detections of an analysis onto video_path
+
+    start_time/end_time (seconds) restrict the output to a clip; frame
+    numbers and timestamps in the overlay stay relative to the full video.
+
+    Returns {'frames_written', 'start_frame', 'end_frame', 'annotated_frames'}.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    start_frame, end_frame = clip_frame_range(fps, start_time, end_time)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    partial_path = f"{os.path.splitext(output_path)[0]}.partial.mp4"
+    out = cv2.VideoWriter(partial_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+
+    frames = iter_frame_boxes(db, analysis_id, start_frame, end_frame)
+    frames_written = annotated_frames = 0
+    try:
+        pending = next(frames, None)
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        frame_count = start_frame
+        while end_frame is None or frame_count < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Video frames and stored frames are both in frame order
+            while pending is not None and pending[0] < frame_count:
+                pending = next(frames, None)
+            detections = 0
+            if pending is not None and pending[0] == frame_count:
+                _, boxes, class_ids, confidences = pending
+                draw_frame_boxes(frame, boxes, class_ids, confidences)
+                detections = len(boxes)
+                annotated_frames += 1
+                pending = next(frames, None)
+
+            info_text = f"Frame: {frame_count} | Time: {frame_count / fps:.1f}s | Detections: {detections}"
+            cv2.putText(frame, info_text, (10, height - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            out.write(frame)
+            frames_written += 1
+            frame_count += 1
+    except Exception:
+        out.release()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    finally:
+        frames.close()
+        cap.release()
+
+    out.release()
+    os.replace(partial_path, output_path)
+    logger.info(f"🎬 Annotated video {output_path}: frames {start_frame}-{start_frame + frames_written} "
+                f"({annotated_frames} with detections)")
+    return {
+        'frames_written': frames_written,
+        'start_frame': start_frame,
+        'end_frame': start_frame + frames_written,
+        'annotated_frames': annotated_frames
+    }
@@ -0,0 +1,314 @@
+"""
+Camera Model: Pixel <-> Pitch Projection
+
+One field model and one projection for the CV, tactical and spatial
+modules:
+- PITCH_LENGTH / PITCH_WIDTH and the pitch coordinates (metres) of the
+  keypoint types detected by AdvancedFootballDetector
+- CameraModel: homography between image pixels and pitch metres, either
+  estimated from >= 4 pitch keypoints (RANSAC) or the linear
+  "frame = whole pitch" mapping used when no keypoints are available
+- CameraCalibrator: per-analysis calibration inside the detection
+  pipeline, re-estimated at scene cuts (camera switches, replays)
+- CameraModels: the calibrations of an analysis (video_info['camera'])
+  looked up by frame number; projects whole detection arrays at once
+
+Pitch coordinates: x along the length (0-105 m), y along the width
+(0-68 m). Players and referees are projected from the bottom centre of
+their box (feet on the grass).
+"""
+
+import bisect
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+
+# Pitch coordinates (metres) of the keypoint types of AdvancedFootballDetector
+PITCH_KEYPOINT_POSITIONS = {
+    'top_left_corner': (0.0, 0.0),
+    'top_right_corner': (PITCH_LENGTH, 0.0),
+    'bottom_left_corner': (0.0, PITCH_WIDTH),
+    'bottom_right_corner': (PITCH_LENGTH, PITCH_WIDTH),
+    'center_circle': (PITCH_LENGTH / 2, PITCH_WIDTH / 2),
+    'halfway_top': (PITCH_LENGTH / 2, 0.0),
+    'halfway_bottom': (PITCH_LENGTH / 2, PITCH_WIDTH),
+    'left_goal': (0.0, PITCH_WIDTH / 2),
+    'right_goal': (PITCH_LENGTH, PITCH_WIDTH / 2),
+    'left_penalty_area': (16.5, PITCH_WIDTH / 2),
+    'right_penalty_area': (PITCH_LENGTH - 16.5, PITCH_WIDTH / 2),
+    'left_penalty_spot': (11.0, PITCH_WIDTH / 2),
+    'right_penalty_spot': (PITCH_LENGTH - 11.0, PITCH_WIDTH / 2),
+}
+
+PERSON_CLASSES = ("player", "goalkeeper", "referee")
+
+
+def _apply_homography(homography: np.ndarray, points: np.ndarray) -> np.ndarray:
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    projected = points @ homography[:, :2].T + homography[:, 2]
+    return projected[:, :2] / projected[:, 2:]
+
+
+def foot_points(boxes: np.ndarray) -> np.ndarray:
+    """Bottom centre of (N, 4) xyxy boxes"""
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    return np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, boxes[:, 3]], axis=1)
+
+
+class CameraModel:
+    """Homography between image pixels and pitch metres for one camera shot"""
+
+    def __init__(self, homography: np.ndarray, frame_size: Tuple[int, int],
+                 source: str = "linear", start_frame: int = 0,
+                 reprojection_error: Optional[float] = None):
+        """
+        Args:
+            homography: 3x3 image -> pitch matrix
+            frame_size: (width, height) in pixels
+            source: "keypoints" or "linear"
+            start_frame: First frame of the shot this model belongs to
+            reprojection_error: Mean keypoint error in pixels (keypoint models)
+        """
+        self.homography = np.asarray(homography, dtype=float)
+        self.inverse = np.linalg.inv(self.homography)
+        self.frame_size = tuple(int(v) for v in frame_size)
+        self.source = source
+        self.start_frame = start_frame
+        self.reprojection_error = reprojection_error
+
+    @classmethod
+    def linear(cls, frame_size: Tuple[int, int], field_length: float = PITCH_LENGTH,
+               field_width: float = PITCH_WIDTH, start_frame: int = 0) -> "CameraModel":
+        """The frame spans the whole pitch (no calibration)"""
+        width, height = frame_size
+        homography = np.diag([field_length / max(width, 1), field_width / max(height, 1), 1.0])
+        return cls(homography, frame_size, "linear", start_frame)
+
+    @classmethod
+    def from_keypoints(cls, keypoints: List, frame_size: Tuple[int, int], start_frame: int = 0,
+                       min_keypoints: int = 4, ransac_threshold: float = 5.0) -> Optional["CameraModel"]:
+        """
+        Estimate the homography from PitchKeypoint-like objects
+        (keypoint_type, position); None if there are too few known
+        keypoints or they are degenerate (e.g. all on one line).
+        """
+        known = [kp for kp in keypoints if kp.keypoint_type in PITCH_KEYPOINT_POSITIONS]
+        if len(known) < min_keypoints:
+            return None
+        image = np.float32([kp.position for kp in known])
+        pitch = np.float32([PITCH_KEYPOINT_POSITIONS[kp.keypoint_type] for kp in known])
+        homography, _ = cv2.findHomography(image, pitch, cv2.RANSAC, ransac_threshold)
+        if homography is None or abs(np.linalg.det(homography)) < 1e-12:
+            return None
+        model = cls(homography, frame_size, "keypoints", start_frame)
+        error = np.linalg.norm(model.pitch_to_image(pitch) - image, axis=1)
+        model.reprojection_error = float(error.mean())
+        return model
+
+    def image_to_pitch(self, points: np.ndarray) -> np.ndarray:
+        """(N, 2) pixel coordinates -> (N, 2) pitch metres"""
+        return _apply_homography(self.homography, points)
+
+    def pitch_to_image(self, points: np.ndarray) -> np.ndarray:
+        """(N, 2) pitch metres -> (N, 2) pixel coordinates"""
+        return _apply_homography(self.inverse, points)
+
+    def project_boxes(self, boxes: np.ndarray) -> np.ndarray:
+        """(N, 4) xyxy boxes -> (N, 2) pitch metres of their foot points"""
+        return self.image_to_pitch(foot_points(boxes))
+
+    def to_dict(self) -> Dict:
+        return {
+            'start_frame': self.start_frame,
+            'source': self.source,
+            'frame_size': list(self.frame_size),
+            'homography': self.homography.tolist(),
+            'reprojection_error': None if self.reprojection_error is None else round(self.reprojection_error, 3)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CameraModel":
+        return cls(np.array(data['homography']), tuple(data['frame_size']), data.get('source', 'linear'),
+                   data.get('start_frame', 0), data.get('reprojection_error'))
+
+
+class CameraCalibrator:
+    """
+    Per-analysis camera calibration, cached per shot
+
+    observe() is called with the frames going to the detector (in frame
+    order). The homography is estimated on the first frame and again after
+    each scene cut (grey-level difference of a thumbnail, as in
+    AdaptiveSampler); a shot without usable keypoints gets the linear model
+    and keypoints are retried every retry_every frames.
+    """
+
+    def __init__(self, keypoint_detector: Optional[Callable] = None, scene_cut: float = 35.0,
+                 retry_every: int = 250, size: Tuple[int, int] = (160, 90)):
+        """
+        Args:
+            keypoint_detector: frame -> list of PitchKeypoint; None = linear model only
+            scene_cut: Mean grey-level difference between observed frames that marks a cut
+            retry_every: Frames between keypoint retries while the shot has no calibration
+            size: Thumbnail size for the scene-cut test
+        """
+        self.keypoint_detector = keypoint_detector
+        self.scene_cut = scene_cut
+        self.retry_every = max(1, retry_every)
+        self.size = size
+        self.reset()
+
+    def config(self) -> Dict:
+        """Constructor arguments (to rebuild the calibrator in a worker process; no keypoint detector)"""
+        return {'scene_cut': self.scene_cut, 'retry_every': self.retry_every, 'size': self.size}
+
+    def reset(self):
+        self.models: List[CameraModel] = []
+        self._previous = None
+        self._last_attempt = None
+
+    def _calibrate(self, frame_number: int, frame: np.ndarray) -> CameraModel:
+        height, width = frame.shape[:2]
+        self._last_attempt = frame_number
+        model = None
+        if self.keypoint_detector is not None:
+            model = CameraModel.from_keypoints(self.keypoint_detector(frame), (width, height), frame_number)
+        return model or CameraModel.linear((width, height), start_frame=frame_number)
+
+    def observe(self, frame_number: int, frame: np.ndarray) -> CameraModel:
+        """Camera model for a frame (recalibrating at scene cuts)"""
+        grey = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        cut = self._previous is None or \
+            float(np.mean(cv2.absdiff(grey, self._previous))) >= self.scene_cut
+        self._previous = grey
+
+        current = self.models[-1] if self.models else None
+        if cut:
+            self.models.append(self._calibrate(frame_number, frame))
+        elif current.source == "linear" and self.keypoint_detector is not None \
+                and frame_number - self._last_attempt >= self.retry_every:
+            model = self._calibrate(frame_number, frame)
+            if model.source == "keypoints":
+                self.models.append(model)
+        return self.models[-1]
+
+    def to_list(self) -> List[Dict]:
+        """Models of the analysis for video_info['camera']"""
+        return [model.to_dict() for model in self.models]
+
+
+class CameraModels:
+    """The camera models of an analysis, looked up by frame number"""
+
+    def __init__(self, models: List[CameraModel]):
+        if not models:
+            raise ValueError("At least one camera model is required")
+        self.models = sorted(models, key=lambda model: model.start_frame)
+        self.starts = [model.start_frame for model in self.models]
+
+    @classmethod
+    def from_video_info(cls, video_info: Dict) -> "CameraModels":
+        """From video_info['camera'], or the linear model for the video resolution"""
+        stored = video_info.get('camera') or []
+        if stored:
+            return cls([CameraModel.from_dict(data) for data in stored])
+        width, height = video_info.get('resolution') or (1280, 720)
+        return cls([CameraModel.linear((width, height))])
+
+    def for_frame(self, frame_number: int) -> CameraModel:
+        return self.models[max(0, bisect.bisect_right(self.starts, frame_number) - 1)]
+
+    def project(self, frame_numbers: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """(N,) frame numbers + (N, 2) pixel points -> (N, 2) pitch metres, one matrix product per shot"""
+        frame_numbers = np.asarray(frame_numbers)
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        shots = np.maximum(np.searchsorted(self.starts, frame_numbers, side='right') - 1, 0)
+        projected = np.empty_like(points)
+        for shot in np.unique(shots):
+            rows = shots == shot
+            projected[rows] = self.models[shot].image_to_pitch(points[rows])
+        return projected
+
+    def project_boxes(self, frame_numbers: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """(N,) frame numbers + (N, 4) xyxy boxes -> (N, 2) pitch metres of their foot points"""
+        return self.project(frame_numbers, foot_points(boxes))
+
+    def to_list(self) -> List[Dict]:
+        return [model.to_dict() for model in self.models]
+
+
+def merge_camera_models(segments: Iterable[Optional[List[Dict]]]) -> List[Dict]:
+    """Concatenate the per-segment video_info['camera'] lists (process_video_parallel)"""
+    merged = [model for models in segments if models for model in models]
+    return sorted(merged, key=lambda model: model['start_frame'])
+
+
+def pitch_tracks(frame_detections: Dict, cameras: CameraModels,
+                 classes: Tuple[str, ...] = PERSON_CLASSES) -> Dict[str, np.ndarray]:
+    """
+    Tracked detections as pitch-coordinate arrays for TacticalAnalyzer.analyze_batch
+
+    Detections are gathered into flat arrays once and projected in one
+    matrix product per shot. Returns:
+        frame_numbers: (F,) frames with detections, ascending
+        track_ids: (P,) track ids of the people (columns of positions)
+        class_names: (P,) most frequent class of each track
+        positions: (F, P, 2) pitch metres, NaN where a track is absent
+        ball_positions: (F, 2) highest-confidence ball per frame (NaN if none)
+    """
+    rows = [
+        (frame_number, det.get('track_id', -1), det['class_name'], det['confidence'], det['bbox'])
+        for frame_number, frame in frame_detections.items()
+        for det in frame['detections']
+    ]
+    frame_numbers = np.array(sorted(frame_detections), dtype=np.int64)
+    if not rows:
+        return {
+            'frame_numbers': frame_numbers, 'track_ids': np.empty(0, dtype=np.int64),
+            'class_names': np.empty(0, dtype=object),
+            'positions': np.full((len(frame_numbers), 0, 2), np.nan),
+            'ball_positions': np.full((len(frame_numbers), 2), np.nan)
+        }
+
+    frames = np.array([row[0] for row in rows], dtype=np.int64)
+    track_ids = np.array([row[1] if row[1] is not None else -1 for row in rows], dtype=np.int64)
+    class_names = np.array([row[2] for row in rows], dtype=object)
+    confidences = np.array([row[3] for row in rows], dtype=float)
+    boxes = np.array([row[4] for row in rows], dtype=float)
+
+    # The ball is projected from its centre, people from their feet
+    is_ball = class_names == 'ball'
+    points = foot_points(boxes)
+    points[is_ball, 1] = (boxes[is_ball, 1] + boxes[is_ball, 3]) / 2
+    pitch = cameras.project(frames, points)
+    frame_index = np.searchsorted(frame_numbers, frames)
+
+    people = np.isin(class_names, classes) & (track_ids >= 0)
+    tracks, columns = np.unique(track_ids[people], return_inverse=True)
+    positions = np.full((len(frame_numbers), len(tracks), 2), np.nan)
+    positions[frame_index[people], columns] = pitch[people]
+
+    track_classes = np.empty(len(tracks), dtype=object)
+    for column in range(len(tracks)):
+        names, counts = np.unique(class_names[people][columns == column].astype(str), return_counts=True)
+        track_classes[column] = names[counts.argmax()]
+
+    ball_positions = np.full((len(frame_numbers), 2), np.nan)
+    balls = np.flatnonzero(is_ball)
+    if len(balls):
+        balls = balls[np.argsort(-confidences[balls], kind='stable')]
+        _, first = np.unique(frame_index[balls], return_index=True)
+        best = balls[first]
+        ball_positions[frame_index[best]] = pitch[best]
+
+    return {
+        'frame_numbers': frame_numbers, 'track_ids': tracks, 'class_names': track_classes,
+        'positions': positions, 'ball_positions': ball_positions
+    }
@@ -0,0 +1,289 @@
+"""
+Content-Addressed Detection Cache
+
+Raw detector outputs do not depend on the confidence threshold or on the
+analysis type, so re-analysing a video only needs to filter them again.
+Entries are keyed by:
+- SHA-256 of the video file
+- SHA-256 of the model weights, inference backend and model input size
+- the pitch ROI configuration (crops change the model input)
+
+Each entry stores every detection above a low confidence floor as flat
+.npy arrays (frame numbers + offsets, boxes, scores, classes), opened
+memory-mapped. Writes go to a new generation directory and switch
+current.json, so readers never see a half-written entry. Entries are
+evicted least-recently-used when the cache exceeds its disk budget.
+
+Configuration (environment):
+    CV_DETECTION_CACHE          1 (default) to use the cache, 0 to disable
+    CV_DETECTION_CACHE_DIR      cache directory (default cache/detections)
+    CV_DETECTION_CACHE_MB       disk budget in MB (default 2048)
+    CV_DETECTION_CACHE_CONFIDENCE  confidence floor of cached detections (default 0.1)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .inference_backends import ONNX_IMGSZ
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("CV_DETECTION_CACHE", "1") != "0"
+CACHE_DIR = os.getenv("CV_DETECTION_CACHE_DIR", "cache/detections")
+CACHE_BUDGET_MB = int(os.getenv("CV_DETECTION_CACHE_MB", 2048))
+CACHE_CONFIDENCE = float(os.getenv("CV_DETECTION_CACHE_CONFIDENCE", 0.1))
+
+TORCH_IMGSZ = 640  # ultralytics predict default
+HASH_CHUNK = 8 * 1024 * 1024
+ARRAYS = ("frames", "offsets", "boxes", "scores", "classes")
+
+
+def _write_json(path: Path, data: Dict):
+    temp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(temp, "w") as f:
+        json.dump(data, f)
+    os.replace(temp, path)
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class DetectionCacheEntry:
+    """Cached detections of one (video, model, ROI) combination"""
+
+    def __init__(self, directory: str, confidence: float = CACHE_CONFIDENCE):
+        self.directory = Path(directory)
+        self.confidence = confidence
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._load()
+
+    def _load(self):
+        self.generation = None
+        self.frames = np.empty(0, dtype=np.int64)
+        current = self.directory / "current.json"
+        if not current.exists():
+            return
+        try:
+            with open(current) as f:
+                self.generation = json.load(f)["generation"]
+            generation_dir = self.directory / self.generation
+            arrays = {name: np.load(generation_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable detection cache entry {self.directory}: {e}")
+            self.generation = None
+            return
+        self.frames = arrays["frames"]
+        self.offsets = arrays["offsets"]
+        self.boxes = arrays["boxes"]
+        self.scores = arrays["scores"]
+        self.classes = arrays["classes"]
+        (self.directory / "last_used").touch()
+
+    def _index(self, frame_number: int) -> Optional[int]:
+        index = int(np.searchsorted(self.frames, frame_number))
+        if index < len(self.frames) and self.frames[index] == frame_number:
+            return index
+        return None
+
+    def contains(self, frame_number: int) -> bool:
+        return self._index(frame_number) is not None
+
+    def lookup(self, frame_number: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(boxes, scores, class_ids) of a cached frame, None if not cached"""
+        index = self._index(frame_number)
+        if index is None:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.boxes[start:end], self.scores[start:end], self.classes[start:end]
+
+    def detections(self, frame_number: int, confidence: float, detector) -> List[Dict]:
+        """Detection dicts of a cached frame at a confidence threshold (detector builds the dicts)"""
+        boxes, scores, class_ids = self.lookup(frame_number)
+        keep = scores >= confidence
+        self.hits += 1
+        return detector._build_detections(np.asarray(boxes[keep]), np.asarray(scores[keep]),
+                                          np.asarray(class_ids[keep]))
+
+    def add(self, frame_number: int, detections: List[Dict]):
+        """Record the detections computed at the cache's confidence floor for a frame"""
+        self.misses += 1
+        self._pending[frame_number] = (
+            np.array([d['bbox'] for d in detections], dtype=np.float32).reshape(-1, 4),
+            np.array([d['confidence'] for d in detections], dtype=np.float32),
+            np.array([d['class_id'] for d in detections], dtype=np.int16)
+        )
+
+    def additions(self) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Frames added since the entry was opened (to hand back from worker processes)"""
+        return dict(self._pending)
+
+    def extend(self, additions: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+        self._pending.update(additions)
+
+    def save(self) -> bool:
+        """Write cached + new frames as a new generation; False if there was nothing new"""
+        pending = {frame: arrays for frame, arrays in self._pending.items() if not self.contains(frame)}
+        if not pending:
+            return False
+
+        new_frames = sorted(pending)
+        parts = [pending[frame] for frame in new_frames]
+        frames = np.concatenate([self.frames, np.array(new_frames, dtype=np.int64)])
+        counts = np.concatenate([np.diff(self.offsets) if self.generation else np.empty(0, dtype=np.int64),
+                                 [len(p[1]) for p in parts]]).astype(np.int64)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        boxes = np.concatenate([np.asarray(self.boxes) if self.generation else np.empty((0, 4), np.float32)]
+                               + [p[0] for p in parts]).reshape(-1, 4)
+        scores = np.concatenate([np.asarray(self.scores) if self.generation else np.empty(0, np.float32)]
+                                + [p[1] for p in parts])
+        classes = np.concatenate([np.asarray(self.classes) if self.generation else np.empty(0, np.int16)]
+                                 + [p[2] for p in parts])
+
+        # Reorder the ragged per-frame rows by frame number
+        order = np.argsort(frames, kind="stable")
+        counts = counts[order]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        rows = np.repeat(starts[order] - offsets[:-1], counts) + np.arange(offsets[-1])
+        arrays = {
+            "frames": frames[order],
+            "offsets": offsets,
+            "boxes": boxes[rows].astype(np.float32),
+            "scores": scores[rows].astype(np.float32),
+            "classes": classes[rows].astype(np.int16),
+        }
+
+        generation = f"g{time.time_ns()}"
+        generation_dir = self.directory / generation
+        generation_dir.mkdir(parents=True)
+        for name, array in arrays.items():
+            np.save(generation_dir / f"{name}.npy", array)
+        _write_json(self.directory / "current.json", {"generation": generation, "confidence": self.confidence})
+        (self.directory / "last_used").touch()
+
+        previous = self.generation
+        self._pending.clear()
+        self._load()
+        if previous:
+            # Fails on platforms that keep mapped files locked; removed on a later save
+            shutil.rmtree(self.directory / previous, ignore_errors=True)
+        for stale in self.directory.glob("g*"):
+            if stale.is_dir() and stale.name != self.generation:
+                shutil.rmtree(stale, ignore_errors=True)
+        logger.info(f"💾 Detection cache {self.directory.name[:12]}: {len(self.frames)} frames ({len(pending)} new)")
+        return True
+
+    def stats(self) -> Dict:
+        return {'entry': self.directory.name, 'hits': self.hits, 'misses': self.misses,
+                'confidence_floor': self.confidence}
+
+
+class DetectionCache:
+    """Cache directory: entry lookup by content hash and LRU eviction"""
+
+    def __init__(self, root: str = CACHE_DIR, budget_mb: int = CACHE_BUDGET_MB,
+                 confidence: float = CACHE_CONFIDENCE):
+        self.root = Path(root)
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.confidence = confidence
+        self._lock = threading.Lock()
+
+    def file_sha256(self, path: str) -> str:
+        """SHA-256 of a file, memoised by (path, size, mtime) in file_hashes.json"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        memo_path = self.root / "file_hashes.json"
+        with self._lock:
+            memo = {}
+            if memo_path.exists():
+                try:
+                    with open(memo_path) as f:
+                        memo = json.load(f)
+                except (OSError, ValueError):
+                    memo = {}
+            if path in memo and memo[path]["signature"] == signature:
+                return memo[path]["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            memo[path] = {"signature": signature, "sha256": sha256}
+            _write_json(memo_path, memo)
+        return sha256
+
+    def model_signature(self, detector) -> Dict:
+        """Weights hash, backend and input size of a FootballDetector"""
+        model_path = detector.model_path
+        weights = self.file_sha256(model_path) if os.path.isfile(model_path) else f"name:{Path(model_path).name}"
+        imgsz = getattr(getattr(detector, "model", None), "imgsz", None)
+        if not isinstance(imgsz, int):
+            imgsz = TORCH_IMGSZ if detector.backend == "torch" else ONNX_IMGSZ
+        return {"weights": weights, "backend": detector.backend, "imgsz": imgsz}
+
+    def entry(self, video_path: str, detector, variant: Optional[Dict] = None) -> DetectionCacheEntry:
+        """Entry for a video analysed by a detector (variant: e.g. the pitch ROI config)"""
+        key_info = {
+            "video": self.file_sha256(video_path),
+            **self.model_signature(detector),
+            "variant": variant,
+            "confidence": self.confidence,
+        }
+        key = hashlib.sha256(json.dumps(key_info, sort_keys=True).encode()).hexdigest()
+        directory = self.root / key
+        directory.mkdir(parents=True, exist_ok=True)
+        if not (directory / "key.json").exists():
+            _write_json(directory / "key.json", key_info)
+        return DetectionCacheEntry(str(directory), self.confidence)
+
+    def evict(self, keep: Optional[DetectionCacheEntry] = None) -> int:
+        """Delete least recently used entries until the cache fits its budget; returns bytes freed"""
+        entries = []
+        for directory in self.root.iterdir() if self.root.exists() else []:
+            if not directory.is_dir():
+                continue
+            marker = directory / "last_used"
+            last_used = marker.stat().st_mtime if marker.exists() else directory.stat().st_mtime
+            entries.append((last_used, directory, _directory_size(directory)))
+
+        total = sum(size for _, _, size in entries)
+        freed = 0
+        for _, directory, size in sorted(entries, key=lambda e: e[0]):
+            if total - freed <= self.budget_bytes:
+                break
+            if keep is not None and directory == keep.directory:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            freed += size
+            logger.info(f"🗑️ Evicted detection cache entry {directory.name[:12]} ({size / 1e6:.1f} MB)")
+        return freed
+
+
+_detection_cache: Optional[DetectionCache] = None
+
+
+def get_detection_cache() -> Optional[DetectionCache]:
+    """Process-wide cache (None when CV_DETECTION_CACHE=0)"""
+    global _detection_cache
+    if not CACHE_ENABLED:
+        return None
+    if _detection_cache is None:
+        _detection_cache = DetectionCache()
+    return _detection_cache
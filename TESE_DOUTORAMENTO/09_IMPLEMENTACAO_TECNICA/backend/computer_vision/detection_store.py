@@ -0,0 +1,166 @@
+"""
+Detection Storage for Video Analyses
+
+Frame detections are stored one row per detection in video_detections
+(indexed by analysis_id, frame_number) instead of inside the
+video_analysis.results JSONB blob, so endpoints can read just the
+frames or time range they need.
+"""
+
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLASS_IDS = {"ball": 0, "goalkeeper": 1, "player": 2, "referee": 3}
+CLASS_NAMES = {class_id: name for name, class_id in CLASS_IDS.items()}
+
+SCHEMA_DDL = """
+    ALTER TABLE video_detections ADD COLUMN IF NOT EXISTS track_id INTEGER;
+    ALTER TABLE video_detections ADD COLUMN IF NOT EXISTS predicted BOOLEAN NOT NULL DEFAULT FALSE;
+    CREATE INDEX IF NOT EXISTS idx_video_detections_analysis_frame
+        ON video_detections(analysis_id, frame_number);
+"""
+
+
+def store_detections(db, analysis_id: str, frame_detections: Dict, page_size: int = 5000) -> int:
+    """
+    Replace the stored detections of an analysis with frame_detections
+    (as returned by FootballDetector.process_video). Returns rows written.
+    """
+    rows = []
+    for frame_number, frame_data in frame_detections.items():
+        timestamp = frame_data['timestamp']
+        for det in frame_data['detections']:
+            x1, y1, x2, y2 = det['bbox']
+            cx, cy = det['center']
+            rows.append((
+                analysis_id, int(frame_number), timestamp, det['class_name'], det['confidence'],
+                x1, y1, x2, y2, cx, cy, det['area'],
+                det.get('track_id'), det.get('predicted', False)
+            ))
+
+    db.execute_query(SCHEMA_DDL)
+    # Delete + insert in one transaction: idempotent for retried / resumed
+    # analyses, and a failed insert keeps the previous detections
+    written = db.execute_values_query("""
+        INSERT INTO video_detections (
+            analysis_id, frame_number, timestamp_seconds, object_class, confidence,
+            bbox_x1, bbox_y1, bbox_x2, bbox_y2, center_x, center_y, area,
+            track_id, predicted
+        ) VALUES %s
+    """, rows, page_size=page_size,
+        pre_statements=[("DELETE FROM video_detections WHERE analysis_id = %s", (analysis_id,))])
+    logger.info(f"Stored {written} detections for analysis {analysis_id}")
+    return written
+
+
+def load_detection_frames(db, analysis_id: str,
+                          after_frame: int = -1, limit_frames: int = 250,
+                          start_time: Optional[float] = None, end_time: Optional[float] = None,
+                          object_class: Optional[str] = None) -> Dict:
+    """
+    Read a page of frames for an analysis (keyset pagination on frame_number).
+
+    Returns {'frames': [...], 'next_after_frame': int or None}; each frame
+    has frame_number, timestamp and detections in the detector's format.
+    """
+    # Qualified with the table alias "d" used both in the page CTE and the join
+    filters = ["d.analysis_id = %s", "d.frame_number > %s"]
+    params: List = [analysis_id, after_frame]
+    if start_time is not None:
+        filters.append("d.timestamp_seconds >= %s")
+        params.append(start_time)
+    if end_time is not None:
+        filters.append("d.timestamp_seconds < %s")
+        params.append(end_time)
+    if object_class:
+        filters.append("d.object_class = %s")
+        params.append(object_class)
+    where = " AND ".join(filters)
+
+    rows = db.query_to_dict(f"""
+        WITH page AS (
+            SELECT DISTINCT d.frame_number
+            FROM video_detections d
+            WHERE {where}
+            ORDER BY d.frame_number
+            LIMIT %s
+        )
+        SELECT d.frame_number, d.timestamp_seconds, d.object_class, d.confidence,
+               d.bbox_x1, d.bbox_y1, d.bbox_x2, d.bbox_y2, d.center_x, d.center_y, d.area,
+               d.track_id, d.predicted
+        FROM video_detections d
+        JOIN page p ON p.frame_number = d.frame_number
+        WHERE {where}
+        ORDER BY d.frame_number, d.id
+    """, tuple(params + [limit_frames] + params))
+
+    frames = []
+    for row in rows:
+        if not frames or frames[-1]['frame_number'] != row['frame_number']:
+            frames.append({
+                'frame_number': row['frame_number'],
+                'timestamp': row['timestamp_seconds'],
+                'detections': []
+            })
+        detection = {
+            'bbox': [row['bbox_x1'], row['bbox_y1'], row['bbox_x2'], row['bbox_y2']],
+            'confidence': row['confidence'],
+            'class_id': CLASS_IDS.get(row['object_class'], -1),
+            'class_name': row['object_class'],
+            'center': [row['center_x'], row['center_y']],
+            'area': row['area']
+        }
+        if row['track_id'] is not None:
+            detection['track_id'] = row['track_id']
+        if row['predicted']:
+            detection['predicted'] = True
+        frames[-1]['detections'].append(detection)
+
+    next_after = frames[-1]['frame_number'] if len(frames) == limit_frames else None
+    return {'frames': frames, 'next_after_frame': next_after}
+
+
+def iter_frame_boxes(db, analysis_id: str, start_frame: int = 0,
+                     end_frame: Optional[int] = None,
+                     itersize: int = 5000) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Stream the detections of [start_frame, end_frame) in frame order through
+    a server-side cursor, one frame at a time.
+
+    Yields (frame_number, boxes, class_ids, confidences): boxes is an (N, 4)
+    int32 xyxy array, class_ids an (N,) int array (CLASS_IDS, -1 if unknown)
+    and confidences an (N,) float array. Frames without detections are
+    not yielded.
+    """
+    filters = "analysis_id = %s AND frame_number >= %s"
+    params: List = [analysis_id, start_frame]
+    if end_frame is not None:
+        filters += " AND frame_number < %s"
+        params.append(end_frame)
+
+    rows = db.stream_query(f"""
+        SELECT frame_number, object_class, confidence, bbox_x1, bbox_y1, bbox_x2, bbox_y2
+        FROM video_detections
+        WHERE {filters}
+        ORDER BY frame_number, id
+    """, tuple(params), itersize=itersize)
+
+    def build(frame_number, frame_rows):
+        boxes = np.array([row[3:7] for row in frame_rows], dtype=np.float64).astype(np.int32)
+        class_ids = np.array([CLASS_IDS.get(row[1], -1) for row in frame_rows], dtype=np.int64)
+        confidences = np.array([row[2] for row in frame_rows], dtype=np.float64)
+        return frame_number, boxes, class_ids, confidences
+
+    current, frame_rows = None, []
+    for row in rows:
+        if row[0] != current and frame_rows:
+            yield build(current, frame_rows)
+            frame_rows = []
+        current = row[0]
+        frame_rows.append(row)
+    if frame_rows:
+        yield build(current, frame_rows)
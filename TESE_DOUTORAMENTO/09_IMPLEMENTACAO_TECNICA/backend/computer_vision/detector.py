@@ -5,13 +5,23 @@ Based on YOLOv8 for player, ball, goalkeeper, and referee detection
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
 from typing import List, Dict, Tuple, Optional
 import logging
 from pathlib import Path
 import json
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from .tracker import MultiObjectTracker, track_frame_detections, calculate_track_metrics
+from .adaptive_sampler import AdaptiveSampler, merge_sampling_stats
+from .pitch_roi import PitchROI, merge_roi_stats
+from .camera_model import CameraCalibrator, merge_camera_models
+from .detection_cache import DetectionCacheEntry
+from .inference_backends import DEFAULT_BACKEND, load_backend_model, validate_backend
+
 logger = logging.getLogger(__name__)
 
 class FootballDetector:
@@ -20,14 +30,17 @@ class FootballDetector:
     Detects players, ball, goalkeeper, and referee
     """
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, backend: str = DEFAULT_BACKEND):
         """
         Initialize the football detector
         
         Args:
             model_path: Path to trained YOLOv8 model. If None, uses default YOLOv8x
+            backend: "torch" (ultralytics), "onnx" or "onnx-int8" (onnxruntime
+                on CPU, model exported on first use; see inference_backends)
         """
         self.model_path = model_path or "yolov8x.pt"
+        self.backend = validate_backend(backend)
         self.model = None
         self.class_names = {
             0: "ball",
@@ -39,9 +52,11 @@ class FootballDetector:
         
     def load_model(self):
         """Load the YOLOv8 model"""
+        # ultralytics / onnxruntime are imported here, so importers of this
+        # module (API startup, metrics) do not pay for torch
         try:
-            self.model = YOLO(self.model_path)
-            logger.info(f"Loaded YOLOv8 model from {self.model_path}")
+            self.model = load_backend_model(self.model_path, self.backend)
+            logger.info(f"Loaded YOLOv8 model from {self.model_path} ({self.backend})")
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
@@ -59,34 +74,78 @@ class FootballDetector:
         """
         if self.model is None:
             raise RuntimeError("Model not loaded")
+        if self.backend != "torch":
+            return self.detect_batch([image], confidence=confidence)[0]
             
         results = self.model(image, conf=confidence)
         detections = []
         
         for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    # Extract bounding box coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    confidence_score = box.conf[0].cpu().numpy()
-                    class_id = int(box.cls[0].cpu().numpy())
-                    
-                    detection = {
-                        'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                        'confidence': float(confidence_score),
-                        'class_id': class_id,
-                        'class_name': self.class_names.get(class_id, 'unknown'),
-                        'center': [float((x1 + x2) / 2), float((y1 + y2) / 2)],
-                        'area': float((x2 - x1) * (y2 - y1))
-                    }
-                    detections.append(detection)
+            detections.extend(self._parse_result(result))
+        
+        return detections
+    
+    def detect_batch(self, images: List[np.ndarray], confidence: float = 0.5) -> List[List[Dict]]:
+        """
+        Detect objects in several frames with a single model call
+        
+        Args:
+            images: List of frames (same resolution)
+            confidence: Minimum confidence threshold
+            
+        Returns:
+            One detection list per input frame, as returned by detect_objects
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded")
+        if not images:
+            return []
+        if self.backend != "torch":
+            return [self._build_detections(*arrays) for arrays in self.model(images, conf=confidence)]
+        
+        results = self.model(images, conf=confidence, verbose=False)
+        return [self._parse_result(result) for result in results]
+    
+    def _parse_result(self, result) -> List[Dict]:
+        """Convert one ultralytics Results object into detection dicts"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
         
+        # One device->host copy per frame
+        return self._build_detections(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                                      boxes.cls.cpu().numpy())
+    
+    def _build_detections(self, xyxy: np.ndarray, confs: np.ndarray, class_ids: np.ndarray) -> List[Dict]:
+        """Detection dicts from (N, 4) xyxy boxes, confidences and class ids (any backend)"""
+        # float32 math matches per-box extraction
+        class_ids = class_ids.astype(int)
+        centers_x = (xyxy[:, 0] + xyxy[:, 2]) / 2
+        centers_y = (xyxy[:, 1] + xyxy[:, 3]) / 2
+        areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        
+        detections = []
+        for i in range(len(xyxy)):
+            class_id = int(class_ids[i])
+            detections.append({
+                'bbox': [float(v) for v in xyxy[i]],
+                'confidence': float(confs[i]),
+                'class_id': class_id,
+                'class_name': self.class_names.get(class_id, 'unknown'),
+                'center': [float(centers_x[i]), float(centers_y[i])],
+                'area': float(areas[i])
+            })
         return detections
     
     def process_video(self, video_path: str, output_path: Optional[str] = None, 
                      sample_rate: int = 1, confidence: float = 0.5,
-                     progress_callback: Optional[callable] = None) -> Dict:
+                     progress_callback: Optional[callable] = None,
+                     pipelined: bool = False, batch_size: int = 8,
+                     track: bool = False, detect_every: int = 1,
+                     sampler: Optional[AdaptiveSampler] = None,
+                     pitch_roi: Optional[PitchROI] = None,
+                     calibrator: Optional[CameraCalibrator] = None,
+                     cache: Optional[DetectionCacheEntry] = None) -> Dict:
         """
         Process entire video and extract detections
         
@@ -94,10 +153,34 @@ class FootballDetector:
             video_path: Path to input video
             output_path: Path to save annotated video (optional)
             sample_rate: Process every Nth frame (1 = every frame)
+            pipelined: Decode, batched inference and annotated writing run
+                concurrently (see process_video_pipelined)
+            batch_size: Frames per model call in pipelined mode
+            track: Add persistent 'track_id' values (MultiObjectTracker)
+            detect_every: Run detection on every Nth sampled frame only and
+                propagate tracks in between (implies track and pipelined)
+            sampler: AdaptiveSampler choosing the frames to detect from the
+                video content; replaces sample_rate (implies pipelined)
+            pitch_roi: PitchROI restricting detection to the pitch (implies pipelined)
+            calibrator: CameraCalibrator estimating the pixel -> pitch
+                homography per shot (implies pipelined)
+            cache: DetectionCacheEntry serving / recording raw detections
+                (implies pipelined)
             
         Returns:
             Dictionary with frame-by-frame detections and summary statistics
         """
+        if pipelined or detect_every > 1 or sampler is not None or pitch_roi is not None \
+                or calibrator is not None or cache is not None:
+            return self.process_video_pipelined(
+                video_path, output_path=output_path, sample_rate=sample_rate,
+                confidence=confidence, progress_callback=progress_callback,
+                batch_size=batch_size,
+                tracker=MultiObjectTracker() if track or detect_every > 1 else None,
+                detect_every=detect_every, sampler=sampler, pitch_roi=pitch_roi,
+                calibrator=calibrator, cache=cache
+            )
+        
         cap = cv2.VideoCapture(video_path)
         
         if not cap.isOpened():
@@ -158,6 +241,9 @@ class FootballDetector:
         if writer:
             writer.release()
         
+        if track:
+            frame_detections = track_frame_detections(frame_detections)
+        
         # Calculate summary statistics
         summary = self.calculate_video_summary(frame_detections, fps, total_frames)
         
@@ -174,6 +260,428 @@ class FootballDetector:
             'summary': summary
         }
     
+    def process_video_pipelined(self, video_path: str, output_path: Optional[str] = None,
+                                sample_rate: int = 1, confidence: float = 0.5,
+                                progress_callback: Optional[callable] = None,
+                                batch_size: int = 8, queue_size: int = 32,
+                                start_frame: int = 0, end_frame: Optional[int] = None,
+                                checkpoint_callback: Optional[callable] = None,
+                                checkpoint_every: int = 500,
+                                tracker: Optional[MultiObjectTracker] = None,
+                                detect_every: int = 1,
+                                sampler: Optional[AdaptiveSampler] = None,
+                                pitch_roi: Optional[PitchROI] = None,
+                                calibrator: Optional[CameraCalibrator] = None,
+                                cache: Optional[DetectionCacheEntry] = None) -> Dict:
+        """
+        Process a video with decode, inference and writing overlapped
+        
+        - Decoder thread: cap.grab() for skipped frames (no retrieve/colour
+          conversion), cap.retrieve() for sampled ones, pushed to a bounded queue
+        - Calling thread: batched inference, batch_size frames per model call
+        - Writer thread: draws and writes annotated frames (only if output_path)
+        
+        start_frame/end_frame restrict processing to [start_frame, end_frame)
+        (used by process_video_parallel); frame numbers and sampling stay
+        relative to the start of the video.
+        
+        checkpoint_callback(next_frame, new_frame_detections) is called every
+        checkpoint_every processed frames with the frames added since the
+        previous checkpoint (so checkpoints can be appended); next_frame is
+        where a resumed run should start (pass it back as start_frame).
+        
+        tracker: detections get a 'track_id' from this MultiObjectTracker
+        (updated in frame order on the calling thread). With detect_every > 1
+        only every Nth sampled frame goes through the model; the others get
+        the tracker's predicted boxes ('predicted': True) and, unless an
+        annotated video is written, are grabbed without decoding.
+        
+        sampler: an AdaptiveSampler replaces sample_rate and detect_every.
+        The decoder reads every min_interval-th frame for the sampler's
+        motion / pitch measurements and only the frames it selects are
+        detected. Progress then counts frames scanned rather than frames
+        detected, and video_info['sampling'] holds the sampler stats.
+        
+        pitch_roi: the decoder crops each frame to be detected to the pitch
+        region (PitchROI.prepare); boxes are mapped back to frame coordinates
+        and people off the pitch dropped before tracking. video_info['pitch_roi']
+        holds the ROI stats.
+        
+        calibrator: the decoder passes every frame to be detected to the
+        CameraCalibrator; video_info['camera'] lists the per-shot camera
+        models (see camera_model.CameraModels).
+        
+        cache: frames already in the DetectionCacheEntry are not run through
+        the model (nor decoded, when nothing else needs their pixels); their
+        cached detections are filtered at `confidence`. Other frames are
+        detected at the cache's confidence floor and added to the entry
+        (saving it is left to the caller). video_info['detection_cache']
+        holds hit / miss counts.
+        
+        Returns the same structure and frame_detections as process_video.
+        """
+        if sampler is not None:
+            sample_rate, detect_every = 1, 1
+            sampler.reset()
+        if pitch_roi is not None:
+            pitch_roi.reset()
+        if calibrator is not None:
+            calibrator.reset()
+        if cache is not None and confidence < cache.confidence:
+            logger.info(f"Confidence {confidence} is below the detection cache floor {cache.confidence}: cache not used")
+            cache = None
+        model_confidence = cache.confidence if cache is not None else confidence
+        detect_every = max(1, detect_every)
+        if detect_every > 1 and tracker is None:
+            tracker = MultiObjectTracker()
+        cap = cv2.VideoCapture(video_path)
+        
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        
+        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        
+        writer = None
+        if output_path:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        
+        batch_size = max(1, batch_size)
+        frame_queue = queue.Queue(maxsize=queue_size)
+        write_queue = queue.Queue(maxsize=queue_size) if writer else None
+        stop = threading.Event()
+        errors = []
+        
+        # Queue operations poll `stop` so a failure on one side never leaves
+        # the other blocked forever
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            return None
+        
+        def enqueue(frame_count, frame, detect, cached=False):
+            if detect and calibrator is not None:
+                calibrator.observe(frame_count, frame)
+            roi = pitch_roi.prepare(frame_count, frame) \
+                if detect and not cached and pitch_roi is not None else None
+            return put(frame_queue, (frame_count, frame, detect, roi, cached))
+        
+        def decode():
+            try:
+                frame_count = start_frame
+                if start_frame:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+                while not stop.is_set() and (end_frame is None or frame_count < end_frame):
+                    if sampler is not None:
+                        if sampler.should_probe(frame_count):
+                            ret, frame = cap.read()
+                            if not ret:
+                                break
+                            if sampler.observe(frame_count, frame) and \
+                                    not enqueue(frame_count, frame, True,
+                                                cache is not None and cache.contains(frame_count)):
+                                return
+                        elif not cap.grab():
+                            break
+                    elif frame_count % sample_rate == 0:
+                        detect = (frame_count // sample_rate) % detect_every == 0
+                        cached = detect and cache is not None and cache.contains(frame_count)
+                        # Cached frames only need pixels for the writer / calibrator
+                        if (detect and (not cached or calibrator is not None)) or writer:
+                            ret, frame = cap.read()
+                            if not ret:
+                                break
+                        elif cap.grab():
+                            frame = None
+                        else:
+                            break
+                        if not enqueue(frame_count, frame, detect, cached):
+                            return
+                    elif not cap.grab():
+                        break
+                    frame_count += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                put(frame_queue, None)
+        
+        def write():
+            try:
+                while True:
+                    item = get(write_queue)
+                    if item is None:
+                        break
+                    frame, detections = item
+                    writer.write(self.draw_detections(frame, detections))
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+        
+        decoder = threading.Thread(target=decode, name="detector-decode", daemon=True)
+        decoder.start()
+        writer_thread = None
+        if writer:
+            writer_thread = threading.Thread(target=write, name="detector-write", daemon=True)
+            writer_thread.start()
+        
+        frame_detections = {}
+        checkpoint_frames = {}
+        processed_frames = 0
+        if start_frame or end_frame is not None:
+            segment_end = total_frames if end_frame is None else min(end_frame, total_frames)
+            total_frames_to_process = max(1, len(range(start_frame, segment_end, sample_rate)))
+        else:
+            total_frames_to_process = max(1, total_frames // sample_rate)
+        
+        if sampler is not None:
+            logger.info(f"Processing video (pipelined, batch={batch_size}, adaptive {sampler.min_interval}-{sampler.max_interval}): {total_frames} frames at {fps} FPS (scanning ~{total_frames_to_process} frames)")
+        else:
+            logger.info(f"Processing video (pipelined, batch={batch_size}): {total_frames} frames at {fps} FPS (processing ~{total_frames_to_process} frames)")
+        
+        try:
+            finished = False
+            while not finished and not errors:
+                batch = []
+                while len(batch) < batch_size:
+                    item = get(frame_queue)
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+                
+                detected = iter(self.detect_batch(
+                    [roi[0] if roi else frame for _, frame, detect, roi, cached in batch if detect and not cached],
+                    confidence=model_confidence
+                ))
+                
+                for frame_number, frame, detect, roi, cached in batch:
+                    if not detect:
+                        detections = []
+                    elif cached:
+                        detections = cache.detections(frame_number, confidence, self)
+                    else:
+                        detections = next(detected)
+                        if roi:
+                            detections = pitch_roi.restore(detections, roi[1])
+                        if cache is not None:
+                            cache.add(frame_number, detections)
+                            detections = [d for d in detections if d['confidence'] >= confidence]
+                    if tracker:
+                        detections = tracker.update(detections, frame_number) if detect \
+                            else tracker.predict(frame_number)
+                    frame_detections[frame_number] = {
+                        'timestamp': frame_number / fps,
+                        'detections': detections
+                    }
+                    if checkpoint_callback:
+                        checkpoint_frames[frame_number] = frame_detections[frame_number]
+                    if writer and not put(write_queue, (frame, detections)):
+                        break
+                    
+                    processed_frames += 1
+                    # With a sampler, progress is the position in the video
+                    position = processed_frames if sampler is None else \
+                        min(frame_number - start_frame + 1, total_frames_to_process)
+                    
+                    if progress_callback and processed_frames % 10 == 0:
+                        percentage = min(99.0, (position / total_frames_to_process) * 100)
+                        progress_callback(position, total_frames_to_process, percentage)
+                    
+                    if processed_frames % 100 == 0:
+                        logger.info(f"Processed {position}/{total_frames_to_process} frames ({position/total_frames_to_process*100:.1f}%)")
+                    
+                    if checkpoint_callback and processed_frames % checkpoint_every == 0:
+                        checkpoint_callback(frame_number + sample_rate, checkpoint_frames)
+                        checkpoint_frames = {}
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            if writer_thread:
+                put(write_queue, None)
+                writer_thread.join()
+            stop.set()
+            decoder.join()
+            cap.release()
+            if writer:
+                writer.release()
+        
+        if errors:
+            raise errors[0]
+        
+        summary = self.calculate_video_summary(frame_detections, fps, total_frames)
+        video_info = {
+            'path': video_path,
+            'fps': fps,
+            'total_frames': total_frames,
+            'duration_seconds': total_frames / fps,
+            'resolution': [width, height],
+            'processed_frames': processed_frames
+        }
+        if sampler is not None:
+            video_info['sampling'] = sampler.stats()
+        if pitch_roi is not None:
+            video_info['pitch_roi'] = pitch_roi.stats()
+        if calibrator is not None:
+            video_info['camera'] = calibrator.to_list()
+        if cache is not None:
+            video_info['detection_cache'] = cache.stats()
+        
+        return {
+            'video_info': video_info,
+            'frame_detections': frame_detections,
+            'summary': summary
+        }
+    
+    def process_video_parallel(self, video_path: str, workers: int = 2,
+                               sample_rate: int = 1, confidence: float = 0.5,
+                               progress_callback: Optional[callable] = None,
+                               batch_size: int = 8, track: bool = False,
+                               sampler_config: Optional[Dict] = None,
+                               roi_config: Optional[Dict] = None,
+                               camera_config: Optional[Dict] = None,
+                               cache: Optional[DetectionCacheEntry] = None) -> Dict:
+        """
+        Process a video split into time segments across worker processes
+        
+        The sampled frames are divided into `workers` contiguous ranges whose
+        boundaries fall on sampled frames. Each worker process loads its own
+        model (same backend), seeks to its start frame and runs
+        process_video_pipelined on its range; frame_detections are merged
+        back in frame order, so the result matches a serial run. Progress
+        reported to progress_callback is the sum over all workers.
+        
+        track=True runs MultiObjectTracker over the merged detections, so
+        track ids are continuous across segment boundaries.
+        
+        sampler_config: AdaptiveSampler arguments (AdaptiveSampler.config());
+        each segment gets its own sampler, so the frames selected near a
+        boundary can differ slightly from a serial adaptive run.
+        
+        roi_config: PitchROI arguments (PitchROI.config()), one ROI per segment.
+        camera_config: CameraCalibrator arguments (CameraCalibrator.config());
+        each segment starts with a fresh calibration.
+        cache: each worker reads the entry; the frames they detect are
+        added to it here (the caller saves it).
+        
+        Annotated output is not supported here (use process_video).
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        
+        if sampler_config is not None:
+            sample_rate = 1
+        segments = split_segments(total_frames, sample_rate, workers)
+        if len(segments) <= 1:
+            return self.process_video_pipelined(
+                video_path, sample_rate=sample_rate, confidence=confidence,
+                progress_callback=progress_callback, batch_size=batch_size,
+                tracker=MultiObjectTracker() if track else None,
+                sampler=AdaptiveSampler(**sampler_config) if sampler_config is not None else None,
+                pitch_roi=PitchROI(**roi_config) if roi_config is not None else None,
+                calibrator=CameraCalibrator(**camera_config) if camera_config is not None else None,
+                cache=cache
+            )
+        
+        total_frames_to_process = max(1, total_frames // sample_rate)
+        logger.info(f"Processing video in {len(segments)} segments: {segments}")
+        
+        # spawn: workers must not inherit the parent's threads / torch state
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            progress_queue = manager.Queue()
+            done = threading.Event()
+            
+            def aggregate_progress():
+                per_segment = [0] * len(segments)
+                while not done.is_set():
+                    try:
+                        index, processed = progress_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    except (EOFError, OSError):
+                        return
+                    per_segment[index] = processed
+                    if progress_callback:
+                        combined = sum(per_segment)
+                        percentage = min(99.0, combined / total_frames_to_process * 100)
+                        progress_callback(combined, total_frames_to_process, percentage)
+            
+            progress_thread = threading.Thread(target=aggregate_progress, name="detector-progress", daemon=True)
+            progress_thread.start()
+            
+            try:
+                with ProcessPoolExecutor(max_workers=len(segments), mp_context=context) as pool:
+                    futures = [
+                        pool.submit(_process_segment, self.model_path, video_path, index,
+                                    start, end, sample_rate, confidence, batch_size, progress_queue,
+                                    sampler_config, self.backend, roi_config, camera_config,
+                                    (str(cache.directory), cache.confidence) if cache is not None else None)
+                        for index, (start, end) in enumerate(segments)
+                    ]
+                    segment_results = [future.result() for future in futures]
+            finally:
+                done.set()
+                progress_thread.join()
+        
+        frame_detections = {}
+        for segment_detections, _, cache_additions in segment_results:
+            frame_detections.update(segment_detections)
+            if cache is not None and cache_additions:
+                cache.extend(cache_additions)
+        if track:
+            frame_detections = track_frame_detections(frame_detections)
+        
+        summary = self.calculate_video_summary(frame_detections, fps, total_frames)
+        video_info = {
+            'path': video_path,
+            'fps': fps,
+            'total_frames': total_frames,
+            'duration_seconds': total_frames / fps,
+            'resolution': [width, height],
+            'processed_frames': len(frame_detections)
+        }
+        if sampler_config is not None:
+            video_info['sampling'] = merge_sampling_stats([info.get('sampling') for _, info, _ in segment_results])
+        if roi_config is not None:
+            video_info['pitch_roi'] = merge_roi_stats([info.get('pitch_roi') for _, info, _ in segment_results])
+        if camera_config is not None:
+            video_info['camera'] = merge_camera_models([info.get('camera') for _, info, _ in segment_results])
+        if cache is not None:
+            segment_stats = [info['detection_cache'] for _, info, _ in segment_results if info.get('detection_cache')]
+            cache.hits += sum(stats['hits'] for stats in segment_stats)
+            cache.misses += sum(stats['misses'] for stats in segment_stats)
+            video_info['detection_cache'] = cache.stats()
+        
+        return {
+            'video_info': video_info,
+            'frame_detections': frame_detections,
+            'summary': summary
+        }
+    
     def draw_detections(self, image: np.ndarray, detections: List[Dict]) -> np.ndarray:
         """
         Draw bounding boxes and labels on image
@@ -305,6 +813,71 @@ class FootballDetector:
         }
 
 
+def split_segments(total_frames: int, sample_rate: int, workers: int) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split a video into [start, end) frame ranges with roughly equal numbers
+    of sampled frames. Every start is a multiple of sample_rate; the last
+    range is open-ended (end=None) so frames past CAP_PROP_FRAME_COUNT are
+    still read, as in the serial loop.
+    """
+    sampled = len(range(0, max(total_frames, 0), sample_rate))
+    workers = max(1, min(workers, sampled))
+    bounds = [round(i * sampled / workers) * sample_rate for i in range(workers)]
+    return [
+        (start, bounds[i + 1] if i + 1 < len(bounds) else None)
+        for i, start in enumerate(bounds)
+    ]
+
+
+# Per-process detector reused across segments handled by the same worker
+_worker_detector: Optional[FootballDetector] = None
+
+
+def _process_segment(model_path: str, video_path: str, index: int,
+                     start_frame: int, end_frame: Optional[int],
+                     sample_rate: int, confidence: float, batch_size: int,
+                     progress_queue, sampler_config: Optional[Dict] = None,
+                     backend: str = DEFAULT_BACKEND,
+                     roi_config: Optional[Dict] = None,
+                     camera_config: Optional[Dict] = None,
+                     cache_entry: Optional[Tuple[str, float]] = None) -> Tuple[Dict, Dict, Optional[Dict]]:
+    """
+    Worker-process entry point for FootballDetector.process_video_parallel
+    
+    cache_entry: (directory, confidence floor) of a DetectionCacheEntry to read.
+    
+    Returns (frame_detections, video_info of the segment, detections to add
+    to the cache or None).
+    """
+    global _worker_detector
+    if _worker_detector is None or _worker_detector.model_path != model_path \
+            or _worker_detector.backend != backend:
+        from .model_server import create_detector
+        _worker_detector = create_detector(model_path, backend)
+    
+    def report(processed_frames, total_frames, percentage):
+        progress_queue.put((index, processed_frames))
+    
+    sampler = AdaptiveSampler(**sampler_config) if sampler_config is not None else None
+    cache = DetectionCacheEntry(*cache_entry) if cache_entry is not None else None
+    result = _worker_detector.process_video_pipelined(
+        video_path, sample_rate=sample_rate, confidence=confidence,
+        progress_callback=report, batch_size=batch_size,
+        start_frame=start_frame, end_frame=end_frame, sampler=sampler,
+        pitch_roi=PitchROI(**roi_config) if roi_config is not None else None,
+        calibrator=CameraCalibrator(**camera_config) if camera_config is not None else None,
+        cache=cache
+    )
+    video_info = result['video_info']
+    if sampler is None:
+        progress_queue.put((index, video_info['processed_frames']))
+    else:
+        # Progress counts scanned frames: the whole segment is done
+        segment_end = video_info['total_frames'] if end_frame is None else end_frame
+        progress_queue.put((index, max(0, segment_end - start_frame)))
+    return result['frame_detections'], video_info, cache.additions() if cache is not None else None
+
+
 class FootballMetricsCalculator:
     """
     Calculate advanced football metrics from detection data
@@ -340,6 +913,9 @@ class FootballMetricsCalculator:
             'video_quality': self._assess_video_quality(detection_results)
         }
         
+        if any('track_id' in det for frame_data in frame_detections.values() for det in frame_data['detections']):
+            metrics['tracking'] = self._calculate_tracking_metrics(frame_detections, video_info)
+        
         return metrics
     
     def _calculate_basic_stats(self, frame_detections: Dict) -> Dict:
@@ -415,16 +991,45 @@ class FootballMetricsCalculator:
             'estimated_team_size': 'Full teams' if np.mean(player_counts_per_frame) > 15 else 'Partial view'
         }
     
+    def _calculate_tracking_metrics(self, frame_detections: Dict, video_info: Dict) -> Dict:
+        """Distance, speed and heat maps per track (pixels; needs track_id from MultiObjectTracker)"""
+        resolution = video_info.get('resolution') or [0, 0]
+        if not all(resolution):
+            # Fall back to the extent of the detections
+            resolution = [
+                max((d['bbox'][2] for f in frame_detections.values() for d in f['detections']), default=1),
+                max((d['bbox'][3] for f in frame_detections.values() for d in f['detections']), default=1)
+            ]
+        tracks = calculate_track_metrics(frame_detections, video_info.get('fps', 0), tuple(resolution))
+        
+        people = {tid: t for tid, t in tracks.items() if t['class_name'] != 'ball'}
+        balls = [t for t in tracks.values() if t['class_name'] == 'ball']
+        ball = max(balls, key=lambda t: t['frames_tracked'], default=None)
+        
+        team_heatmap = np.zeros((8, 12), dtype=int)
+        for t in people.values():
+            team_heatmap += np.array(t['heatmap'])
+        
+        return {
+            'units': 'pixels',
+            'total_tracks': len(tracks),
+            'player_tracks': len(people),
+            'avg_track_duration_seconds': round(float(np.mean([t['duration_seconds'] for t in people.values()])), 2) if people else 0,
+            'total_distance_px': round(sum(t['distance_px'] for t in people.values()), 1),
+            'ball_avg_speed_px_per_s': ball['avg_speed_px_per_s'] if ball else 0,
+            'ball_max_speed_px_per_s': ball['max_speed_px_per_s'] if ball else 0,
+            'players_heatmap': team_heatmap.tolist(),
+            'tracks': {str(tid): t for tid, t in people.items()}
+        }
+    
     def _calculate_tactical_metrics(self, frame_detections: Dict) -> Dict:
         """Calculate tactical and positional metrics"""
         # This is a simplified version - in practice, you'd need more sophisticated analysis
         return {
             'analysis_type': 'Basic computer vision analysis',
             'recommended_improvements': [
-                'Add player tracking for individual movement analysis',
                 'Implement team classification for possession analysis', 
-                'Add formation detection algorithms',
-                'Include heat map generation for positional analysis'
+                'Add formation detection algorithms'
             ]
         }
     
@@ -0,0 +1,181 @@
+"""
+CPU Inference Backends for FootballDetector
+
+The default backend runs the ultralytics PyTorch model. For servers
+without a GPU the model can instead be exported once to ONNX and run
+through onnxruntime:
+- "onnx": FP32 ONNX graph, CPU execution provider, tuned thread counts
+- "onnx-int8": same graph with dynamic INT8 weight quantisation
+  (no calibration set needed)
+
+Pre/post-processing (letterbox, confidence filter, per-class NMS, box
+rescaling) follows ultralytics' defaults, so the detection dicts built by
+FootballDetector are unchanged.
+
+Configuration (environment):
+    CV_INFERENCE_BACKEND   default backend (torch, onnx, onnx-int8)
+    CV_ONNX_IMGSZ          export / inference size (default 640)
+    CV_ONNX_THREADS        onnxruntime intra-op threads (default: onnxruntime's choice)
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.getenv("CV_INFERENCE_BACKEND", "torch")
+ONNX_IMGSZ = int(os.getenv("CV_ONNX_IMGSZ", 640))
+ONNX_THREADS = int(os.getenv("CV_ONNX_THREADS", 0))
+
+# ultralytics non_max_suppression defaults
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+MAX_NMS_BOXES = 30000
+MAX_WH = 7680  # class offset so NMS never suppresses across classes
+
+
+def validate_backend(backend: str) -> str:
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (use one of {', '.join(INFERENCE_BACKENDS)})")
+    return backend
+
+
+def export_onnx(model_path: str, imgsz: int = ONNX_IMGSZ, int8: bool = False) -> str:
+    """
+    ONNX file for model_path, exported (and quantised) on first use
+
+    The files sit next to the weights (<name>.onnx, <name>.int8.onnx) and
+    are re-exported when the weights are newer. Exporting needs
+    ultralytics + torch; running the exported file does not.
+    """
+    weights = Path(model_path)
+    onnx_path = weights.with_suffix(".onnx")
+    if weights.suffix == ".onnx":
+        onnx_path = weights
+    elif not onnx_path.exists() or (weights.exists() and weights.stat().st_mtime > onnx_path.stat().st_mtime):
+        from ultralytics import YOLO
+        logger.info(f"📦 Exporting {model_path} to ONNX (imgsz={imgsz})...")
+        exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        onnx_path = Path(exported)
+
+    if not int8:
+        return str(onnx_path)
+
+    int8_path = onnx_path.with_name(f"{onnx_path.stem}.int8.onnx")
+    if not int8_path.exists() or onnx_path.stat().st_mtime > int8_path.stat().st_mtime:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info(f"📦 Quantising {onnx_path.name} to INT8...")
+        quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QUInt8)
+    return str(int8_path)
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to size x size (grey 114, centred)"""
+    height, width = image.shape[:2]
+    gain = min(size / height, size / width)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    pad_w, pad_h = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return image, gain, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression; indices of kept boxes by descending score"""
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        inter_h = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class OnnxYoloModel:
+    """YOLOv8 detection model exported to ONNX, run with onnxruntime on CPU"""
+
+    def __init__(self, onnx_path: str, imgsz: int = ONNX_IMGSZ, threads: int = ONNX_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Static exports fix the input size; dynamic ones report a name instead
+        self.imgsz = model_input.shape[2] if isinstance(model_input.shape[2], int) else imgsz
+        self.static_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.path = onnx_path
+        logger.info(f"Loaded ONNX model {onnx_path} (imgsz={self.imgsz}, threads={threads or 'auto'})")
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        if self.static_batch in (None, len(batch)):
+            return self.session.run(None, {self.input_name: batch})[0]
+        # Exports without dynamic axes take a fixed batch size
+        return np.concatenate([
+            self.session.run(None, {self.input_name: batch[i:i + 1]})[0] for i in range(len(batch))
+        ])
+
+    def __call__(self, images: List[np.ndarray], conf: float = 0.5) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """One (xyxy, confidences, class_ids) tuple of arrays per BGR image"""
+        if not images:
+            return []
+        letterboxed = [letterbox(image, self.imgsz) for image in images]
+        batch = np.stack([padded for padded, _, _ in letterboxed])
+        batch = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+        outputs = self._run(batch)  # (N, 4 + classes, anchors)
+        results = []
+        for output, (_, gain, (pad_x, pad_y)), image in zip(outputs, letterboxed, images):
+            predictions = output.T
+            scores = predictions[:, 4:]
+            class_ids = scores.argmax(axis=1)
+            confidences = scores[np.arange(len(scores)), class_ids]
+            mask = confidences > conf
+            predictions, class_ids, confidences = predictions[mask], class_ids[mask], confidences[mask]
+            if len(confidences) > MAX_NMS_BOXES:
+                top = confidences.argsort()[::-1][:MAX_NMS_BOXES]
+                predictions, class_ids, confidences = predictions[top], class_ids[top], confidences[top]
+
+            cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+            boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+            keep = nms(boxes + class_ids[:, None] * MAX_WH, confidences, NMS_IOU)[:MAX_DETECTIONS]
+            boxes, confidences, class_ids = boxes[keep], confidences[keep], class_ids[keep]
+
+            boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / gain
+            boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / gain
+            height, width = image.shape[:2]
+            boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+            boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+            results.append((boxes.astype(np.float32), confidences.astype(np.float32), class_ids))
+        return results
+
+
+def load_backend_model(model_path: str, backend: str):
+    """Model object for a backend: ultralytics YOLO for torch, OnnxYoloModel otherwise"""
+    validate_backend(backend)
+    if backend == "torch":
+        # Imported here: ultralytics pulls in torch
+        from ultralytics import YOLO
+        return YOLO(model_path)
+    return OnnxYoloModel(export_onnx(model_path, int8=backend == "onnx-int8"))
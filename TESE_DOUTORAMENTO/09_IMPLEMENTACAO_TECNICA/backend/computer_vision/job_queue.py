@@ -0,0 +1,241 @@
+"""
+Durable Job Queue for Computer Vision Analyses
+
+Jobs live in the cv_jobs table and are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker processes
+(see cv_worker.py) can poll the same queue without double-processing:
+- Priorities: lower value runs first ("quick" before "full")
+- Retry with exponential backoff up to max_attempts
+- Heartbeats; jobs whose worker stopped heartbeating are re-queued
+- Frame checkpoints so a recovered job resumes where it stopped
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {
+    "quick": 0,
+    "ball_only": 5,
+    "players_only": 5,
+    "full": 10,
+}
+
+CHECKPOINT_DIR = Path("uploads/checkpoints")
+
+
+class LeaseLost(Exception):
+    """The job was cancelled or recovered by another worker while running"""
+
+
+class JobQueue:
+    """Postgres-backed queue of video analysis jobs"""
+
+    TABLES_DDL = """
+        CREATE TABLE IF NOT EXISTS cv_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            analysis_id VARCHAR(36) NOT NULL REFERENCES video_analysis(analysis_id) ON DELETE CASCADE,
+            priority SMALLINT NOT NULL DEFAULT 10,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            payload JSONB NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+            locked_by VARCHAR(100),
+            locked_at TIMESTAMP,
+            heartbeat_at TIMESTAMP,
+            checkpoint_frame INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_cv_jobs_queued
+            ON cv_jobs(priority, run_after, id) WHERE status = 'queued';
+        CREATE INDEX IF NOT EXISTS idx_cv_jobs_running
+            ON cv_jobs(heartbeat_at) WHERE status = 'running';
+        CREATE INDEX IF NOT EXISTS idx_cv_jobs_analysis ON cv_jobs(analysis_id);
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._ready = False
+
+    def ensure_tables(self):
+        if not self._ready:
+            self.db.execute_query(self.TABLES_DDL)
+            self._ready = True
+
+    def enqueue(self, analysis_id: str, payload: Dict, priority: Optional[int] = None,
+                max_attempts: int = 3) -> int:
+        """Queue an analysis; returns the job id"""
+        self.ensure_tables()
+        if priority is None:
+            priority = PRIORITIES.get(payload.get("analysis_type"), PRIORITIES["full"])
+        rows = self.db.execute_returning("""
+            INSERT INTO cv_jobs (analysis_id, priority, payload, max_attempts)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+        """, (analysis_id, priority, json.dumps(payload), max_attempts))
+        return rows[0]["id"]
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically take the next runnable job (None if the queue is empty)"""
+        self.ensure_tables()
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET status = 'running', locked_by = %s, locked_at = NOW(),
+                heartbeat_at = NOW(), attempts = attempts + 1, updated_at = NOW()
+            WHERE id = (
+                SELECT id FROM cv_jobs
+                WHERE status = 'queued' AND run_after <= NOW()
+                ORDER BY priority, run_after, id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, analysis_id, priority, payload, attempts, max_attempts, checkpoint_frame
+        """, (worker_id,))
+        if not rows:
+            return None
+        job = rows[0]
+        if isinstance(job["payload"], str):
+            job["payload"] = json.loads(job["payload"])
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, checkpoint_frame: Optional[int] = None) -> bool:
+        """Refresh the lease; False if the job was taken away from this worker"""
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET heartbeat_at = NOW(), updated_at = NOW(),
+                checkpoint_frame = COALESCE(%s, checkpoint_frame)
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            RETURNING id
+        """, (checkpoint_frame, job_id, worker_id))
+        return bool(rows)
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        """Mark the job completed; False if the job was taken away from this worker"""
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET status = 'completed', locked_by = NULL, updated_at = NOW()
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            RETURNING id
+        """, (job_id, worker_id))
+        return bool(rows)
+
+    def fail(self, job_id: int, worker_id: str, error: str,
+             base_delay_seconds: int = 30) -> Optional[str]:
+        """
+        Record a failed attempt. Re-queues with exponential backoff while
+        attempts remain; returns the new status ('queued' or 'failed'), or
+        None if the job was taken away from this worker.
+        """
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                run_after = NOW() + make_interval(secs => %s * POWER(2, GREATEST(attempts - 1, 0))),
+                last_error = %s, locked_by = NULL, updated_at = NOW()
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            RETURNING status
+        """, (base_delay_seconds, error, job_id, worker_id))
+        return rows[0]["status"] if rows else None
+
+    def recover_stale(self, timeout_seconds: int = 120) -> int:
+        """Re-queue running jobs whose worker stopped heartbeating (crash/kill)"""
+        self.ensure_tables()
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                last_error = 'Worker heartbeat lost', locked_by = NULL,
+                run_after = NOW(), updated_at = NOW()
+            WHERE status = 'running'
+              AND heartbeat_at < NOW() - make_interval(secs => %s)
+            RETURNING id, analysis_id, status
+        """, (timeout_seconds,))
+        for row in rows:
+            logger.warning(f"⚠️ Job {row['id']} ({row['analysis_id']}) recovered -> {row['status']}")
+            if row["status"] == "queued":
+                self.db.execute_query(
+                    "UPDATE video_analysis SET status = 'queued' WHERE analysis_id = %s",
+                    (row["analysis_id"],)
+                )
+            else:
+                self.db.execute_query(
+                    "UPDATE video_analysis SET status = 'failed', error_message = %s WHERE analysis_id = %s",
+                    ("Worker heartbeat lost (no attempts left)", row["analysis_id"])
+                )
+        return len(rows)
+
+    def cancel(self, analysis_id: str) -> int:
+        """Drop pending/running jobs of an analysis"""
+        self.ensure_tables()
+        rows = self.db.execute_returning("""
+            UPDATE cv_jobs
+            SET status = 'failed', last_error = 'Cancelled', locked_by = NULL, updated_at = NOW()
+            WHERE analysis_id = %s AND status IN ('queued', 'running')
+            RETURNING id
+        """, (analysis_id,))
+        return len(rows)
+
+    def stats(self) -> Dict:
+        """Job counts per status"""
+        self.ensure_tables()
+        rows = self.db.query_to_dict("SELECT status, COUNT(*) AS total FROM cv_jobs GROUP BY status")
+        return {row["status"]: row["total"] for row in rows}
+
+
+# ---------------------------------------------------------------------------
+# Frame checkpoints (partial frame_detections on disk)
+# ---------------------------------------------------------------------------
+def checkpoint_path(analysis_id: str) -> Path:
+    return CHECKPOINT_DIR / f"{analysis_id}.jsonl"
+
+
+def save_checkpoint(analysis_id: str, next_frame: int, new_frame_detections: Dict):
+    """
+    Append the detections of frames < next_frame added since the previous
+    checkpoint (one JSON line per checkpoint, so the cost does not grow
+    with the length of the video)
+    """
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    line = json.dumps({"next_frame": next_frame, "frame_detections": new_frame_detections})
+    with open(checkpoint_path(analysis_id), "a") as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_checkpoint(analysis_id: str) -> Tuple[int, Dict]:
+    """(next_frame, frame_detections) of the last checkpoint, or (0, {})"""
+    path = checkpoint_path(analysis_id)
+    if not path.exists():
+        return 0, {}
+    next_frame, detections = 0, {}
+    try:
+        with open(path, "r+") as f:
+            good_end = 0
+            for line in iter(f.readline, ""):
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # Line cut short by a crash: drop it so the resumed run
+                    # appends after the last complete checkpoint
+                    logger.warning(f"⚠️ Dropping truncated checkpoint line in {path}")
+                    f.truncate(good_end)
+                    break
+                detections.update((int(frame), value) for frame, value in data["frame_detections"].items())
+                next_frame = int(data["next_frame"])
+                good_end = f.tell()
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        return 0, {}
+    return next_frame, detections
+
+
+def clear_checkpoint(analysis_id: str):
+    path = checkpoint_path(analysis_id)
+    if path.exists():
+        path.unlink()
@@ -0,0 +1,308 @@
+"""
+Model Serving for the Football Detector
+
+Loading YOLOv8 weights (and importing torch) costs seconds, so detectors
+are kept warm and shared:
+- DetectorPool: up to `size` preloaded detectors per process; callers
+  check one out for the duration of an analysis
+- InferenceServer: a standalone process (inference_server.py) owning a
+  DetectorPool; API and cv_worker processes send it frames over a local
+  socket instead of each loading their own model
+- RemoteFootballDetector: FootballDetector whose detect_* calls go to the
+  inference server, so process_video* work unchanged
+
+Pools are per inference backend (torch, onnx, onnx-int8; see
+inference_backends), so analyses can pick their backend.
+
+Configuration (environment):
+    CV_DETECTOR_POOL_SIZE   detectors per pool (default 1)
+    CV_INFERENCE_ADDRESS    host:port of an inference server; unset = in-process models
+    CV_INFERENCE_AUTHKEY    shared secret for the inference server socket
+                            (required with CV_INFERENCE_ADDRESS; no default)
+    CV_PRELOAD_DETECTORS    1 = warm the pool when the API starts
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .detector import FootballDetector
+from .inference_backends import DEFAULT_BACKEND, validate_backend
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("CV_DETECTOR_POOL_SIZE", 1))
+INFERENCE_ADDRESS = os.getenv("CV_INFERENCE_ADDRESS")
+INFERENCE_AUTHKEY = os.getenv("CV_INFERENCE_AUTHKEY", "").encode() or None
+PRELOAD_DETECTORS = os.getenv("CV_PRELOAD_DETECTORS", "0") == "1"
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def require_authkey(authkey: Optional[bytes]) -> bytes:
+    """The inference socket is never opened with a default or empty secret"""
+    if not authkey:
+        raise ValueError("No inference server secret (set CV_INFERENCE_AUTHKEY)")
+    return authkey
+
+
+class InferenceClient:
+    """Connection to an InferenceServer (one request at a time per client)"""
+
+    def __init__(self, address: str = INFERENCE_ADDRESS, authkey: Optional[bytes] = INFERENCE_AUTHKEY):
+        if not address:
+            raise ValueError("No inference server address (set CV_INFERENCE_ADDRESS)")
+        self.address = parse_address(address)
+        self.authkey = require_authkey(authkey)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _request(self, *message):
+        with self._lock:
+            # One reconnect: the server may have restarted since the last call
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = Client(self.address, authkey=self.authkey)
+                    self._conn.send(message)
+                    status, payload = self._conn.recv()
+                    break
+                except (EOFError, ConnectionError, OSError):
+                    self.close()
+                    if attempt:
+                        raise
+        if status != "ok":
+            raise RuntimeError(f"Inference server error: {payload}")
+        return payload
+
+    def info(self) -> Dict:
+        return self._request("info")
+
+    def detect_batch(self, images: List[np.ndarray], confidence: float = 0.5,
+                     backend: Optional[str] = None) -> List[List[Dict]]:
+        return self._request("detect", images, confidence, backend)
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+
+class RemoteFootballDetector(FootballDetector):
+    """FootballDetector backed by an InferenceServer instead of a local model"""
+
+    def __init__(self, address: str = INFERENCE_ADDRESS, authkey: Optional[bytes] = INFERENCE_AUTHKEY,
+                 backend: str = DEFAULT_BACKEND):
+        self.client = InferenceClient(address, authkey)
+        super().__init__(backend=backend)
+
+    def load_model(self):
+        info = self.client.info()
+        self.model_path = info['model_path']
+        self.class_names = {int(k): v for k, v in info['class_names'].items()}
+        logger.info(f"Using inference server at {self.client.address[0]}:{self.client.address[1]} "
+                    f"({self.model_path}, {self.backend})")
+
+    def detect_objects(self, image: np.ndarray, confidence: float = 0.5) -> List[Dict]:
+        return self.client.detect_batch([image], confidence=confidence, backend=self.backend)[0]
+
+    def detect_batch(self, images: List[np.ndarray], confidence: float = 0.5) -> List[List[Dict]]:
+        if not images:
+            return []
+        return self.client.detect_batch(images, confidence=confidence, backend=self.backend)
+
+
+def create_detector(model_path: Optional[str] = None, backend: str = DEFAULT_BACKEND) -> FootballDetector:
+    """Remote detector when CV_INFERENCE_ADDRESS is set, local model otherwise"""
+    if INFERENCE_ADDRESS:
+        return RemoteFootballDetector(backend=backend)
+    return FootballDetector(model_path, backend=backend)
+
+
+class DetectorPool:
+    """
+    Up to `size` warm detectors shared by the threads of a process
+
+    Detectors are created on demand (or upfront with warm()) and reused;
+    acquire() blocks while all of them are checked out.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, factory: Callable[[], FootballDetector] = create_detector):
+        self.size = max(1, size)
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create(self) -> FootballDetector:
+        start = time.perf_counter()
+        try:
+            detector = self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        logger.info(f"🔥 Detector {self._created}/{self.size} ready in {time.perf_counter() - start:.1f}s")
+        return detector
+
+    def _reserve(self) -> bool:
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def warm(self, count: Optional[int] = None):
+        """Create detectors now (default: fill the pool)"""
+        for _ in range(self.size if count is None else count):
+            if not self._reserve():
+                break
+            self._idle.put(self._create())
+
+    def warm_async(self, count: Optional[int] = None) -> threading.Thread:
+        """warm() in a background thread (API startup stays fast)"""
+        def run():
+            try:
+                self.warm(count)
+            except Exception as e:
+                logger.error(f"❌ Detector warm-up failed: {e}")
+        thread = threading.Thread(target=run, name="detector-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a detector for the duration of the with block"""
+        try:
+            detector = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve():
+                detector = self._create()
+            else:
+                try:
+                    detector = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No detector available after {timeout}s (pool size {self.size})")
+        try:
+            yield detector
+        finally:
+            self._idle.put(detector)
+
+    def stats(self) -> Dict:
+        return {'size': self.size, 'created': self._created, 'idle': self._idle.qsize(),
+                'remote': bool(INFERENCE_ADDRESS)}
+
+
+_pools: Dict[str, DetectorPool] = {}
+_pool_lock = threading.Lock()
+
+
+def get_detector_pool(backend: str = DEFAULT_BACKEND) -> DetectorPool:
+    """Process-wide DetectorPool for an inference backend"""
+    validate_backend(backend)
+    with _pool_lock:
+        if backend not in _pools:
+            _pools[backend] = DetectorPool(factory=lambda: create_detector(backend=backend))
+        return _pools[backend]
+
+
+class InferenceServer:
+    """
+    Serves detect_batch requests from other processes
+
+    Each client connection is handled by its own thread, which checks out
+    a detector from the pool of the requested backend per request; with
+    pool size N, N batches per backend run concurrently. The default
+    backend's pool is warmed at start, others on first request.
+    """
+
+    def __init__(self, address: str, pool_size: int = POOL_SIZE,
+                 authkey: Optional[bytes] = INFERENCE_AUTHKEY, model_path: Optional[str] = None,
+                 default_backend: str = DEFAULT_BACKEND):
+        self.address = parse_address(address)
+        self.pool_size = pool_size
+        self.model_path = model_path
+        self.default_backend = validate_backend(default_backend)
+        self.pools: Dict[str, DetectorPool] = {}
+        self._pools_lock = threading.Lock()
+        self.authkey = require_authkey(authkey)
+        self._listener = None
+        self._stop = threading.Event()
+        self._info = None
+        self.requests = 0
+
+    def pool(self, backend: Optional[str] = None) -> DetectorPool:
+        backend = validate_backend(backend or self.default_backend)
+        with self._pools_lock:
+            if backend not in self.pools:
+                self.pools[backend] = DetectorPool(
+                    self.pool_size, factory=lambda: FootballDetector(self.model_path, backend=backend)
+                )
+            return self.pools[backend]
+
+    def _handle(self, conn):
+        try:
+            while not self._stop.is_set():
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+                try:
+                    if message[0] == "detect":
+                        _, images, confidence, backend = message
+                        with self.pool(backend).acquire() as detector:
+                            payload = detector.detect_batch(images, confidence=confidence)
+                        self.requests += 1
+                    elif message[0] == "info":
+                        payload = {**self._info,
+                                   'pools': {name: pool.stats() for name, pool in self.pools.items()}}
+                    else:
+                        raise ValueError(f"Unknown request: {message[0]}")
+                    conn.send(("ok", payload))
+                except Exception as e:
+                    logger.error(f"❌ Inference request failed: {e}")
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        pool = self.pool()
+        pool.warm()
+        with pool.acquire() as detector:
+            self._info = {'model_path': detector.model_path, 'class_names': detector.class_names}
+        self._listener = Listener(self.address, authkey=self.authkey)
+        logger.info(f"🎬 Inference server on {self.address[0]}:{self.address[1]} "
+                    f"({pool.size} {self.default_backend} detector(s) per backend)")
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError):
+                    if self._stop.is_set():
+                        break
+                    raise
+                except Exception as e:
+                    # e.g. AuthenticationError from a client with the wrong key
+                    logger.warning(f"⚠️ Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.close()
@@ -0,0 +1,207 @@
+"""
+Pitch Region of Interest for Detection
+
+Stands, scoreboards and advertising boards cost inference pixels and
+produce false positives. PitchROI finds the pitch in the frame and the
+detector only runs on that region:
+- Grass mask: HSV threshold on a downscaled frame; rows/columns that are
+  mostly grass give the pitch bounding region
+- Keypoint homography (optional): with >= 4 pitch keypoints of known
+  position, the projected pitch outline gives the region even where the
+  grass colour is off (shadows, worn areas)
+- The region is refreshed every refresh_every frames (camera pans are slow)
+- Detected people whose feet fall off the (dilated) grass mask are dropped
+
+When too little grass is visible (close-ups, crowd shots) the full frame
+is used.
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .camera_model import PERSON_CLASSES, PITCH_LENGTH, PITCH_WIDTH, CameraModel
+
+logger = logging.getLogger(__name__)
+
+# (x1, y1, scale, mask, mask_scale) needed to map detections on a crop back
+# to the frame and look their feet up in the grass mask
+CropTransform = Tuple[int, int, float, Optional[np.ndarray], float]
+
+
+class PitchROI:
+    """Per-video pitch region tracker (frames are expected in increasing order)"""
+
+    def __init__(self, refresh_every: int = 25, min_grass_ratio: float = 0.15,
+                 line_ratio: float = 0.3, margin: float = 0.03, head_room: float = 0.08,
+                 max_side: Optional[int] = None, filter_people: bool = True,
+                 keypoint_detector: Optional[Callable] = None, mask_width: int = 320):
+        """
+        Args:
+            refresh_every: Frames between region updates
+            min_grass_ratio: Below this share of grass pixels the full frame is used
+            line_ratio: Share of grass a row/column needs to count as pitch
+            margin: Padding around the region (fraction of the frame size)
+            head_room: Extra padding above the region (players near the far
+                touchline stand on the grass but their bodies do not)
+            max_side: Downscale crops so their longest side is at most this
+                (None = leave resizing to the model)
+            filter_people: Drop player/goalkeeper/referee boxes whose feet are off the pitch
+            keypoint_detector: frame -> list of PitchKeypoint (e.g.
+                AdvancedFootballDetector.detect_pitch_keypoints); None = grass only
+            mask_width: Width of the downscaled frame used for the grass mask
+        """
+        self.refresh_every = max(1, refresh_every)
+        self.min_grass_ratio = min_grass_ratio
+        self.line_ratio = line_ratio
+        self.margin = margin
+        self.head_room = head_room
+        self.max_side = max_side
+        self.filter_people = filter_people
+        self.keypoint_detector = keypoint_detector
+        self.mask_width = mask_width
+        self.reset()
+
+    def config(self) -> Dict:
+        """Constructor arguments (to rebuild the ROI in a worker process; no keypoint detector)"""
+        return {
+            'refresh_every': self.refresh_every, 'min_grass_ratio': self.min_grass_ratio,
+            'line_ratio': self.line_ratio, 'margin': self.margin, 'head_room': self.head_room,
+            'max_side': self.max_side, 'filter_people': self.filter_people,
+            'mask_width': self.mask_width
+        }
+
+    def reset(self):
+        self._last_refresh = None
+        self.region = None
+        self.mask = None
+        self.mask_scale = 1.0
+        self.refreshes = 0
+        self.full_frame_refreshes = 0
+        self.homography_refreshes = 0
+        self.pixels_in = 0
+        self.pixels_out = 0
+        self.filtered = 0
+
+    def grass_mask(self, frame: np.ndarray) -> np.ndarray:
+        """Binary grass mask (uint8, 0/255) of the frame downscaled to mask_width"""
+        height, width = frame.shape[:2]
+        size = (self.mask_width, max(1, round(height * self.mask_width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, (35, 40, 40), (85, 255, 255))
+
+    def _keypoint_region(self, frame: np.ndarray) -> Optional[Tuple[float, float, float, float]]:
+        """Bounding box of the pitch outline projected with a keypoint homography"""
+        height, width = frame.shape[:2]
+        camera = CameraModel.from_keypoints(self.keypoint_detector(frame), (width, height))
+        if camera is None:
+            return None  # too few keypoints, or all on one line
+        outline = np.float32([[0, 0], [PITCH_LENGTH, 0], [PITCH_LENGTH, PITCH_WIDTH], [0, PITCH_WIDTH]])
+        projected = camera.pitch_to_image(outline)
+        return projected[:, 0].min(), projected[:, 1].min(), projected[:, 0].max(), projected[:, 1].max()
+
+    def refresh(self, frame: np.ndarray):
+        """Recompute the pitch region and mask from this frame"""
+        height, width = frame.shape[:2]
+        mask = self.grass_mask(frame)
+        grass = mask > 0
+        self.refreshes += 1
+
+        region = None
+        if self.keypoint_detector is not None:
+            region = self._keypoint_region(frame)
+            if region is not None:
+                self.homography_refreshes += 1
+
+        if region is None and grass.mean() >= self.min_grass_ratio:
+            # Rows/columns that are mostly grass: robust to green in the crowd or on boards
+            rows = np.flatnonzero(grass.mean(axis=1) >= self.line_ratio)
+            cols = np.flatnonzero(grass.mean(axis=0) >= self.line_ratio)
+            if len(rows) and len(cols):
+                scale = width / mask.shape[1]
+                region = (cols[0] * scale, rows[0] * scale, (cols[-1] + 1) * scale, (rows[-1] + 1) * scale)
+
+        if region is None:
+            self.region, self.mask = None, None
+            self.full_frame_refreshes += 1
+            return
+
+        x1, y1, x2, y2 = region
+        pad_x, pad_y = self.margin * width, self.margin * height
+        self.region = (
+            int(max(0, x1 - pad_x)), int(max(0, y1 - pad_y - self.head_room * height)),
+            int(min(width, x2 + pad_x)), int(min(height, y2 + pad_y))
+        )
+        # Dilated so players on the touchline and worn patches still count as pitch
+        self.mask = cv2.dilate(mask, np.ones((9, 9), np.uint8)) if self.filter_people else None
+        self.mask_scale = mask.shape[1] / width
+
+    def prepare(self, frame_number: int, frame: np.ndarray) -> Tuple[np.ndarray, CropTransform]:
+        """(image to detect on, transform for restore()) for a frame"""
+        if self._last_refresh is None or frame_number - self._last_refresh >= self.refresh_every:
+            self.refresh(frame)
+            self._last_refresh = frame_number
+
+        height, width = frame.shape[:2]
+        self.pixels_in += height * width
+        if self.region is None:
+            self.pixels_out += height * width
+            return frame, (0, 0, 1.0, None, 1.0)
+
+        x1, y1, x2, y2 = self.region
+        crop = frame[y1:y2, x1:x2]
+        scale = 1.0
+        if self.max_side and max(crop.shape[:2]) > self.max_side:
+            scale = self.max_side / max(crop.shape[:2])
+            crop = cv2.resize(crop, (max(1, round(crop.shape[1] * scale)), max(1, round(crop.shape[0] * scale))),
+                              interpolation=cv2.INTER_AREA)
+        self.pixels_out += crop.shape[0] * crop.shape[1]
+        return crop, (x1, y1, scale, self.mask, self.mask_scale)
+
+    def restore(self, detections: List[Dict], transform: CropTransform) -> List[Dict]:
+        """Map detections on a crop back to frame coordinates and drop off-pitch people"""
+        x1, y1, scale, mask, mask_scale = transform
+        if (x1, y1, scale) == (0, 0, 1.0) and mask is None:
+            return detections
+
+        restored = []
+        for det in detections:
+            bx1, by1, bx2, by2 = det['bbox']
+            bbox = [bx1 / scale + x1, by1 / scale + y1, bx2 / scale + x1, by2 / scale + y1]
+            if mask is not None and det['class_name'] in PERSON_CLASSES:
+                fx = int(min(mask.shape[1] - 1, max(0, (bbox[0] + bbox[2]) / 2 * mask_scale)))
+                fy = int(min(mask.shape[0] - 1, max(0, bbox[3] * mask_scale)))
+                if not mask[fy, fx]:
+                    self.filtered += 1
+                    continue
+            restored.append({
+                **det,
+                'bbox': bbox,
+                'center': [(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2],
+                'area': det['area'] / (scale * scale)
+            })
+        return restored
+
+    def stats(self) -> Dict:
+        return {
+            'refreshes': self.refreshes,
+            'full_frame_refreshes': self.full_frame_refreshes,
+            'homography_refreshes': self.homography_refreshes,
+            'pixel_ratio': round(self.pixels_out / self.pixels_in, 3) if self.pixels_in else None,
+            'filtered_detections': self.filtered
+        }
+
+
+def merge_roi_stats(stats: list) -> Optional[Dict]:
+    """Combine per-segment PitchROI stats (process_video_parallel)"""
+    stats = [s for s in stats if s]
+    if not stats:
+        return None
+    merged = {key: sum(s[key] for s in stats)
+              for key in ('refreshes', 'full_frame_refreshes', 'homography_refreshes', 'filtered_detections')}
+    ratios = [s['pixel_ratio'] for s in stats if s['pixel_ratio'] is not None]
+    merged['pixel_ratio'] = round(float(np.mean(ratios)), 3) if ratios else None
+    return merged
@@ -0,0 +1,260 @@
+"""
+Process-pool Rendering Engine for Video Overlays
+
+Overlay rendering is CPU-bound (decode, tactical report, drawing, encode),
+so it runs outside the API process:
+- A shared spawn-context process pool renders contiguous frame ranges
+  of a video into segment files
+- A coordinator thread per job tracks progress and stitches the segments
+  into the final video
+- Job status is persisted in the video_visualizations table, so any API
+  process can answer status/download requests
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("VIZ_RENDER_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+OUTPUT_DIR = Path("uploads/visualizations")
+MIN_SEGMENT_FRAMES = 150
+
+
+class RenderStatusStore:
+    """Persisted status of overlay rendering jobs"""
+
+    TABLES_DDL = """
+        CREATE TABLE IF NOT EXISTS video_visualizations (
+            processing_id VARCHAR(36) PRIMARY KEY,
+            analysis_id VARCHAR(36) REFERENCES video_analysis(analysis_id) ON DELETE CASCADE,
+            visualization_type VARCHAR(20),
+            status VARCHAR(20) NOT NULL DEFAULT 'starting',
+            progress FLOAT NOT NULL DEFAULT 0,
+            message TEXT,
+            video_url TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_video_visualizations_analysis ON video_visualizations(analysis_id);
+    """
+
+    FIELDS = ("status", "progress", "message", "video_url")
+
+    def __init__(self, db):
+        self.db = db
+        self._ready = False
+
+    def ensure_tables(self):
+        if not self._ready:
+            self.db.execute_query(self.TABLES_DDL)
+            self._ready = True
+
+    def create(self, processing_id: str, analysis_id: str, visualization_type: str):
+        self.ensure_tables()
+        self.db.execute_query("""
+            INSERT INTO video_visualizations (processing_id, analysis_id, visualization_type, status, progress, message)
+            VALUES (%s, %s, %s, 'starting', 0, 'Initializing video processing...')
+        """, (processing_id, analysis_id, visualization_type))
+
+    def update(self, processing_id: str, **fields):
+        columns = [name for name in self.FIELDS if name in fields]
+        if not columns:
+            return
+        assignments = ", ".join(f"{name} = %s" for name in columns)
+        self.db.execute_query(
+            f"UPDATE video_visualizations SET {assignments}, updated_at = NOW() WHERE processing_id = %s",
+            tuple(fields[name] for name in columns) + (processing_id,)
+        )
+
+    def get(self, processing_id: str) -> Optional[Dict]:
+        self.ensure_tables()
+        rows = self.db.query_to_dict("""
+            SELECT status, progress, message, video_url
+            FROM video_visualizations
+            WHERE processing_id = %s
+        """, (processing_id,))
+        return rows[0] if rows else None
+
+
+def split_frame_ranges(total_frames: int, workers: int,
+                       min_frames: int = MIN_SEGMENT_FRAMES) -> List[Tuple[int, int]]:
+    """Split [0, total_frames) into up to `workers` contiguous ranges of at least min_frames"""
+    chunks = max(1, min(workers, total_frames // max(1, min_frames)))
+    bounds = [round(i * total_frames / chunks) for i in range(chunks + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(chunks)]
+
+
+def stitch_segments(segment_paths: List[str], output_path: str, frame_rate: int,
+                    size: Tuple[int, int]):
+    """
+    Concatenate segment videos in order. Uses ffmpeg's concat demuxer
+    (no re-encode) when available, otherwise re-writes frames with OpenCV.
+    """
+    if len(segment_paths) == 1:
+        os.replace(segment_paths[0], output_path)
+        return
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        list_path = f"{output_path}.txt"
+        with open(list_path, "w") as f:
+            for path in segment_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+        try:
+            subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", output_path],
+                check=True
+            )
+            return
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"⚠️ ffmpeg concat failed ({e}), falling back to OpenCV")
+        finally:
+            os.remove(list_path)
+
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), frame_rate, size)
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    finally:
+        out.release()
+
+
+class RenderEngine:
+    """
+    Shared process pool for overlay rendering
+
+    render_fn is a module-level function (picklable) called in a worker as
+        render_fn(start_frame, end_frame, segment_path, progress, progress_key, *args)
+    It renders frames [start_frame, end_frame) into segment_path, stores the
+    number of frames done so far in progress[progress_key] and returns the
+    number of frames written.
+    """
+
+    def __init__(self, db_factory: Callable, max_workers: int = RENDER_WORKERS):
+        self.db_factory = db_factory
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._manager = None
+        self._progress = None
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: workers must not inherit the API's threads / event loop
+                context = multiprocessing.get_context("spawn")
+                if self._manager is None:
+                    self._manager = context.Manager()
+                    self._progress = self._manager.dict()
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                logger.info(f"🎬 Render pool started with {self.max_workers} worker(s)")
+            return self._pool
+
+    def _reset_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def submit(self, processing_id: str, render_fn: Callable, total_frames: int,
+               frame_rate: int, size: Tuple[int, int], args: tuple = ()) -> str:
+        """Start rendering in the background; returns the final output path"""
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = str(OUTPUT_DIR / f"{processing_id}.mp4")
+        segments = split_frame_ranges(total_frames, self.max_workers)
+
+        thread = threading.Thread(
+            target=self._run_job,
+            args=(processing_id, render_fn, segments, output_path, frame_rate, size, args),
+            name=f"render-{processing_id[:8]}",
+            daemon=True
+        )
+        thread.start()
+        return output_path
+
+    def _run_job(self, processing_id, render_fn, segments, output_path, frame_rate, size, args):
+        db = self.db_factory()
+        store = RenderStatusStore(db)
+        total_frames = max(1, segments[-1][1])
+        segment_paths = [
+            str(OUTPUT_DIR / f"{processing_id}_part{index:03d}.mp4") for index in range(len(segments))
+        ]
+        keys = [f"{processing_id}:{index}" for index in range(len(segments))]
+        pool = None
+        futures = []
+        try:
+            pool = self._ensure_pool()
+            store.update(processing_id, status="processing",
+                         message=f"Processing {total_frames} frames in {len(segments)} segment(s)...")
+            futures = [
+                pool.submit(render_fn, start, end, path, self._progress, key, *args)
+                for (start, end), path, key in zip(segments, segment_paths, keys)
+            ]
+
+            pending = futures
+            while pending:
+                done, pending = wait(pending, timeout=1.0, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    if future.exception() is not None:
+                        raise future.exception()
+                frames_done = sum(self._progress.get(key, 0) for key in keys)
+                store.update(processing_id,
+                             progress=min(99.0, frames_done / total_frames * 100),
+                             message=f"Processing frame {frames_done}/{total_frames}")
+
+            frames_written = sum(future.result() for future in futures)
+
+            store.update(processing_id, message="Stitching segments...")
+            stitch_segments(segment_paths, output_path, frame_rate, size)
+
+            store.update(processing_id, status="completed", progress=100.0,
+                         message="Video processing completed successfully", video_url=output_path)
+            logger.info(f"✅ Visualization {processing_id}: {frames_written} frames -> {output_path}")
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and pool is not None:
+                self._reset_pool(pool)
+            logger.error(f"❌ Visualization {processing_id} failed: {e}")
+            try:
+                store.update(processing_id, status="failed", message=f"Error: {str(e)}")
+            except Exception as db_err:
+                logger.error(f"Failed to update status for {processing_id}: {db_err}")
+        finally:
+            # Let segments still rendering finish before removing their files
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            if self._progress is not None:
+                for key in keys:
+                    self._progress.pop(key, None)
+            for path in segment_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            db.close()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+                self._progress = None
@@ -13,6 +13,9 @@ from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import math
 from collections import defaultdict
+from scipy.spatial.distance import pdist, cdist
+
+from .camera_model import PITCH_LENGTH, PITCH_WIDTH, CameraModel
 
 @dataclass
 class PlayerPosition:
@@ -32,10 +35,63 @@ class TacticalMetrics:
     alignment_scores: Dict[str, float]
     sector_analysis: Dict[str, any]
 
+TEAM_CODES = {'home': 0, 'away': 1, 'referee': 2}
+ROLE_CODES = {'goalkeeper': 0, 'defender': 1, 'midfielder': 2, 'forward': 3}
+HOME, AWAY = TEAM_CODES['home'], TEAM_CODES['away']
+
+SECTORS = ('defensive_third', 'middle_third', 'attacking_third')
+CORRIDORS = ('left_corridor', 'center_corridor', 'right_corridor')
+
+@dataclass
+class FramePositions:
+    """Array-backed players of one frame (unknown team/role codes are -1)"""
+    positions: np.ndarray   # (n, 2) float field coordinates
+    teams: np.ndarray       # (n,) int8 TEAM_CODES
+    roles: np.ndarray       # (n,) int8 ROLE_CODES
+    player_ids: np.ndarray  # (n,) int
+    
+    @classmethod
+    def from_players(cls, players: List[PlayerPosition]) -> "FramePositions":
+        return cls(
+            positions=np.array([p.position for p in players], dtype=float).reshape(-1, 2),
+            teams=np.array([TEAM_CODES.get(p.team, -1) for p in players], dtype=np.int8),
+            roles=np.array([ROLE_CODES.get(p.role, -1) for p in players], dtype=np.int8),
+            player_ids=np.array([p.player_id for p in players], dtype=int)
+        )
+    
+    def subset(self, mask: np.ndarray) -> "FramePositions":
+        return FramePositions(self.positions[mask], self.teams[mask], self.roles[mask], self.player_ids[mask])
+    
+    def __len__(self):
+        return len(self.positions)
+
+def _masked_mean_std(values: np.ndarray, mask: np.ndarray, axis) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and population std of values where mask, NaN where nothing is selected"""
+    count = mask.sum(axis=axis)
+    total = np.where(mask, values, 0.0).sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        centred = np.where(mask, values - np.expand_dims(mean, axis), 0.0)
+        std = np.sqrt((centred ** 2).sum(axis=axis) / count)
+    return mean, std
+
+def _masked_extrema(values: np.ndarray, mask: np.ndarray, axis) -> Tuple[np.ndarray, np.ndarray]:
+    """Min and max of values where mask, NaN where nothing is selected"""
+    empty = ~mask.any(axis=axis)
+    low = np.where(mask, values, np.inf).min(axis=axis)
+    high = np.where(mask, values, -np.inf).max(axis=axis)
+    return np.where(empty, np.nan, low), np.where(empty, np.nan, high)
+
 class TacticalAnalyzer:
-    """Advanced tactical analysis for football videos"""
+    """
+    Advanced tactical analysis for football videos
     
-    def __init__(self, field_length=105, field_width=68):
+    Per-frame methods accept a list of PlayerPosition or a FramePositions;
+    analyze_batch computes the main metrics for many frames at once
+    (camera_model.pitch_tracks builds its inputs from tracked detections).
+    """
+    
+    def __init__(self, field_length=PITCH_LENGTH, field_width=PITCH_WIDTH):
         # Standard football field dimensions in meters
         self.field_length = field_length
         self.field_width = field_width
@@ -48,186 +104,158 @@ class TacticalAnalyzer:
         # Corridor definitions (left, center, right)
         self.corridor_width = field_width / 3
         
-    def calculate_player_distances(self, players: List[PlayerPosition]) -> Dict[str, float]:
-        """Calculate distances between players for pressure analysis"""
-        distances = {}
-        
-        # Calculate distances between all players
-        for i, player1 in enumerate(players):
-            for j, player2 in enumerate(players[i+1:], i+1):
-                key = f"player_{player1.player_id}_to_{player2.player_id}"
-                distance = self._euclidean_distance(player1.position, player2.position)
-                distances[key] = distance
+        self.ball_pressure_radius = 10.0
+    
+    @staticmethod
+    def _as_frame(players) -> FramePositions:
+        return players if isinstance(players, FramePositions) else FramePositions.from_players(players)
+    
+    def _sector_index(self, x: np.ndarray) -> np.ndarray:
+        return np.searchsorted([self.defensive_third, self.defensive_third + self.middle_third], x, side='right')
+    
+    def _corridor_index(self, y: np.ndarray) -> np.ndarray:
+        return np.searchsorted([self.corridor_width, self.corridor_width * 2], y, side='right')
         
-        return distances
+    def calculate_player_distances(self, players) -> Dict[str, float]:
+        """Calculate distances between players for pressure analysis"""
+        frame = self._as_frame(players)
+        if len(frame) < 2:
+            return {}
+        
+        # pdist follows the upper-triangle (i < j) order of the original loop
+        distances = pdist(frame.positions).tolist()
+        first, second = np.triu_indices(len(frame), k=1)
+        ids = frame.player_ids.tolist()
+        return {
+            f"player_{ids[i]}_to_{ids[j]}": distance
+            for i, j, distance in zip(first.tolist(), second.tolist(), distances)
+        }
     
-    def analyze_pressure_levels(self, players: List[PlayerPosition], ball_position: Tuple[float, float]) -> Dict[str, float]:
+    def analyze_pressure_levels(self, players, ball_position: Tuple[float, float]) -> Dict[str, float]:
         """Analyze pressure levels around the ball and key areas"""
+        frame = self._as_frame(players)
         pressure_metrics = {}
         
         # Find players near the ball (within 10 meters)
-        ball_pressure_radius = 10.0
-        players_near_ball = []
-        all_distances_to_ball = []
-        
-        for player in players:
-            distance_to_ball = self._euclidean_distance(player.position, ball_position)
-            all_distances_to_ball.append(distance_to_ball)
-            if distance_to_ball <= ball_pressure_radius:
-                players_near_ball.append((player, distance_to_ball))
+        ball_pressure_radius = self.ball_pressure_radius
+        distances = np.hypot(*(frame.positions - np.asarray(ball_position, dtype=float)).T)
+        near = distances <= ball_pressure_radius
+        home_near = distances[near & (frame.teams == HOME)]
+        away_near = distances[near & (frame.teams == AWAY)]
         
         # Calculate pressure intensity and distances
-        pressure_metrics['ball_pressure_intensity'] = len(players_near_ball)
-        pressure_metrics['avg_distance_to_ball'] = round(np.mean([d for _, d in players_near_ball]), 2) if players_near_ball else 0
-        pressure_metrics['min_distance_to_ball'] = round(min(all_distances_to_ball), 2) if all_distances_to_ball else 0
-        pressure_metrics['max_distance_to_ball'] = round(max(all_distances_to_ball), 2) if all_distances_to_ball else 0
-        pressure_metrics['avg_all_distances_to_ball'] = round(np.mean(all_distances_to_ball), 2) if all_distances_to_ball else 0
+        pressure_metrics['ball_pressure_intensity'] = int(near.sum())
+        pressure_metrics['avg_distance_to_ball'] = round(float(distances[near].mean()), 2) if near.any() else 0
+        pressure_metrics['min_distance_to_ball'] = round(float(distances.min()), 2) if len(frame) else 0
+        pressure_metrics['max_distance_to_ball'] = round(float(distances.max()), 2) if len(frame) else 0
+        pressure_metrics['avg_all_distances_to_ball'] = round(float(distances.mean()), 2) if len(frame) else 0
         
         # Team-specific pressure
-        home_pressure = len([p for p, d in players_near_ball if p.team == 'home'])
-        away_pressure = len([p for p, d in players_near_ball if p.team == 'away'])
-        
-        pressure_metrics['home_team_pressure'] = home_pressure
-        pressure_metrics['away_team_pressure'] = away_pressure
-        pressure_metrics['pressure_ratio'] = round(home_pressure / max(away_pressure, 1), 2)
+        pressure_metrics['home_team_pressure'] = len(home_near)
+        pressure_metrics['away_team_pressure'] = len(away_near)
+        pressure_metrics['pressure_ratio'] = round(len(home_near) / max(len(away_near), 1), 2)
         
         # Calculate pressure distance averages by team
-        home_distances = [d for p, d in players_near_ball if p.team == 'home']
-        away_distances = [d for p, d in players_near_ball if p.team == 'away']
-        
-        pressure_metrics['home_avg_pressure_distance'] = round(np.mean(home_distances), 2) if home_distances else 0
-        pressure_metrics['away_avg_pressure_distance'] = round(np.mean(away_distances), 2) if away_distances else 0
+        pressure_metrics['home_avg_pressure_distance'] = round(float(home_near.mean()), 2) if len(home_near) else 0
+        pressure_metrics['away_avg_pressure_distance'] = round(float(away_near.mean()), 2) if len(away_near) else 0
         
         # Additional pressure metrics
-        pressure_metrics['pressure_density'] = round(len(players_near_ball) / (ball_pressure_radius ** 2), 4)
-        pressure_metrics['total_players_analyzed'] = len(players)
+        pressure_metrics['pressure_density'] = round(int(near.sum()) / (ball_pressure_radius ** 2), 4)
+        pressure_metrics['total_players_analyzed'] = len(frame)
         
         return pressure_metrics
     
-    def analyze_defensive_formation(self, defensive_players: List[PlayerPosition]) -> Dict[str, any]:
+    def analyze_defensive_formation(self, defensive_players) -> Dict[str, any]:
         """Analyze defensive formation and alignment"""
-        if len(defensive_players) < 3:
+        frame = self._as_frame(defensive_players)
+        if len(frame) < 3:
             return {"error": "Not enough defensive players for analysis"}
         
         formation_analysis = {}
-        
-        # Sort defenders by x-position (depth)
-        sorted_defenders = sorted(defensive_players, key=lambda p: p.position[0])
+        x_positions, y_positions = frame.positions[:, 0], frame.positions[:, 1]
         
         # Calculate defensive line depth consistency
-        x_positions = [p.position[0] for p in sorted_defenders]
-        formation_analysis['defensive_line_depth_avg'] = round(np.mean(x_positions), 2)
-        formation_analysis['defensive_line_depth_std'] = round(np.std(x_positions), 2)
-        formation_analysis['defensive_line_compactness'] = round(max(x_positions) - min(x_positions), 2)
-        formation_analysis['defensive_line_min_depth'] = round(min(x_positions), 2)
-        formation_analysis['defensive_line_max_depth'] = round(max(x_positions), 2)
+        formation_analysis['defensive_line_depth_avg'] = round(float(x_positions.mean()), 2)
+        formation_analysis['defensive_line_depth_std'] = round(float(x_positions.std()), 2)
+        formation_analysis['defensive_line_compactness'] = round(float(np.ptp(x_positions)), 2)
+        formation_analysis['defensive_line_min_depth'] = round(float(x_positions.min()), 2)
+        formation_analysis['defensive_line_max_depth'] = round(float(x_positions.max()), 2)
         
         # Calculate width of defensive line
-        y_positions = [p.position[1] for p in sorted_defenders]
-        formation_analysis['defensive_width'] = round(max(y_positions) - min(y_positions), 2)
-        formation_analysis['defensive_width_avg'] = round(np.mean(y_positions), 2)
-        formation_analysis['defensive_width_std'] = round(np.std(y_positions), 2)
-        formation_analysis['defensive_left_position'] = round(min(y_positions), 2)
-        formation_analysis['defensive_right_position'] = round(max(y_positions), 2)
-        
-        # Analyze gaps between defenders
-        gaps = []
-        sorted_by_width = sorted(defensive_players, key=lambda p: p.position[1])
-        for i in range(len(sorted_by_width) - 1):
-            gap = abs(sorted_by_width[i+1].position[1] - sorted_by_width[i].position[1])
-            gaps.append(gap)
-        
-        formation_analysis['avg_gap_between_defenders'] = round(np.mean(gaps), 2) if gaps else 0
-        formation_analysis['min_gap_between_defenders'] = round(min(gaps), 2) if gaps else 0
-        formation_analysis['max_gap_between_defenders'] = round(max(gaps), 2) if gaps else 0
+        formation_analysis['defensive_width'] = round(float(np.ptp(y_positions)), 2)
+        formation_analysis['defensive_width_avg'] = round(float(y_positions.mean()), 2)
+        formation_analysis['defensive_width_std'] = round(float(y_positions.std()), 2)
+        formation_analysis['defensive_left_position'] = round(float(y_positions.min()), 2)
+        formation_analysis['defensive_right_position'] = round(float(y_positions.max()), 2)
+        
+        # Analyze gaps between neighbouring defenders across the width
+        gaps = np.diff(np.sort(y_positions))
+        
+        formation_analysis['avg_gap_between_defenders'] = round(float(gaps.mean()), 2)
+        formation_analysis['min_gap_between_defenders'] = round(float(gaps.min()), 2)
+        formation_analysis['max_gap_between_defenders'] = round(float(gaps.max()), 2)
         formation_analysis['total_defensive_gaps'] = len(gaps)
-        formation_analysis['gap_consistency'] = round(np.std(gaps), 2) if gaps else 0
+        formation_analysis['gap_consistency'] = round(float(gaps.std()), 2)
         
         return formation_analysis
     
-    def analyze_sectors_and_corridors(self, players: List[PlayerPosition]) -> Dict[str, any]:
+    def analyze_sectors_and_corridors(self, players) -> Dict[str, any]:
         """Analyze player distribution across field sectors and corridors"""
-        sector_analysis = {
-            'defensive_third': {'home': 0, 'away': 0, 'players': []},
-            'middle_third': {'home': 0, 'away': 0, 'players': []},
-            'attacking_third': {'home': 0, 'away': 0, 'players': []},
-            'left_corridor': {'home': 0, 'away': 0, 'players': []},
-            'center_corridor': {'home': 0, 'away': 0, 'players': []},
-            'right_corridor': {'home': 0, 'away': 0, 'players': []}
-        }
-        
-        for player in players:
-            x, y = player.position
-            
-            # Determine sector (thirds of the field)
-            if x < self.defensive_third:
-                sector = 'defensive_third'
-            elif x < self.defensive_third + self.middle_third:
-                sector = 'middle_third'
-            else:
-                sector = 'attacking_third'
-            
-            sector_analysis[sector][player.team] += 1
-            sector_analysis[sector]['players'].append(player.player_id)
-            
-            # Determine corridor
-            if y < self.corridor_width:
-                corridor = 'left_corridor'
-            elif y < self.corridor_width * 2:
-                corridor = 'center_corridor'
-            else:
-                corridor = 'right_corridor'
-            
-            sector_analysis[corridor][player.team] += 1
-            sector_analysis[corridor]['players'].append(player.player_id)
+        frame = self._as_frame(players)
+        home, away = frame.teams == HOME, frame.teams == AWAY
+        
+        sector_analysis = {}
+        for names, index in ((SECTORS, self._sector_index(frame.positions[:, 0])),
+                             (CORRIDORS, self._corridor_index(frame.positions[:, 1]))):
+            for code, name in enumerate(names):
+                in_zone = index == code
+                sector_analysis[name] = {
+                    'home': int((in_zone & home).sum()),
+                    'away': int((in_zone & away).sum()),
+                    'players': frame.player_ids[in_zone].tolist()
+                }
         
         return sector_analysis
     
-    def calculate_alignment_metrics(self, players: List[PlayerPosition]) -> Dict[str, float]:
+    def calculate_alignment_metrics(self, players) -> Dict[str, float]:
         """Calculate team alignment and formation metrics"""
-        home_players = [p for p in players if p.team == 'home']
-        away_players = [p for p in players if p.team == 'away']
-        
+        frame = self._as_frame(players)
         alignment_metrics = {}
         
-        for team_name, team_players in [('home', home_players), ('away', away_players)]:
-            if len(team_players) < 3:
+        for team_name, code in (('home', HOME), ('away', AWAY)):
+            team_positions = frame.positions[frame.teams == code]
+            if len(team_positions) < 3:
                 continue
-                
-            # Calculate team compactness (average distance between players)
-            distances = []
-            for i, p1 in enumerate(team_players):
-                for p2 in team_players[i+1:]:
-                    distances.append(self._euclidean_distance(p1.position, p2.position))
             
-            alignment_metrics[f'{team_name}_team_compactness'] = np.mean(distances) if distances else 0
-            alignment_metrics[f'{team_name}_team_spread'] = np.std(distances) if distances else 0
+            # Calculate team compactness (average distance between players)
+            distances = pdist(team_positions)
+            alignment_metrics[f'{team_name}_team_compactness'] = distances.mean()
+            alignment_metrics[f'{team_name}_team_spread'] = distances.std()
             
             # Calculate formation width and depth
-            x_positions = [p.position[0] for p in team_players]
-            y_positions = [p.position[1] for p in team_players]
-            
-            alignment_metrics[f'{team_name}_formation_width'] = max(y_positions) - min(y_positions)
-            alignment_metrics[f'{team_name}_formation_depth'] = max(x_positions) - min(x_positions)
+            x_positions, y_positions = team_positions[:, 0], team_positions[:, 1]
+            alignment_metrics[f'{team_name}_formation_width'] = np.ptp(y_positions)
+            alignment_metrics[f'{team_name}_formation_depth'] = np.ptp(x_positions)
             
             # Calculate center of mass
-            alignment_metrics[f'{team_name}_center_x'] = np.mean(x_positions)
-            alignment_metrics[f'{team_name}_center_y'] = np.mean(y_positions)
+            alignment_metrics[f'{team_name}_center_x'] = x_positions.mean()
+            alignment_metrics[f'{team_name}_center_y'] = y_positions.mean()
         
         return alignment_metrics
     
-    def generate_tactical_report(self, players: List[PlayerPosition], ball_position: Tuple[float, float]) -> TacticalMetrics:
+    def generate_tactical_report(self, players, ball_position: Tuple[float, float]) -> TacticalMetrics:
         """Generate comprehensive tactical analysis report"""
+        frame = self._as_frame(players)
         
         # Separate defensive players (assuming defenders are in defensive third)
-        defensive_players = [p for p in players if p.position[0] < self.defensive_third and p.team in ['home', 'away']]
+        defensive_mask = (frame.positions[:, 0] < self.defensive_third) & np.isin(frame.teams, (HOME, AWAY))
         
         # Calculate all metrics
-        pressure_levels = self.analyze_pressure_levels(players, ball_position)
-        formation_analysis = self.analyze_defensive_formation(defensive_players)
-        distance_metrics = self.calculate_player_distances(players)
-        alignment_scores = self.calculate_alignment_metrics(players)
-        sector_analysis = self.analyze_sectors_and_corridors(players)
+        pressure_levels = self.analyze_pressure_levels(frame, ball_position)
+        formation_analysis = self.analyze_defensive_formation(frame.subset(defensive_mask))
+        distance_metrics = self.calculate_player_distances(frame)
+        alignment_scores = self.calculate_alignment_metrics(frame)
+        sector_analysis = self.analyze_sectors_and_corridors(frame)
         
         return TacticalMetrics(
             pressure_levels=pressure_levels,
@@ -237,6 +265,97 @@ class TacticalAnalyzer:
             sector_analysis=sector_analysis
         )
     
+    def analyze_batch(self, positions: np.ndarray, teams, ball_positions: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Tactical metrics for a whole clip in one call
+        
+        Args:
+            positions: (frames, players, 2) field coordinates; NaN marks a
+                player absent from a frame
+            teams: (players,) team names or TEAM_CODES
+            ball_positions: (frames, 2) ball coordinates (NaN if unknown)
+        
+        Returns:
+            Dict of per-frame arrays with the same (unrounded) values as
+            generate_tactical_report: pressure counts and distances,
+            defensive line depth/width/gaps (NaN with fewer than 3
+            defenders), team compactness/width/depth/center (NaN with fewer
+            than 3 players), plus sector_counts and corridor_counts of
+            shape (frames, 3, 2) holding [home, away] per zone.
+        """
+        positions = np.asarray(positions, dtype=float)
+        ball_positions = np.asarray(ball_positions, dtype=float)
+        teams = np.asarray([TEAM_CODES.get(t, -1) if isinstance(t, str) else t for t in teams], dtype=np.int8)
+        frames = positions.shape[0]
+        
+        present = ~np.isnan(positions).any(axis=2)                       # (F, P)
+        x, y = positions[..., 0], positions[..., 1]
+        home = present & (teams == HOME)
+        away = present & (teams == AWAY)
+        
+        metrics = {}
+        
+        # Pressure around the ball
+        to_ball = np.hypot(x - ball_positions[:, :1], y - ball_positions[:, 1:])
+        reachable = present & ~np.isnan(to_ball)
+        near = reachable & (to_ball <= self.ball_pressure_radius)
+        metrics['ball_pressure_intensity'] = near.sum(axis=1)
+        metrics['home_team_pressure'] = (near & home).sum(axis=1)
+        metrics['away_team_pressure'] = (near & away).sum(axis=1)
+        metrics['avg_distance_to_ball'] = np.nan_to_num(_masked_mean_std(to_ball, near, 1)[0])
+        low, high = _masked_extrema(to_ball, reachable, 1)
+        metrics['min_distance_to_ball'] = np.nan_to_num(low)
+        metrics['max_distance_to_ball'] = np.nan_to_num(high)
+        metrics['avg_all_distances_to_ball'] = np.nan_to_num(_masked_mean_std(to_ball, reachable, 1)[0])
+        metrics['home_avg_pressure_distance'] = np.nan_to_num(_masked_mean_std(to_ball, near & home, 1)[0])
+        metrics['away_avg_pressure_distance'] = np.nan_to_num(_masked_mean_std(to_ball, near & away, 1)[0])
+        
+        # Defensive line: home/away players inside the defensive third
+        defenders = (home | away) & (x < self.defensive_third)
+        enough = defenders.sum(axis=1) >= 3
+        depth_avg, depth_std = _masked_mean_std(x, defenders, 1)
+        left, right = _masked_extrema(y, defenders, 1)
+        gaps = np.diff(np.sort(np.where(defenders, y, np.nan), axis=1), axis=1)
+        has_gap = ~np.isnan(gaps)
+        gap_avg, gap_std = _masked_mean_std(np.nan_to_num(gaps), has_gap, 1)
+        metrics['defensive_players'] = defenders.sum(axis=1)
+        metrics['defensive_line_depth_avg'] = np.where(enough, depth_avg, np.nan)
+        metrics['defensive_line_depth_std'] = np.where(enough, depth_std, np.nan)
+        metrics['defensive_width'] = np.where(enough, right - left, np.nan)
+        metrics['avg_gap_between_defenders'] = np.where(enough, gap_avg, np.nan)
+        metrics['max_gap_between_defenders'] = np.where(enough, _masked_extrema(np.nan_to_num(gaps), has_gap, 1)[1], np.nan)
+        metrics['gap_consistency'] = np.where(enough, gap_std, np.nan)
+        
+        # Team shape from the (F, P, P) pairwise distance tensor
+        deltas = positions[:, :, None, :] - positions[:, None, :, :]
+        pairwise = np.sqrt((deltas ** 2).sum(axis=-1))
+        upper = np.triu(np.ones(pairwise.shape[1:], dtype=bool), k=1)
+        for team_name, in_team in (('home', home), ('away', away)):
+            pairs = in_team[:, :, None] & in_team[:, None, :] & upper
+            valid = in_team.sum(axis=1) >= 3
+            compactness, spread = _masked_mean_std(np.nan_to_num(pairwise), pairs, (1, 2))
+            x_low, x_high = _masked_extrema(x, in_team, 1)
+            y_low, y_high = _masked_extrema(y, in_team, 1)
+            metrics[f'{team_name}_team_compactness'] = np.where(valid, compactness, np.nan)
+            metrics[f'{team_name}_team_spread'] = np.where(valid, spread, np.nan)
+            metrics[f'{team_name}_formation_width'] = np.where(valid, y_high - y_low, np.nan)
+            metrics[f'{team_name}_formation_depth'] = np.where(valid, x_high - x_low, np.nan)
+            metrics[f'{team_name}_center_x'] = np.where(valid, _masked_mean_std(x, in_team, 1)[0], np.nan)
+            metrics[f'{team_name}_center_y'] = np.where(valid, _masked_mean_std(y, in_team, 1)[0], np.nan)
+        
+        # Sector / corridor occupancy per team
+        sector = self._sector_index(np.nan_to_num(x))
+        corridor = self._corridor_index(np.nan_to_num(y))
+        for name, index in (('sector_counts', sector), ('corridor_counts', corridor)):
+            counts = np.zeros((frames, 3, 2), dtype=int)
+            for zone in range(3):
+                in_zone = index == zone
+                counts[:, zone, 0] = (in_zone & home).sum(axis=1)
+                counts[:, zone, 1] = (in_zone & away).sum(axis=1)
+            metrics[name] = counts
+        
+        return metrics
+    
     def _euclidean_distance(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
         """Calculate Euclidean distance between two positions"""
         return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
@@ -244,24 +363,35 @@ class TacticalAnalyzer:
 class VideoTacticalVisualizer:
     """Visualize tactical analysis on video frames"""
     
-    def __init__(self, tactical_analyzer: TacticalAnalyzer):
+    def __init__(self, tactical_analyzer: TacticalAnalyzer, camera: Optional[CameraModel] = None):
+        """
+        camera: pixel <-> pitch projection of the video; None maps the whole
+        frame onto the pitch (synthetic frames, uncalibrated video)
+        """
         self.analyzer = tactical_analyzer
+        self.camera = camera
+    
+    def _camera_for(self, width: int, height: int) -> CameraModel:
+        if self.camera is not None:
+            return self.camera
+        return CameraModel.linear((width, height), self.analyzer.field_length, self.analyzer.field_width)
         
     def draw_tactical_overlay(self, frame: np.ndarray, players: List[PlayerPosition], 
-                            ball_position: Tuple[float, float], metrics: TacticalMetrics) -> np.ndarray:
-        """Draw comprehensive tactical overlay on video frame"""
+                            ball_position: Tuple[float, float], metrics: TacticalMetrics,
+                            camera: Optional[CameraModel] = None) -> np.ndarray:
+        """Draw comprehensive tactical overlay on video frame (camera overrides the visualizer's)"""
         
         height, width = frame.shape[:2]
         overlay = frame.copy()
+        camera = camera or self._camera_for(width, height)
         
         # Convert field coordinates to pixel coordinates
         def field_to_pixel(field_pos):
-            x_ratio = field_pos[0] / self.analyzer.field_length
-            y_ratio = field_pos[1] / self.analyzer.field_width
-            return (int(x_ratio * width), int(y_ratio * height))
+            x, y = camera.pitch_to_image(field_pos)[0]
+            return (int(x), int(y))
         
         # Draw field sectors
-        self._draw_field_sectors(overlay, width, height)
+        self._draw_field_sectors(overlay, camera)
         
         # Draw players with enhanced information
         self._draw_enhanced_players(overlay, players, field_to_pixel)
@@ -284,17 +414,20 @@ class VideoTacticalVisualizer:
         
         return overlay
     
-    def _draw_field_sectors(self, frame: np.ndarray, width: int, height: int):
-        """Draw field sectors and corridors"""
-        # Draw thirds
-        third_width = width // 3
-        cv2.line(frame, (third_width, 0), (third_width, height), (100, 100, 100), 1)
-        cv2.line(frame, (third_width * 2, 0), (third_width * 2, height), (100, 100, 100), 1)
-        
-        # Draw corridors
-        corridor_height = height // 3
-        cv2.line(frame, (0, corridor_height), (width, corridor_height), (100, 100, 100), 1)
-        cv2.line(frame, (0, corridor_height * 2), (width, corridor_height * 2), (100, 100, 100), 1)
+    def _draw_field_sectors(self, frame: np.ndarray, camera: CameraModel):
+        """Draw field sectors and corridors (projected through the camera model)"""
+        length, width = self.analyzer.field_length, self.analyzer.field_width
+        lines = np.array([
+            # Thirds
+            [[length / 3, 0], [length / 3, width]],
+            [[length * 2 / 3, 0], [length * 2 / 3, width]],
+            # Corridors
+            [[0, width / 3], [length, width / 3]],
+            [[0, width * 2 / 3], [length, width * 2 / 3]],
+        ])
+        pixels = camera.pitch_to_image(lines.reshape(-1, 2)).reshape(-1, 2, 2).astype(int)
+        for start, end in pixels:
+            cv2.line(frame, tuple(int(v) for v in start), tuple(int(v) for v in end), (100, 100, 100), 1)
     
     def _draw_enhanced_players(self, frame: np.ndarray, players: List[PlayerPosition], field_to_pixel):
         """Draw players with team colors and numbers"""
@@ -332,43 +465,42 @@ class VideoTacticalVisualizer:
     
     def _draw_formation_lines(self, frame: np.ndarray, players: List[PlayerPosition], field_to_pixel):
         """Draw formation lines connecting players"""
-        home_players = [p for p in players if p.team == 'home']
-        away_players = [p for p in players if p.team == 'away']
+        positions = FramePositions.from_players(players)
         
         # Draw lines between nearby teammates
-        for team_players, color in [(home_players, (0, 255, 0)), (away_players, (0, 0, 255))]:
-            for i, p1 in enumerate(team_players):
-                for p2 in team_players[i+1:]:
-                    distance = self.analyzer._euclidean_distance(p1.position, p2.position)
-                    if distance < 15:  # Only draw lines for nearby players
-                        pos1 = field_to_pixel(p1.position)
-                        pos2 = field_to_pixel(p2.position)
-                        cv2.line(frame, pos1, pos2, color, 1)
+        for code, color in ((HOME, (0, 255, 0)), (AWAY, (0, 0, 255))):
+            team_positions = positions.positions[positions.teams == code]
+            if len(team_positions) < 2:
+                continue
+            nearby = np.triu(cdist(team_positions, team_positions) < 15, k=1)  # Only draw lines for nearby players
+            for i, j in zip(*np.nonzero(nearby)):
+                cv2.line(frame, field_to_pixel(team_positions[i]), field_to_pixel(team_positions[j]), color, 1)
     
     def _draw_distance_measurements(self, frame: np.ndarray, players: List[PlayerPosition], 
                                   field_to_pixel, distance_metrics: Dict):
         """Draw distance measurements between key players"""
         # Show distances for closest opposing players
-        home_players = [p for p in players if p.team == 'home']
-        away_players = [p for p in players if p.team == 'away']
-        
-        for home_player in home_players[:3]:  # Limit to avoid clutter
-            closest_away = min(away_players, 
-                             key=lambda p: self.analyzer._euclidean_distance(home_player.position, p.position),
-                             default=None)
-            if closest_away:
-                distance = self.analyzer._euclidean_distance(home_player.position, closest_away.position)
-                
-                pos1 = field_to_pixel(home_player.position)
-                pos2 = field_to_pixel(closest_away.position)
-                
-                # Draw distance line
-                cv2.line(frame, pos1, pos2, (255, 255, 0), 1)
-                
-                # Draw distance text
-                mid_point = ((pos1[0] + pos2[0]) // 2, (pos1[1] + pos2[1]) // 2)
-                cv2.putText(frame, f"{distance:.1f}m", mid_point,
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        positions = FramePositions.from_players(players)
+        home_positions = positions.positions[positions.teams == HOME][:3]  # Limit to avoid clutter
+        away_positions = positions.positions[positions.teams == AWAY]
+        if not len(home_positions) or not len(away_positions):
+            return
+        
+        distances = cdist(home_positions, away_positions)
+        closest = distances.argmin(axis=1)
+        for home_position, away_index, row in zip(home_positions, closest, distances):
+            distance = row[away_index]
+            
+            pos1 = field_to_pixel(home_position)
+            pos2 = field_to_pixel(away_positions[away_index])
+            
+            # Draw distance line
+            cv2.line(frame, pos1, pos2, (255, 255, 0), 1)
+            
+            # Draw distance text
+            mid_point = ((pos1[0] + pos2[0]) // 2, (pos1[1] + pos2[1]) // 2)
+            cv2.putText(frame, f"{distance:.1f}m", mid_point,
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
     
     def _draw_tactical_info_panel(self, frame: np.ndarray, metrics: TacticalMetrics):
         """Draw tactical information panel"""
@@ -0,0 +1,308 @@
+"""
+Multi-Object Tracking for Football Detections
+
+SORT/ByteTrack-style tracker run after FootballDetector:
+- Constant-velocity Kalman filter per track (box centre, width, height)
+- Hungarian assignment (scipy linear_sum_assignment) on IoU for people,
+  two stages: high-confidence detections first, then low-confidence ones
+- Distance-gated assignment for the ball (too small/fast for IoU)
+- Predict-only frames, so detection can run on every Nth frame while
+  tracks are propagated in between
+
+Track ids let FootballMetricsCalculator compute distance, speed and heat
+maps per track instead of per-frame counts.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+logger = logging.getLogger(__name__)
+
+PERSON_CLASSES = ("player", "goalkeeper", "referee")
+CLASS_IDS = {"ball": 0, "goalkeeper": 1, "player": 2, "referee": 3}
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes"""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)))
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """One tracked object with a constant-velocity Kalman filter on (cx, cy, w, h)"""
+
+    # Noise relative to box height (as in ByteTrack)
+    STD_POSITION = 1.0 / 20
+    STD_VELOCITY = 1.0 / 160
+
+    def __init__(self, track_id: int, detection: Dict, frame_number: int):
+        x1, y1, x2, y2 = detection['bbox']
+        w, h = x2 - x1, y2 - y1
+        self.track_id = track_id
+        self.class_name = detection['class_name']
+        self.confidence = detection['confidence']
+        self.frame_number = frame_number
+        self.last_update = frame_number
+        self.hits = 1
+
+        self.state = np.array([(x1 + x2) / 2, (y1 + y2) / 2, w, h, 0, 0, 0, 0], dtype=float)
+        scale = max(h, 1.0)
+        std = np.array([2 * self.STD_POSITION * scale] * 4 + [10 * self.STD_VELOCITY * scale] * 4)
+        self.covariance = np.diag(std ** 2)
+
+    def predict(self, frame_number: int):
+        """Advance the state to frame_number (velocities are per frame)"""
+        dt = frame_number - self.frame_number
+        if dt <= 0:
+            return
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4) * dt
+        scale = max(self.state[3], 1.0)
+        noise = np.diag(np.r_[[self.STD_POSITION * scale] * 4, [self.STD_VELOCITY * scale] * 4] ** 2) * dt
+        self.state = transition @ self.state
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)
+        self.covariance = transition @ self.covariance @ transition.T + noise
+        self.frame_number = frame_number
+
+    def update(self, detection: Dict, frame_number: int):
+        """Kalman correction with a detection at the current frame"""
+        x1, y1, x2, y2 = detection['bbox']
+        measurement = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+        scale = max(self.state[3], 1.0)
+        measurement_noise = np.diag(np.full(4, (self.STD_POSITION * scale) ** 2))
+
+        projected_cov = self.covariance[:4, :4] + measurement_noise
+        gain = self.covariance[:, :4] @ np.linalg.inv(projected_cov)
+        self.state = self.state + gain @ (measurement - self.state[:4])
+        self.covariance = self.covariance - gain @ self.covariance[:4, :]
+
+        self.confidence = detection['confidence']
+        self.last_update = frame_number
+        self.hits += 1
+        if detection['class_name'] in PERSON_CLASSES:
+            self.class_name = detection['class_name']
+
+    @property
+    def bbox(self) -> List[float]:
+        cx, cy, w, h = self.state[:4]
+        return [float(cx - w / 2), float(cy - h / 2), float(cx + w / 2), float(cy + h / 2)]
+
+    def as_detection(self) -> Dict:
+        """Predicted box in FootballDetector's detection format"""
+        x1, y1, x2, y2 = self.bbox
+        return {
+            'bbox': [x1, y1, x2, y2],
+            'confidence': float(self.confidence),
+            'class_id': CLASS_IDS.get(self.class_name, -1),
+            'class_name': self.class_name,
+            'center': [float(self.state[0]), float(self.state[1])],
+            'area': float((x2 - x1) * (y2 - y1)),
+            'track_id': self.track_id,
+            'predicted': True
+        }
+
+
+class MultiObjectTracker:
+    """
+    Assigns persistent track_id values to per-frame detections
+
+    Frame numbers are absolute video frames; with sample_rate > 1 the
+    Kalman prediction covers the gap between processed frames.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, high_confidence: float = 0.6,
+                 min_hits: int = 3, max_age: int = 30, ball_gate: float = 80.0,
+                 next_id: int = 1):
+        """
+        Args:
+            iou_threshold: Minimum IoU to associate a person detection
+            high_confidence: Detections below this go to the second stage
+            min_hits: Updates before a track is confirmed (and propagated)
+            max_age: Frames without a matching detection before a track is dropped
+            ball_gate: Maximum ball centre distance (pixels per processed frame)
+            next_id: First track id to hand out (to continue a resumed run)
+        """
+        self.iou_threshold = iou_threshold
+        self.high_confidence = high_confidence
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.ball_gate = ball_gate
+        self.next_id = next_id
+        self.tracks: List[Track] = []
+
+    def _new_track(self, detection: Dict, frame_number: int) -> Track:
+        track = Track(self.next_id, detection, frame_number)
+        self.next_id += 1
+        self.tracks.append(track)
+        return track
+
+    def _match_iou(self, tracks: List[Track], detections: List[Dict]) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+        if not tracks or not detections:
+            return [], list(range(len(tracks))), list(range(len(detections)))
+        iou = iou_matrix(np.array([t.bbox for t in tracks]), np.array([d['bbox'] for d in detections]))
+        rows, cols = linear_sum_assignment(-iou)
+        matches = [(r, c) for r, c in zip(rows, cols) if iou[r, c] >= self.iou_threshold]
+        matched_tracks = {r for r, _ in matches}
+        matched_detections = {c for _, c in matches}
+        return (matches,
+                [i for i in range(len(tracks)) if i not in matched_tracks],
+                [j for j in range(len(detections)) if j not in matched_detections])
+
+    def _match_ball(self, tracks: List[Track], detections: List[Dict], frame_gap: int):
+        if not tracks or not detections:
+            return [], list(range(len(tracks))), list(range(len(detections)))
+        track_centers = np.array([t.state[:2] for t in tracks])
+        det_centers = np.array([d['center'] for d in detections])
+        distances = np.linalg.norm(track_centers[:, None, :] - det_centers[None, :, :], axis=-1)
+        gate = self.ball_gate * max(1, frame_gap)
+        rows, cols = linear_sum_assignment(distances)
+        matches = [(r, c) for r, c in zip(rows, cols) if distances[r, c] <= gate]
+        matched_tracks = {r for r, _ in matches}
+        matched_detections = {c for _, c in matches}
+        return (matches,
+                [i for i in range(len(tracks)) if i not in matched_tracks],
+                [j for j in range(len(detections)) if j not in matched_detections])
+
+    def _prune(self, frame_number: int):
+        self.tracks = [
+            t for t in self.tracks
+            if frame_number - t.last_update <= self.max_age
+            and (t.hits >= self.min_hits or t.last_update == frame_number)
+        ]
+
+    def update(self, detections: List[Dict], frame_number: int) -> List[Dict]:
+        """
+        Associate one frame's detections with tracks
+
+        Returns the detections (same order, copies) with a 'track_id' key.
+        """
+        previous_frame = max((t.frame_number for t in self.tracks), default=frame_number)
+        for track in self.tracks:
+            track.predict(frame_number)
+
+        output = [dict(d) for d in detections]
+        people = [i for i, d in enumerate(output) if d['class_name'] in PERSON_CLASSES]
+        balls = [i for i, d in enumerate(output) if d['class_name'] == 'ball']
+
+        # People: confident detections first, leftovers against low-confidence ones
+        person_tracks = [t for t in self.tracks if t.class_name in PERSON_CLASSES]
+        high = [i for i in people if output[i]['confidence'] >= self.high_confidence]
+        low = [i for i in people if output[i]['confidence'] < self.high_confidence]
+
+        matches, unmatched_tracks, unmatched_high = self._match_iou(person_tracks, [output[i] for i in high])
+        for t, d in matches:
+            person_tracks[t].update(output[high[d]], frame_number)
+            output[high[d]]['track_id'] = person_tracks[t].track_id
+
+        remaining = [person_tracks[t] for t in unmatched_tracks]
+        matches, _, _ = self._match_iou(remaining, [output[i] for i in low])
+        for t, d in matches:
+            remaining[t].update(output[low[d]], frame_number)
+            output[low[d]]['track_id'] = remaining[t].track_id
+
+        # Only confident unmatched detections start new tracks
+        for d in unmatched_high:
+            output[high[d]]['track_id'] = self._new_track(output[high[d]], frame_number).track_id
+
+        # Ball
+        ball_tracks = [t for t in self.tracks if t.class_name == 'ball']
+        matches, _, unmatched_balls = self._match_ball(
+            ball_tracks, [output[i] for i in balls], frame_number - previous_frame
+        )
+        for t, d in matches:
+            ball_tracks[t].update(output[balls[d]], frame_number)
+            output[balls[d]]['track_id'] = ball_tracks[t].track_id
+        for d in unmatched_balls:
+            output[balls[d]]['track_id'] = self._new_track(output[balls[d]], frame_number).track_id
+
+        self._prune(frame_number)
+        return output
+
+    def predict(self, frame_number: int) -> List[Dict]:
+        """
+        Propagate confirmed tracks to a frame without detection
+
+        Returns predicted boxes (detection format, 'predicted': True).
+        """
+        predicted = []
+        for track in self.tracks:
+            if track.hits < self.min_hits or frame_number - track.last_update > self.max_age:
+                continue
+            track.predict(frame_number)
+            predicted.append(track.as_detection())
+        return predicted
+
+
+def track_frame_detections(frame_detections: Dict, tracker: Optional[MultiObjectTracker] = None) -> Dict:
+    """Run a tracker over already detected frames (in frame order); returns a new frame_detections"""
+    tracker = tracker or MultiObjectTracker()
+    tracked = {}
+    for frame_number in sorted(frame_detections):
+        frame_data = frame_detections[frame_number]
+        tracked[frame_number] = {
+            **frame_data,
+            'detections': tracker.update(frame_data['detections'], frame_number)
+        }
+    return tracked
+
+
+def calculate_track_metrics(frame_detections: Dict, fps: float, resolution: Tuple[int, int],
+                            min_frames: int = 5, grid: Tuple[int, int] = (12, 8)) -> Dict[int, Dict]:
+    """
+    Per-track movement statistics (image coordinates, pixels)
+
+    Returns {track_id: {...}} for tracks seen in at least min_frames frames:
+    class, first/last frame, duration, distance, average/max speed and a
+    heat map (grid[1] rows x grid[0] columns of frame counts).
+    """
+    observations: Dict[int, List[Tuple[int, float, float, str]]] = {}
+    for frame_number in sorted(frame_detections):
+        for det in frame_detections[frame_number]['detections']:
+            track_id = det.get('track_id')
+            if track_id is None:
+                continue
+            observations.setdefault(track_id, []).append(
+                (frame_number, det['center'][0], det['center'][1], det['class_name'])
+            )
+
+    width, height = max(resolution[0], 1), max(resolution[1], 1)
+    fps = fps or 1
+    metrics = {}
+    for track_id, obs in observations.items():
+        if len(obs) < min_frames:
+            continue
+        frames = np.array([o[0] for o in obs], dtype=float)
+        xy = np.array([[o[1], o[2]] for o in obs], dtype=float)
+        steps = np.hypot(*np.diff(xy, axis=0).T)
+        step_seconds = np.diff(frames) / fps
+        speeds = steps / np.maximum(step_seconds, 1e-9)
+        duration = (frames[-1] - frames[0]) / fps
+        distance = float(steps.sum())
+        heatmap, _, _ = np.histogram2d(
+            xy[:, 1], xy[:, 0], bins=(grid[1], grid[0]), range=((0, height), (0, width))
+        )
+        classes = [o[3] for o in obs]
+        metrics[track_id] = {
+            'class_name': max(set(classes), key=classes.count),
+            'first_frame': int(frames[0]),
+            'last_frame': int(frames[-1]),
+            'frames_tracked': len(obs),
+            'duration_seconds': round(duration, 2),
+            'distance_px': round(distance, 1),
+            'avg_speed_px_per_s': round(distance / duration, 1) if duration > 0 else 0,
+            'max_speed_px_per_s': round(float(speeds.max()), 1) if len(speeds) else 0,
+            'heatmap': heatmap.astype(int).tolist()
+        }
+    return metrics
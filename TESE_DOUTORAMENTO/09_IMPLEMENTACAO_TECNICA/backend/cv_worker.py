@@ -0,0 +1,172 @@
+"""
+Computer vision worker pool
+
+Consumes the cv_jobs queue filled by POST /api/computer-vision/upload-video.
+Run next to the API server:
+
+    python cv_worker.py --concurrency 2
+
+Each worker process claims one job at a time (FOR UPDATE SKIP LOCKED),
+heartbeats while it runs, checkpoints frame detections, and retries
+failures with backoff. Jobs of a crashed worker are re-queued by the
+others once its heartbeat expires and resume from the last checkpoint.
+
+With CV_INFERENCE_ADDRESS (and CV_INFERENCE_AUTHKEY) set, the workers
+send frames to a shared inference_server.py instead of each loading the
+model.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("cv_worker")
+
+HEARTBEAT_SECONDS = 15
+STALE_AFTER_SECONDS = 120
+
+
+def run_job(queue, job, worker_id):
+    """Run one claimed job with a heartbeat thread; returns True on success"""
+    from routers.computer_vision import process_video_analysis
+    from computer_vision.inference_backends import DEFAULT_BACKEND
+    from computer_vision.job_queue import LeaseLost
+
+    payload = job["payload"]
+    checkpoint = {"frame": None}
+    done = threading.Event()
+    lost = threading.Event()
+
+    def heartbeat():
+        while not done.wait(HEARTBEAT_SECONDS):
+            try:
+                if not queue.heartbeat(job["id"], worker_id, checkpoint["frame"]):
+                    logger.warning(f"Job {job['id']} lease lost; stopping the analysis")
+                    lost.set()
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job['id']}: {e}")
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    try:
+        process_video_analysis(
+            job["analysis_id"],
+            payload["video_path"],
+            payload.get("analysis_type", "full"),
+            payload.get("confidence_threshold", 0.5),
+            payload.get("sample_rate", 1),
+            payload.get("workers", 1),
+            payload.get("detect_every", 1),
+            payload.get("sampling", "fixed"),
+            payload.get("inference_backend", DEFAULT_BACKEND),
+            payload.get("pitch_roi", False),
+            resumable=True,
+            on_checkpoint=lambda frame: checkpoint.__setitem__("frame", frame),
+            lease_lost=lost.is_set
+        )
+        if not queue.complete(job["id"], worker_id):
+            logger.warning(f"Job {job['id']} lease lost (cancelled or recovered); not marked completed")
+            return False
+        return True
+    except LeaseLost:
+        logger.warning(f"Job {job['id']} lease lost (cancelled or recovered); aborted without storing results")
+        return False
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        status = queue.fail(job["id"], worker_id, error)
+        if status is None:
+            logger.warning(f"Job {job['id']} lease lost (cancelled or recovered); failure not recorded: {error}")
+            return False
+        queue.db.execute_query(
+            "UPDATE video_analysis SET status = %s, error_message = %s WHERE analysis_id = %s",
+            (status, error, job["analysis_id"])
+        )
+        logger.error(f"Job {job['id']} failed (attempt {job['attempts']}/{job['max_attempts']}) -> {status}: {error}")
+        return False
+    finally:
+        done.set()
+        beat.join()
+
+
+def worker_loop(index: int, poll_interval: float, stop_event):
+    """Main loop of one worker process"""
+    from database import DatabaseConnection
+    from computer_vision.job_queue import JobQueue
+    from computer_vision.model_server import get_detector_pool
+
+    # Ctrl+C reaches the whole process group; the parent sets stop_event and
+    # each worker finishes its current job first
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    db = DatabaseConnection()
+    queue = JobQueue(db)
+    logger.info(f"Worker {worker_id} started")
+    # Load the model while waiting for the first job
+    get_detector_pool().warm_async()
+
+    try:
+        while not stop_event.is_set():
+            try:
+                queue.recover_stale(STALE_AFTER_SECONDS)
+                job = queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Queue unavailable: {e}")
+                stop_event.wait(poll_interval * 5)
+                continue
+
+            if job is None:
+                stop_event.wait(poll_interval)
+                continue
+
+            logger.info(f"Job {job['id']} ({job['analysis_id']}) claimed, attempt {job['attempts']}")
+            run_job(queue, job, worker_id)
+    finally:
+        db.close()
+        logger.info(f"Worker {worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Computer vision job worker pool")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("CV_WORKERS", 1)),
+                        help="Number of worker processes (default: CV_WORKERS or 1)")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between polls when the queue is empty")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+
+    def shutdown(signum, frame):
+        logger.info("Stopping workers after their current job...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    # Non-daemonic so a job may use the segment-parallel detector pool
+    processes = [
+        context.Process(target=worker_loop, args=(i, args.poll_interval, stop_event),
+                        name=f"cv-worker-{i}", daemon=False)
+        for i in range(max(1, args.concurrency))
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"🎬 {len(processes)} CV worker(s) running")
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
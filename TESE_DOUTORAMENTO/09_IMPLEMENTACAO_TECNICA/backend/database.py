@@ -1,6 +1,8 @@
+import logging
 import os
 import sys
 from pathlib import Path
+from typing import Optional
 
 parent_dir = Path(__file__).resolve().parent.parent
 python_dir = parent_dir / "python"
@@ -19,10 +21,75 @@ spec.loader.exec_module(conexao_db)
 
 DatabaseConnection = conexao_db.DatabaseConnection
 
+from async_database import PSYCOPG_ASYNC_AVAILABLE, AsyncDatabaseConnection, ThreadedAsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 2))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+# Application-lifetime pools, opened/closed by the FastAPI lifespan hook
+_shared_db: Optional[DatabaseConnection] = None
+_async_db = None
+
+
+async def open_db_pools():
+    """Create the shared sync pool and the async pool (psycopg 3 if installed)"""
+    global _shared_db, _async_db
+    try:
+        _shared_db = DatabaseConnection(minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, partilhado=True)
+        _shared_db.connection_pool.timeout = DB_POOL_TIMEOUT
+    except Exception as e:
+        # Requests fall back to per-request connections until the next restart
+        logger.error(f"❌ Shared DB pool not created: {e}")
+        return
+
+    _async_db = ThreadedAsyncDatabase(_shared_db)
+    if not PSYCOPG_ASYNC_AVAILABLE:
+        logger.warning("⚠️ psycopg 3 not installed: async routes use the sync pool in worker threads")
+        return
+    async_db = AsyncDatabaseConnection.from_settings(
+        _shared_db, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT
+    )
+    try:
+        await async_db.open()
+        _async_db = async_db
+    except Exception as e:
+        logger.error(f"❌ Async DB pool not opened, using the sync pool in worker threads: {e}")
+        await async_db.close()
+
+
+async def close_db_pools():
+    global _shared_db, _async_db
+    if _async_db is not None:
+        await _async_db.close()
+        _async_db = None
+    if _shared_db is not None:
+        _shared_db.close()
+        _shared_db = None
+
 
 def get_db():
+    if _shared_db is not None:
+        yield _shared_db
+        return
+
+    # No app pool (scripts, tests): one short-lived pool per request
     db = DatabaseConnection()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    if _async_db is not None:
+        yield _async_db
+        return
+
+    db = DatabaseConnection()
+    try:
+        yield ThreadedAsyncDatabase(db)
+    finally:
+        db.close()
@@ -39,6 +39,8 @@ CREATE TABLE IF NOT EXISTS video_detections (
     center_x FLOAT NOT NULL,
     center_y FLOAT NOT NULL,
     area FLOAT NOT NULL,
+    track_id INTEGER, -- MultiObjectTracker id (NULL for untracked analyses)
+    predicted BOOLEAN NOT NULL DEFAULT FALSE, -- box propagated by the tracker, not detected
     
     -- Indexes for efficient querying
     INDEX idx_detections_analysis_id (analysis_id),
@@ -131,3 +133,48 @@ BEGIN
     WHERE va.session_id = session_id_param;
 END;
 $$ LANGUAGE plpgsql;
+
+-- Durable job queue for video analyses (claimed with FOR UPDATE SKIP LOCKED by cv_worker.py)
+CREATE TABLE IF NOT EXISTS cv_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    analysis_id VARCHAR(36) NOT NULL REFERENCES video_analysis(analysis_id) ON DELETE CASCADE,
+    priority SMALLINT NOT NULL DEFAULT 10, -- lower runs first: quick=0, full=10
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(), -- retry backoff
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    checkpoint_frame INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_cv_jobs_queued ON cv_jobs(priority, run_after, id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_cv_jobs_running ON cv_jobs(heartbeat_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_cv_jobs_analysis ON cv_jobs(analysis_id);
+
+-- Frame-range reads of video_detections (paginated detections endpoint, annotated video)
+CREATE INDEX IF NOT EXISTS idx_video_detections_analysis_frame ON video_detections(analysis_id, frame_number);
+
+-- Tactical overlay renders (status shared by all API processes, see computer_vision/render_engine.py)
+CREATE TABLE IF NOT EXISTS video_visualizations (
+    processing_id VARCHAR(36) PRIMARY KEY,
+    analysis_id VARCHAR(36) REFERENCES video_analysis(analysis_id) ON DELETE CASCADE,
+    visualization_type VARCHAR(20),
+    status VARCHAR(20) NOT NULL DEFAULT 'starting', -- starting, processing, completed, failed
+    progress FLOAT NOT NULL DEFAULT 0,
+    message TEXT,
+    video_url TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_video_visualizations_analysis ON video_visualizations(analysis_id);
+
+-- Tracking columns for databases created before the tracker
+ALTER TABLE video_detections ADD COLUMN IF NOT EXISTS track_id INTEGER;
+ALTER TABLE video_detections ADD COLUMN IF NOT EXISTS predicted BOOLEAN NOT NULL DEFAULT FALSE;
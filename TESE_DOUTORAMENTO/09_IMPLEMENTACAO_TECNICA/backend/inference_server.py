@@ -0,0 +1,53 @@
+"""
+Local Inference Server for the Football Detector
+
+Loads the YOLOv8 detector(s) once and serves detect_batch requests to
+the API and cv_worker processes, which otherwise each load their own
+copy of the model.
+
+Usage:
+    python inference_server.py --address 127.0.0.1:6010 --pool-size 2 --backend onnx
+
+CV_INFERENCE_AUTHKEY must be set (the server refuses to start without
+it); point the clients at it with CV_INFERENCE_ADDRESS=127.0.0.1:6010 and
+the same CV_INFERENCE_AUTHKEY.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("inference_server")
+
+
+def main():
+    from computer_vision.inference_backends import DEFAULT_BACKEND, INFERENCE_BACKENDS
+    from computer_vision.model_server import InferenceServer, POOL_SIZE
+
+    parser = argparse.ArgumentParser(description="Local inference server for the football detector")
+    parser.add_argument("--address", default=os.getenv("CV_INFERENCE_ADDRESS", "127.0.0.1:6010"),
+                        help="host:port to listen on (default: CV_INFERENCE_ADDRESS or 127.0.0.1:6010)")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help="Detectors kept loaded = concurrent batches (default: CV_DETECTOR_POOL_SIZE or 1)")
+    parser.add_argument("--model", default=None, help="YOLOv8 weights (default: yolov8x.pt)")
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default=DEFAULT_BACKEND,
+                        help="Backend loaded at start (others load on first request)")
+    args = parser.parse_args()
+
+    try:
+        server = InferenceServer(args.address, pool_size=args.pool_size, model_path=args.model,
+                                 default_backend=args.backend)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Inference server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,13 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+from database import close_db_pools, open_db_pools
+
 # Import routers with error handling for optional dependencies
 from routers import athletes, xgboost_analysis, sessions, metrics, ingestion, load_metrics, mock_data, opponents
 
-# Try to import computer vision routers (requires PyTorch)
+# Try to import computer vision routers (requires OpenCV; PyTorch is only
+# imported when a detector is first loaded)
 try:
     from routers import computer_vision, video_visualization
     CV_AVAILABLE = True
@@ -22,8 +25,15 @@ except Exception as e:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 FastAPI server starting...")
+    await open_db_pools()
+    if CV_AVAILABLE:
+        from computer_vision.model_server import PRELOAD_DETECTORS, get_detector_pool
+        if PRELOAD_DETECTORS:
+            # Load the detector(s) in the background; requests are served meanwhile
+            get_detector_pool().warm_async()
     yield
     logger.info("🔒 FastAPI server shutting down...")
+    await close_db_pools()
 
 
 app = FastAPI(
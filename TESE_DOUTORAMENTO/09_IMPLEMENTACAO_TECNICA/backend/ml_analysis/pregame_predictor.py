@@ -29,6 +29,7 @@ Model: XGBoost binary classifier with SHAP explainability.
 Author: Doctoral research — Predição de Substituições no Futebol
 """
 
+import json
 import logging
 import warnings
 import pickle
@@ -193,6 +194,52 @@ class DataLoader:
         )
         return pd.DataFrame(rows)
 
+    def load_input_watermark(self) -> Optional[pd.Timestamp]:
+        """Latest created_at across every table the features are built from."""
+        rows = self.db.query_to_dict("""
+            SELECT GREATEST(
+                (SELECT MAX(created_at) FROM sessoes),
+                (SELECT MAX(created_at) FROM dados_gps),
+                (SELECT MAX(created_at) FROM dados_pse),
+                (SELECT MAX(created_at) FROM dados_wellness)
+            ) AS watermark
+        """)
+        watermark = rows[0]["watermark"] if rows else None
+        return pd.Timestamp(watermark) if watermark is not None else None
+
+    def load_changed_since(self, watermark) -> Dict[Optional[int], pd.Timestamp]:
+        """
+        Earliest affected date per athlete for rows created after watermark.
+
+        New sessions affect every athlete and are returned under key None.
+        """
+        rows = self.db.query_to_dict("""
+            SELECT g.atleta_id, MIN(s.data) AS data
+            FROM dados_gps g JOIN sessoes s ON s.id = g.sessao_id
+            WHERE g.created_at > %s GROUP BY g.atleta_id
+            UNION ALL
+            SELECT p.atleta_id, MIN(s.data) AS data
+            FROM dados_pse p JOIN sessoes s ON s.id = p.sessao_id
+            WHERE p.created_at > %s GROUP BY p.atleta_id
+            UNION ALL
+            SELECT atleta_id, MIN(data) AS data
+            FROM dados_wellness
+            WHERE created_at > %s GROUP BY atleta_id
+            UNION ALL
+            SELECT NULL, MIN(data) AS data
+            FROM sessoes
+            WHERE created_at > %s
+        """, (watermark, watermark, watermark, watermark))
+
+        changed: Dict[Optional[int], pd.Timestamp] = {}
+        for row in rows:
+            if row["data"] is None:
+                continue
+            key = int(row["atleta_id"]) if row["atleta_id"] is not None else None
+            since = pd.Timestamp(row["data"])
+            changed[key] = min(changed.get(key, since), since)
+        return changed
+
 
 # ===================================================================
 # TARGET VARIABLE — defines when a player had a performance drop
@@ -217,80 +264,65 @@ class TargetBuilder:
             atleta_id, sessao_id, data, target, rule_a, rule_b, rule_c,
             hsr_per_min, sprint_per_min, dist_per_min,
             baseline_hsr, baseline_sprint_mean, baseline_sprint_std,
-            baseline_dist
-        """
-        # Filter to game sessions only
-        game_ids = set(sessions.loc[sessions["is_game"], "id"])
-        game_gps = gps[gps["sessao_id"].isin(game_ids)].copy()
+            baseline_dist, has_baseline
 
+        Baselines are rolling BASELINE_GAMES statistics over each athlete's
+        shift(1) series, so every game only sees earlier games.
+        """
+        game_gps = TargetBuilder._game_rows(gps, sessions)
         if game_gps.empty:
             return pd.DataFrame()
 
-        game_gps = game_gps.sort_values(["atleta_id", "data"])
+        athlete = game_gps["atleta_id"]
+
+        def baseline(col: str, stat: str) -> np.ndarray:
+            prev = game_gps.groupby(athlete, sort=False)[col].shift(1)
+            rolling = prev.groupby(athlete, sort=False).rolling(BASELINE_GAMES, min_periods=1)
+            return getattr(rolling, stat)().reset_index(level=0, drop=True).sort_index().to_numpy()
+
+        hsr = game_gps["hsr_per_min"].to_numpy(dtype=float)
+        sprint = game_gps["sprint_per_min"].to_numpy(dtype=float)
+        dist = game_gps["dist_per_min"].to_numpy(dtype=float)
+        bl_hsr = baseline("hsr_per_min", "mean")
+        bl_sprint_mean = baseline("sprint_per_min", "mean")
+        bl_sprint_std = baseline("sprint_per_min", "std")
+        bl_dist = baseline("dist_per_min", "mean")
+        has_baseline = game_gps.groupby(athlete, sort=False).cumcount().to_numpy() > 0
+
+        # NaN comparisons are False, matching the scalar rules of the row loop
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rule_a = (bl_hsr > 0) & (hsr < HSR_BASELINE_PCT * bl_hsr)
+            z_sprint = (sprint - bl_sprint_mean) / bl_sprint_std
+            rule_b = (bl_sprint_std > 0) & (z_sprint < SPRINT_ZSCORE_THRESH)
+            rule_c = (bl_dist > 0) & (dist < (1 - DISTANCE_DROP_PCT) * bl_dist)
+        rule_a &= has_baseline
+        rule_b &= has_baseline
+        rule_c &= has_baseline
+
+        return pd.DataFrame({
+            "atleta_id": athlete.to_numpy(),
+            "sessao_id": game_gps["sessao_id"].to_numpy(),
+            "data": game_gps["data"].to_numpy(),
+            "target": (rule_a | rule_b | rule_c).astype(int),
+            "rule_a": rule_a,
+            "rule_b": rule_b,
+            "rule_c": rule_c,
+            "hsr_per_min": hsr,
+            "sprint_per_min": sprint,
+            "dist_per_min": dist,
+            "baseline_hsr": bl_hsr,
+            "baseline_sprint_mean": bl_sprint_mean,
+            "baseline_sprint_std": bl_sprint_std,
+            "baseline_dist": bl_dist,
+            "has_baseline": has_baseline,
+        })
 
-        results = []
-        for aid, grp in game_gps.groupby("atleta_id"):
-            grp = grp.sort_values("data").reset_index(drop=True)
-            for i, row in grp.iterrows():
-                prev = grp.iloc[max(0, i - BASELINE_GAMES):i]
-                if len(prev) < 1:
-                    # First game — no baseline, skip or label 0
-                    results.append({
-                        "atleta_id": aid,
-                        "sessao_id": row["sessao_id"],
-                        "data": row["data"],
-                        "target": 0,
-                        "rule_a": False, "rule_b": False, "rule_c": False,
-                        "hsr_per_min": row["hsr_per_min"],
-                        "sprint_per_min": row["sprint_per_min"],
-                        "dist_per_min": row["dist_per_min"],
-                        "baseline_hsr": np.nan,
-                        "baseline_sprint_mean": np.nan,
-                        "baseline_sprint_std": np.nan,
-                        "baseline_dist": np.nan,
-                        "has_baseline": False,
-                    })
-                    continue
-
-                bl_hsr = prev["hsr_per_min"].mean()
-                bl_sprint_mean = prev["sprint_per_min"].mean()
-                bl_sprint_std = prev["sprint_per_min"].std()
-                bl_dist = prev["dist_per_min"].mean()
-
-                # Rule A: HSR/min < 85% of baseline
-                rule_a = (row["hsr_per_min"] < HSR_BASELINE_PCT * bl_hsr) if bl_hsr > 0 else False
-
-                # Rule B: sprint z-score < -1
-                if bl_sprint_std and bl_sprint_std > 0:
-                    z_sprint = (row["sprint_per_min"] - bl_sprint_mean) / bl_sprint_std
-                    rule_b = z_sprint < SPRINT_ZSCORE_THRESH
-                else:
-                    rule_b = False
-
-                # Rule C: distance drop > 20% vs baseline
-                rule_c = (row["dist_per_min"] < (1 - DISTANCE_DROP_PCT) * bl_dist) if bl_dist > 0 else False
-
-                target = int(rule_a or rule_b or rule_c)
-
-                results.append({
-                    "atleta_id": aid,
-                    "sessao_id": row["sessao_id"],
-                    "data": row["data"],
-                    "target": target,
-                    "rule_a": bool(rule_a),
-                    "rule_b": bool(rule_b),
-                    "rule_c": bool(rule_c),
-                    "hsr_per_min": row["hsr_per_min"],
-                    "sprint_per_min": row["sprint_per_min"],
-                    "dist_per_min": row["dist_per_min"],
-                    "baseline_hsr": bl_hsr,
-                    "baseline_sprint_mean": bl_sprint_mean,
-                    "baseline_sprint_std": bl_sprint_std,
-                    "baseline_dist": bl_dist,
-                    "has_baseline": True,
-                })
-
-        return pd.DataFrame(results)
+    @staticmethod
+    def _game_rows(gps: pd.DataFrame, sessions: pd.DataFrame) -> pd.DataFrame:
+        """Game GPS rows ordered by athlete, then date."""
+        game_ids = set(sessions.loc[sessions["is_game"], "id"])
+        game_gps = gps[gps["sessao_id"].isin(game_ids)]
+        return game_gps.sort_values(["atleta_id", "data"], kind="mergesort").reset_index(drop=True)
 
 
 # ===================================================================
@@ -551,6 +583,323 @@ class FeatureEngineer:
         return feats
 
 
+# ---------------------------------------------------------------------------
+# Vectorised helpers — shared by VectorizedFeatureEngineer
+# ---------------------------------------------------------------------------
+def _sorted_by_athlete(frame: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """Athlete/date-sorted copy with the requested columns (NaN if absent)."""
+    out = pd.DataFrame({
+        "atleta_id": frame["atleta_id"].astype("int64") if "atleta_id" in frame else pd.Series(dtype="int64"),
+        "data": frame["data"] if "data" in frame else pd.Series(dtype="datetime64[ns]"),
+    })
+    for col in cols:
+        out[col] = frame[col].astype(float) if col in frame else np.nan
+    out["data"] = pd.to_datetime(out["data"]).astype("datetime64[ns]")
+    return out.sort_values(["atleta_id", "data"], kind="mergesort").reset_index(drop=True)
+
+
+def _asof_before(frame: pd.DataFrame, keys: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """Values of `cols` on each athlete's last row strictly before the key date."""
+    right = frame[["atleta_id", "data"] + cols].sort_values("data", kind="mergesort")
+    left = keys.sort_values("data", kind="mergesort")
+    merged = pd.merge_asof(
+        left, right, on="data", by="atleta_id",
+        direction="backward", allow_exact_matches=False,
+    )
+    return merged.set_index("_row").reindex(keys["_row"])[cols].reset_index(drop=True)
+
+
+def _window_rolling(frame: pd.DataFrame, keys: pd.DataFrame, days: int):
+    """
+    Time-based grouped rolling window [game_date - days, game_date).
+
+    Key rows are inserted as NaN probes ahead of same-timestamp data rows,
+    so each probe's window holds exactly the data strictly before the game.
+    Returns (rolling object, probe mask, combined frame).
+    """
+    data = frame.copy()
+    data["_n"] = 1.0
+    data["_row"] = -1
+    combined = pd.concat([keys, data], ignore_index=True)
+    combined = combined.sort_values(["atleta_id", "data"], kind="mergesort").reset_index(drop=True)
+    rolling = combined.groupby("atleta_id", sort=False).rolling(
+        f"{days}D", on="data", closed="left"
+    )
+    return rolling, combined["_row"].to_numpy() >= 0, combined
+
+
+def _probe_values(result: pd.DataFrame, probes: np.ndarray, combined: pd.DataFrame,
+                  n_keys: int) -> pd.DataFrame:
+    """Pick the probe rows of a grouped rolling result back in key order."""
+    # combined is already grouped by athlete, so result rows line up positionally
+    picked = pd.DataFrame(
+        result.to_numpy()[probes], columns=result.columns,
+        index=combined.loc[probes, "_row"].astype(int).to_numpy(),
+    )
+    return picked.reindex(np.arange(n_keys))
+
+
+def _window_stats(frame: pd.DataFrame, keys: pd.DataFrame, days: int,
+                  cols: List[str], stats: List[str]) -> pd.DataFrame:
+    """
+    Per-key window statistics over [game_date - days, game_date).
+
+    Returns a frame with `n` (row count) and `<col>_<stat>` columns; stats
+    skip NaN exactly like the Series methods on the filtered slice.
+    """
+    rolling, probes, combined = _window_rolling(frame[["atleta_id", "data"] + cols], keys, days)
+    out = pd.DataFrame(index=np.arange(len(keys)))
+    out["n"] = _probe_values(rolling[["_n"]].sum(), probes, combined, len(keys))["_n"].fillna(0).to_numpy()
+    for stat in stats:
+        values = _probe_values(getattr(rolling[cols], stat)(), probes, combined, len(keys))
+        for col in cols:
+            out[f"{col}_{stat}"] = values[col].to_numpy()
+    return out
+
+
+class VectorizedFeatureEngineer(FeatureEngineer):
+    """
+    Vectorised equivalent of FeatureEngineer.
+
+    Each source frame is sorted once per athlete. EMAs and last-N-session
+    features use grouped ewm/rolling aligned to the game dates with
+    merge_asof; day windows (3/7/14/28d before the game) use grouped
+    time-based rolling over probe rows inserted at each game date.
+    Cost grows with the number of rows, not targets x rows, and the
+    feature matrix matches FeatureEngineer.build_features (same rows,
+    columns and values up to floating-point rounding). Sessions sharing a
+    date keep their input order, where the per-target sort_values left it
+    unspecified.
+    """
+
+    WELLNESS_COLS = ["wellness_score", "fatigue_level", "muscle_soreness",
+                     "sleep_quality", "stress_level"]
+
+    def __init__(self, gps: pd.DataFrame, pse: pd.DataFrame,
+                 wellness: pd.DataFrame, sessions: pd.DataFrame):
+        super().__init__(gps, pse, wellness, sessions)
+        self.pse_sorted = _sorted_by_athlete(self.pse, ["srpe", "rpe", "duracao_min"])
+        self.gps_sorted = _sorted_by_athlete(self.gps, [
+            "distancia_total", "hsr_distance", "aceleracoes", "desaceleracoes",
+            "sprint_efforts", "velocidade_max", "sessao_id",
+        ])
+        self.wellness_sorted = _sorted_by_athlete(
+            self.wellness, self.WELLNESS_COLS + ["readiness_score"]
+        )
+        self.has_readiness = "readiness_score" in self.wellness.columns
+
+        daily = self.pse_sorted.groupby(["atleta_id", "data"], sort=True)["srpe"].sum()
+        self.daily_srpe = daily.reset_index()
+
+        if "is_game" in self.sessions:
+            game_dates = self.sessions.loc[self.sessions["is_game"], "data"]
+        else:
+            game_dates = pd.Series(dtype="datetime64[ns]")
+        self.game_dates = np.sort(pd.to_datetime(game_dates).astype("datetime64[ns]").to_numpy())
+
+    def build_features(self, targets: pd.DataFrame) -> pd.DataFrame:
+        """Build feature matrix aligned with target rows."""
+        if targets.empty:
+            return pd.DataFrame()
+
+        keys = pd.DataFrame({
+            "atleta_id": targets["atleta_id"].astype("int64").to_numpy(),
+            "data": pd.to_datetime(targets["data"]).astype("datetime64[ns]").to_numpy(),
+            "_row": np.arange(len(targets)),
+        })
+
+        df = pd.DataFrame({
+            "atleta_id": targets["atleta_id"].to_numpy(),
+            "sessao_id": targets["sessao_id"].to_numpy(),
+            "data": targets["data"].to_numpy(),
+        })
+        for part in (self._load_features_vec(keys), self._wellness_features_vec(keys),
+                     self._exposure_features_vec(keys), self._gps_trend_features_vec(keys)):
+            for col, values in part.items():
+                df[col] = values
+        return df
+
+    # ------------------------------------------------------------------
+    def _ema_features(self, frame: pd.DataFrame, keys: pd.DataFrame,
+                      cols: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """EMA of each column at the last row before the game (0 if none)."""
+        filled = frame[["atleta_id", "data"]].copy()
+        grouped = frame[list(cols)].fillna(0).groupby(frame["atleta_id"], sort=False)
+        for span in EMA_SPANS:
+            ema = grouped.ewm(span=span, min_periods=1).mean().reset_index(level=0, drop=True)
+            for col, name in cols.items():
+                filled[f"{name}_ema_{span}d"] = ema[col]
+        names = [c for c in filled.columns if c not in ("atleta_id", "data")]
+        last = _asof_before(filled, keys, names).fillna(0.0)
+        return {name: last[name].to_numpy() for name in names}
+
+    @staticmethod
+    def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 0, num / den, 1.0)
+
+    def _load_features_vec(self, keys: pd.DataFrame) -> Dict[str, np.ndarray]:
+        feats = {}
+
+        ema = self._ema_features(self.pse_sorted, keys, {"srpe": "srpe", "rpe": "rpe"})
+        for span in EMA_SPANS:
+            feats[f"srpe_ema_{span}d"] = ema[f"srpe_ema_{span}d"]
+            feats[f"rpe_ema_{span}d"] = ema[f"rpe_ema_{span}d"]
+
+        feats["srpe_acwr"] = self._ratio(feats["srpe_ema_7d"], feats["srpe_ema_28d"])
+
+        # Monotony & strain over daily sRPE in the 7 days before the game
+        w7 = _window_stats(self.daily_srpe, keys, 7, ["srpe"], ["mean", "std", "sum"])
+        std = w7["srpe_std"].to_numpy()
+        enough = w7["n"].to_numpy() >= 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            monotony = np.where(enough & (std > 0), w7["srpe_mean"].to_numpy() / std, 0.0)
+        feats["monotony_7d"] = monotony
+        feats["strain_7d"] = np.where(enough, w7["srpe_sum"].to_numpy() * monotony, 0.0)
+
+        feats["srpe_slope_14d"] = self._daily_slope(keys, 14)
+        feats["srpe_delta_7_28"] = feats["srpe_ema_7d"] - feats["srpe_ema_28d"]
+
+        ema = self._ema_features(self.gps_sorted, keys, {
+            "distancia_total": "dist", "hsr_distance": "hsr",
+            "aceleracoes": "acc", "desaceleracoes": "dec",
+        })
+        for span in EMA_SPANS:
+            for name in ("dist", "hsr", "acc", "dec"):
+                feats[f"{name}_ema_{span}d"] = ema[f"{name}_ema_{span}d"]
+
+        feats["dist_acwr"] = self._ratio(feats["dist_ema_7d"], feats["dist_ema_28d"])
+        feats["hsr_acwr"] = self._ratio(feats["hsr_ema_7d"], feats["hsr_ema_28d"])
+        feats["dist_delta_7_28"] = feats["dist_ema_7d"] - feats["dist_ema_28d"]
+        feats["hsr_delta_7_28"] = feats["hsr_ema_7d"] - feats["hsr_ema_28d"]
+        return feats
+
+    def _daily_slope(self, keys: pd.DataFrame, days: int) -> np.ndarray:
+        """Least-squares slope of daily sRPE over the window (needs >= 3 days)."""
+        daily = self.daily_srpe
+        rolling, probes, combined = _window_rolling(daily, keys, days)
+        n = _probe_values(rolling[["_n"]].sum(), probes, combined, len(keys))["_n"].fillna(0)
+        n = n.to_numpy().astype(int)
+
+        # Index of the first daily row after each probe == end of its window
+        is_data = (~probes).astype(int)
+        end = (np.cumsum(is_data) - is_data)[probes]
+        end_by_key = np.empty(len(keys), dtype=int)
+        end_by_key[combined.loc[probes, "_row"].astype(int).to_numpy()] = end
+
+        slope = np.zeros(len(keys))
+        width = int(n.max()) if len(n) else 0
+        valid = n >= 3
+        if width < 3 or not valid.any():
+            return slope
+
+        x = np.arange(width)
+        start = end_by_key - n
+        idx = np.clip(start[:, None] + x[None, :], 0, max(len(daily) - 1, 0))
+        mask = x[None, :] < n[:, None]
+        y = np.where(mask, daily["srpe"].to_numpy()[idx], 0.0)
+
+        n_f = np.maximum(n, 1).astype(float)
+        x_dev = np.where(mask, x[None, :] - ((n_f - 1) / 2)[:, None], 0.0)
+        y_dev = np.where(mask, y - (y.sum(axis=1) / n_f)[:, None], 0.0)
+        den = (x_dev ** 2).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(valid & (den > 0), (x_dev * y_dev).sum(axis=1) / den, 0.0)
+        return slope
+
+    def _wellness_features_vec(self, keys: pd.DataFrame) -> Dict[str, np.ndarray]:
+        feats = {}
+        cols = self.WELLNESS_COLS
+        w = self.wellness_sorted
+        windows = {days: _window_stats(w, keys, days, cols, ["mean", "std"]) for days in (3, 7, 28)}
+
+        def window_mean(days, col):
+            win = windows[days]
+            return np.where(win["n"].to_numpy() > 0, win[f"{col}_mean"].to_numpy(), 0.0)
+
+        for days in (3, 7, 28):
+            feats[f"wellness_avg_{days}d"] = window_mean(days, "wellness_score")
+        feats["wellness_delta_3_28"] = feats["wellness_avg_3d"] - feats["wellness_avg_28d"]
+
+        last = _asof_before(w, keys, ["wellness_score", "readiness_score"])
+        w3, w28 = windows[3], windows[28]
+        std28 = w28["wellness_score_std"].to_numpy()
+        recent = np.where(w3["n"].to_numpy() > 0, w3["wellness_score_mean"].to_numpy(),
+                          last["wellness_score"].to_numpy())
+        ok = (w28["n"].to_numpy() > 0) & (std28 > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            feats["wellness_zscore_28d"] = np.where(
+                ok, (recent - w28["wellness_score_mean"].to_numpy()) / std28, 0.0
+            )
+
+        for days in (3, 7):
+            feats[f"fatigue_avg_{days}d"] = window_mean(days, "fatigue_level")
+            feats[f"soreness_avg_{days}d"] = window_mean(days, "muscle_soreness")
+            feats[f"sleep_avg_{days}d"] = window_mean(days, "sleep_quality")
+            feats[f"stress_avg_{days}d"] = window_mean(days, "stress_level")
+
+        if self.has_readiness:
+            feats["readiness_latest"] = last["readiness_score"].fillna(0.0).to_numpy()
+        else:
+            feats["readiness_latest"] = np.zeros(len(keys))
+        return feats
+
+    def _exposure_features_vec(self, keys: pd.DataFrame) -> Dict[str, np.ndarray]:
+        feats = {}
+        for days in (7, 14):
+            win = _window_stats(self.pse_sorted, keys, days, ["duracao_min"], ["sum"])
+            feats[f"minutes_{days}d"] = win["duracao_min_sum"].fillna(0.0).to_numpy()
+
+        game_dates = keys["data"].to_numpy()
+        prev = np.searchsorted(self.game_dates, game_dates, side="left")
+        last_game = self.game_dates[np.clip(prev - 1, 0, None)] if len(self.game_dates) else game_dates
+        days_since = pd.Series(game_dates - last_game).dt.days.to_numpy()
+        feats["days_since_last_game"] = np.where(prev > 0, days_since, 30).astype(int)
+
+        since_14d = np.searchsorted(self.game_dates, game_dates - np.timedelta64(14, "D"), side="left")
+        feats["consecutive_games_14d"] = (prev - since_14d).astype(int)
+
+        sessions = self.gps_sorted.drop_duplicates(["atleta_id", "sessao_id"])
+        win = _window_stats(sessions, keys, 7, [], [])
+        feats["sessions_7d"] = win["n"].astype(int).to_numpy()
+        return feats
+
+    def _gps_trend_features_vec(self, keys: pd.DataFrame) -> Dict[str, np.ndarray]:
+        g = self.gps_sorted
+        rolled = g[["atleta_id", "data"]].copy()
+        values = pd.DataFrame({
+            "dist": g["distancia_total"],
+            "hsr": g["hsr_distance"].fillna(0),
+            "sprint": g["sprint_efforts"].fillna(0),
+            "acc": g["aceleracoes"].fillna(0),
+            "vmax": g["velocidade_max"].fillna(0),
+        })
+        grouped = values.groupby(g["atleta_id"], sort=False)
+        last4 = grouped.rolling(4, min_periods=1).mean().reset_index(level=0, drop=True)
+        last2 = grouped[["dist", "hsr"]].rolling(2, min_periods=1).mean().reset_index(level=0, drop=True)
+        for col in values.columns:
+            rolled[f"{col}_avg_last4"] = last4[col]
+        for col in ("dist", "hsr"):
+            rolled[f"{col}_recent2"] = last2[col]
+            rolled[f"{col}_prev2"] = last2[col].groupby(g["atleta_id"], sort=False).shift(2)
+        rolled["n_before"] = g.groupby("atleta_id", sort=False).cumcount() + 1
+
+        names = [c for c in rolled.columns if c not in ("atleta_id", "data")]
+        last = _asof_before(rolled, keys, names)
+        has_rows = last["n_before"].notna().to_numpy()
+        enough = last["n_before"].fillna(0).to_numpy() >= 4
+
+        feats = {}
+        for col in values.columns:
+            feats[f"{col}_avg_last4"] = np.where(has_rows, last[f"{col}_avg_last4"].to_numpy(), 0.0)
+        for col in ("dist", "hsr"):
+            prev2 = last[f"{col}_prev2"].to_numpy()
+            feats[f"{col}_trend_ratio"] = np.where(
+                enough, self._ratio(last[f"{col}_recent2"].to_numpy(), prev2), 1.0
+            )
+        return feats
+
+
 # ===================================================================
 # MODEL — XGBoost training, validation, prediction
 # ===================================================================
@@ -867,6 +1216,159 @@ class PreGamePredictor:
             return False
 
 
+# ===================================================================
+# FEATURE STORE — persisted targets/features per (athlete, game)
+# ===================================================================
+class PreGameFeatureStore:
+    """
+    Persists TargetBuilder / FeatureEngineer rows in pregame_features.
+
+    Each row is keyed by (atleta_id, sessao_id) and stamped with the input
+    watermark (latest created_at of the source tables) it was built from.
+    pregame_feature_builds logs every build, so the store watermark moves
+    even when new inputs affect no game.
+    """
+
+    TABLES_DDL = """
+        CREATE TABLE IF NOT EXISTS pregame_features (
+            atleta_id INTEGER NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+            sessao_id INTEGER NOT NULL REFERENCES sessoes(id) ON DELETE CASCADE,
+            data TIMESTAMP NOT NULL,
+            target_row JSON NOT NULL,
+            features JSON NOT NULL,
+            input_watermark TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (atleta_id, sessao_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_pregame_features_atleta_data
+            ON pregame_features(atleta_id, data);
+        CREATE TABLE IF NOT EXISTS pregame_feature_builds (
+            id SERIAL PRIMARY KEY,
+            input_watermark TIMESTAMP NOT NULL,
+            modo VARCHAR(20) NOT NULL,
+            n_jogos INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW()
+        );
+    """
+
+    KEY_COLS = ["atleta_id", "sessao_id", "data"]
+    BOOL_TARGET_COLS = ["rule_a", "rule_b", "rule_c", "has_baseline"]
+
+    def __init__(self, db):
+        self.db = db
+        self._ready = False
+
+    def ensure_tables(self):
+        if not self._ready:
+            self.db.execute_query(self.TABLES_DDL)
+            self._ready = True
+
+    def watermark(self) -> Optional[pd.Timestamp]:
+        """Input watermark of the last build (None if the store is empty)."""
+        self.ensure_tables()
+        rows = self.db.query_to_dict(
+            "SELECT MAX(input_watermark) AS watermark FROM pregame_feature_builds"
+        )
+        watermark = rows[0]["watermark"] if rows else None
+        return pd.Timestamp(watermark) if watermark is not None else None
+
+    @staticmethod
+    def _json_records(frame: pd.DataFrame) -> List[str]:
+        values = frame.drop(columns=PreGameFeatureStore.KEY_COLS).astype(object)
+        values = values.where(values.notna(), None)
+        return [
+            json.dumps(record, default=lambda v: v.item())
+            for record in values.to_dict("records")
+        ]
+
+    def write(self, targets: pd.DataFrame, features: pd.DataFrame,
+              watermark: pd.Timestamp, since: Optional[Dict[int, pd.Timestamp]] = None,
+              mode: str = "full") -> int:
+        """
+        Upsert rebuilt rows, then drop rows the rebuild no longer produced.
+
+        since limits the cleanup to {atleta_id: first rebuilt date}; without
+        it every row older than this build is removed.
+        """
+        self.ensure_tables()
+        if not targets.empty:
+            targets = targets.reset_index(drop=True)
+            features = features.reset_index(drop=True)
+            rows = list(zip(
+                targets["atleta_id"].astype(int).tolist(),
+                targets["sessao_id"].astype(int).tolist(),
+                [day.to_pydatetime() for day in pd.to_datetime(targets["data"])],
+                self._json_records(targets),
+                self._json_records(features),
+                [watermark.to_pydatetime()] * len(targets),
+            ))
+            self.db.execute_values_query("""
+                INSERT INTO pregame_features
+                    (atleta_id, sessao_id, data, target_row, features, input_watermark)
+                VALUES %s
+                ON CONFLICT (atleta_id, sessao_id) DO UPDATE SET
+                    data = EXCLUDED.data,
+                    target_row = EXCLUDED.target_row,
+                    features = EXCLUDED.features,
+                    input_watermark = EXCLUDED.input_watermark,
+                    updated_at = NOW()
+            """, rows)
+
+        if since is None:
+            self.db.execute_query(
+                "DELETE FROM pregame_features WHERE input_watermark < %s",
+                (watermark.to_pydatetime(),),
+            )
+        elif since:
+            self.db.execute_values_query("""
+                DELETE FROM pregame_features f
+                USING (VALUES %s) AS c(atleta_id, desde, watermark)
+                WHERE f.atleta_id = c.atleta_id
+                  AND f.data >= c.desde
+                  AND f.input_watermark < c.watermark
+            """, [
+                (int(aid), pd.Timestamp(day).to_pydatetime(), watermark.to_pydatetime())
+                for aid, day in since.items()
+            ], template="(%s, %s::timestamp, %s::timestamp)")
+
+        self.db.execute_query(
+            "INSERT INTO pregame_feature_builds (input_watermark, modo, n_jogos) VALUES (%s, %s, %s)",
+            (watermark.to_pydatetime(), mode, len(targets)),
+        )
+        logger.info(f"Feature store: {len(targets)} rows written ({mode})")
+        return len(targets)
+
+    def load(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Return (targets, features) in TargetBuilder order."""
+        self.ensure_tables()
+        rows = self.db.query_to_dict("""
+            SELECT atleta_id, sessao_id, data, target_row, features
+            FROM pregame_features
+            ORDER BY atleta_id, data, sessao_id
+        """)
+        if not rows:
+            return pd.DataFrame(), pd.DataFrame()
+
+        keys = pd.DataFrame(
+            [(r["atleta_id"], r["sessao_id"], r["data"]) for r in rows],
+            columns=self.KEY_COLS,
+        )
+        keys["data"] = pd.to_datetime(keys["data"])
+
+        targets = pd.concat([keys, pd.DataFrame([r["target_row"] for r in rows])], axis=1)
+        for col in targets.columns.difference(self.KEY_COLS):
+            if col in self.BOOL_TARGET_COLS:
+                targets[col] = targets[col].fillna(False).astype(bool)
+            else:
+                targets[col] = pd.to_numeric(targets[col]).astype(float)
+        targets["target"] = targets["target"].astype(int)
+
+        features = pd.concat([keys, pd.DataFrame([r["features"] for r in rows])], axis=1)
+        for col in features.columns.difference(self.KEY_COLS):
+            features[col] = pd.to_numeric(features[col]).astype(float)
+        return targets, features
+
+
 # ===================================================================
 # PIPELINE — orchestrates the full train/predict workflow
 # ===================================================================
@@ -879,6 +1381,7 @@ class PreGamePipeline:
     def __init__(self, db):
         self.db = db
         self.loader = DataLoader(db)
+        self.store = PreGameFeatureStore(db)
         self.predictor = PreGamePredictor()
 
         # Cached data
@@ -889,10 +1392,14 @@ class PreGamePipeline:
         self.athletes = None
         self.targets = None
         self.features = None
+        self.data_watermark = None
+        self.features_watermark = None
 
     def load_data(self):
         """Load all data from database."""
         logger.info("Loading data from database...")
+        # Read before loading: rows arriving mid-load are picked up next time
+        self.data_watermark = self.loader.load_input_watermark()
         self.sessions = self.loader.load_sessions()
         self.gps = self.loader.load_gps()
         self.pse = self.loader.load_pse()
@@ -905,6 +1412,13 @@ class PreGamePipeline:
             f"{len(self.wellness)} wellness records, {len(self.athletes)} athletes"
         )
 
+    def refresh_data(self) -> bool:
+        """Reload the input frames only if rows were added since the last load."""
+        if self.sessions is not None and self.loader.load_input_watermark() == self.data_watermark:
+            return False
+        self.load_data()
+        return True
+
     def build_target(self) -> pd.DataFrame:
         """Build target variable for all (athlete, game) pairs."""
         logger.info("Building target variable...")
@@ -931,11 +1445,80 @@ class PreGamePipeline:
     def build_features(self) -> pd.DataFrame:
         """Build pre-game features for all target rows."""
         logger.info("Engineering pre-game features...")
-        fe = FeatureEngineer(self.gps, self.pse, self.wellness, self.sessions)
+        fe = VectorizedFeatureEngineer(self.gps, self.pse, self.wellness, self.sessions)
         self.features = fe.build_features(self.targets)
         logger.info(f"Features built: {self.features.shape[1] - 3} features for {len(self.features)} samples")
         return self.features
 
+    @staticmethod
+    def _for_athletes(frame: pd.DataFrame, athlete_ids) -> pd.DataFrame:
+        if frame.empty:
+            return frame
+        return frame[frame["atleta_id"].isin(athlete_ids)]
+
+    def _rebuild_changed(self, changed: Dict[Optional[int], pd.Timestamp]
+                         ) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[int, pd.Timestamp]]:
+        """Targets/features for every game on or after each athlete's first changed date."""
+        since = {aid: day for aid, day in changed.items() if aid is not None}
+        if None in changed and not self.gps.empty:
+            # A new session can shift exposure features for every athlete
+            for aid in self.gps["atleta_id"].unique():
+                aid = int(aid)
+                since[aid] = min(since.get(aid, changed[None]), changed[None])
+
+        gps = self._for_athletes(self.gps, since)
+        targets = TargetBuilder.build(gps, self.sessions) if not gps.empty else pd.DataFrame()
+        if targets.empty:
+            return targets, pd.DataFrame(), since
+
+        first_day = targets["atleta_id"].map(since)
+        targets = targets[targets["data"] >= first_day].reset_index(drop=True)
+        fe = VectorizedFeatureEngineer(
+            gps, self._for_athletes(self.pse, since),
+            self._for_athletes(self.wellness, since), self.sessions,
+        )
+        return targets, fe.build_features(targets), since
+
+    def sync_features(self, full_rebuild: bool = False) -> Dict:
+        """
+        Bring targets/features up to date through the feature store.
+
+        Only games whose inputs changed since the store watermark are
+        recomputed; with nothing new, the stored matrix is reused as is.
+        """
+        self.refresh_data()
+        stored = None if full_rebuild else self.store.watermark()
+
+        if self.data_watermark is None:
+            mode, n_rebuilt = "no_data", 0
+            self.targets, self.features = pd.DataFrame(), pd.DataFrame()
+        elif stored is None:
+            mode = "full"
+            self.build_target()
+            self.features = self.build_features() if not self.targets.empty else pd.DataFrame()
+            n_rebuilt = self.store.write(self.targets, self.features, self.data_watermark, mode=mode)
+            self.features_watermark = self.data_watermark
+        elif self.data_watermark > stored:
+            mode = "incremental"
+            changed = self.loader.load_changed_since(stored)
+            targets, features, since = self._rebuild_changed(changed)
+            n_rebuilt = self.store.write(targets, features, self.data_watermark, since=since, mode=mode)
+        else:
+            mode, n_rebuilt = "cached", 0
+
+        if mode in ("incremental", "cached"):
+            current = self.store.watermark()
+            if self.features_watermark != current:
+                self.targets, self.features = self.store.load()
+                self.features_watermark = current
+
+        logger.info(f"Feature store sync: {mode}, {n_rebuilt} games rebuilt")
+        return {
+            "mode": mode,
+            "games_rebuilt": n_rebuilt,
+            "watermark": str(self.data_watermark) if self.data_watermark is not None else None,
+        }
+
     def train_model(self, train_game_ids=None, test_game_ids=None) -> Dict:
         """Train the XGBoost model with temporal validation."""
         logger.info("Training XGBoost model...")
@@ -985,7 +1568,7 @@ class PreGamePipeline:
 
         # Build features for all active athletes as if game is on game_date
         active = self.athletes[self.athletes["ativo"] == True]
-        fe = FeatureEngineer(self.gps, self.pse, self.wellness, self.sessions)
+        fe = VectorizedFeatureEngineer(self.gps, self.pse, self.wellness, self.sessions)
 
         # Create dummy target rows for feature building
         dummy_targets = pd.DataFrame({
@@ -1018,10 +1601,9 @@ class PreGamePipeline:
         results.sort(key=lambda x: x["probability"], reverse=True)
         return results
 
-    def run_full_pipeline(self) -> Dict:
-        """Run the complete pipeline: load → target → features → train → report."""
-        self.load_data()
-        self.build_target()
+    def run_full_pipeline(self, full_rebuild: bool = False) -> Dict:
+        """Run the complete pipeline: sync features → train → report."""
+        sync = self.sync_features(full_rebuild=full_rebuild)
 
         if self.targets.empty:
             return {
@@ -1029,11 +1611,11 @@ class PreGamePipeline:
                 "message": "No game sessions found in database. Upload game data first.",
             }
 
-        self.build_features()
         report = self.train_model()
 
         return {
             "status": "success",
+            "feature_store": sync,
             "training_report": report,
             "target_summary": {
                 "total_samples": len(self.targets),
@@ -1061,4 +1643,5 @@ def get_pipeline(db) -> PreGamePipeline:
     else:
         _pipeline_instance.db = db
         _pipeline_instance.loader = DataLoader(db)
+        _pipeline_instance.store.db = db
     return _pipeline_instance
@@ -166,8 +166,3 @@ def get_numerical_insights(
     except Exception as e:
         logger.error(f"Error getting numerical insights for {analysis_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        try:
-            db.close()
-        except:
-            pass
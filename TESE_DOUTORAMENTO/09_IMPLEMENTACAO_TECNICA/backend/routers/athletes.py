@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import date
 from database import get_db, DatabaseConnection
+from utils.athlete_resolver import athlete_resolver
 
 router = APIRouter()
 
@@ -167,6 +168,7 @@ def create_athlete(
             athlete.altura_cm,
             athlete.massa_kg
         ))
+        athlete_resolver.invalidate()
         
         if result:
             return result[0]
@@ -231,6 +233,7 @@ def update_athlete(
         """
         
         result = db.query_to_dict(update_query, update_values)
+        athlete_resolver.invalidate()
         
         if result:
             return result[0]
@@ -273,6 +276,7 @@ def delete_athlete(
             # Permanent deletion only if no associated data
             delete_query = "DELETE FROM atletas WHERE id = %s"
             db.execute_query(delete_query, (athlete_id,))
+            athlete_resolver.invalidate()
             
             return {
                 "status": "deleted",
@@ -283,6 +287,7 @@ def delete_athlete(
             # Soft delete (deactivate)
             deactivate_query = "UPDATE atletas SET ativo = false, updated_at = NOW() WHERE id = %s"
             db.execute_query(deactivate_query, (athlete_id,))
+            athlete_resolver.invalidate()
             
             reason = "has associated data" if has_data else "soft delete requested"
             
@@ -322,6 +327,7 @@ def reactivate_athlete(
     try:
         reactivate_query = "UPDATE atletas SET ativo = true, updated_at = NOW() WHERE id = %s"
         db.execute_query(reactivate_query, (athlete_id,))
+        athlete_resolver.invalidate()
         
         return {
             "status": "reactivated",
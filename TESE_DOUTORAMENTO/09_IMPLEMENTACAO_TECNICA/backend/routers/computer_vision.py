@@ -10,15 +10,26 @@ from pydantic import BaseModel
 from datetime import datetime
 import os
 import json
+import logging
 import uuid
 import threading
 from pathlib import Path
 
 from database import get_db, DatabaseConnection
-from computer_vision.detector import FootballDetector, FootballMetricsCalculator
+from computer_vision.detector import FootballMetricsCalculator
+from computer_vision.model_server import get_detector_pool
+from computer_vision.inference_backends import DEFAULT_BACKEND, INFERENCE_BACKENDS
 from computer_vision.advanced_detector import FootballVideoAnalyzer
-import cv2
-import numpy as np
+from computer_vision.job_queue import JobQueue, LeaseLost, load_checkpoint, save_checkpoint, clear_checkpoint
+from computer_vision.detection_store import store_detections, load_detection_frames
+from computer_vision.annotation_renderer import render_annotated_video
+from computer_vision.tracker import MultiObjectTracker
+from computer_vision.adaptive_sampler import AdaptiveSampler
+from computer_vision.pitch_roi import PitchROI
+from computer_vision.camera_model import CameraCalibrator
+from computer_vision.detection_cache import get_detection_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -28,6 +39,11 @@ class VideoAnalysisRequest(BaseModel):
     analysis_type: str = "full"  # full, quick, ball_only, players_only
     confidence_threshold: float = 0.5
     sample_rate: int = 1  # Process every Nth frame
+    workers: int = 1  # Worker processes (time-sliced segments)
+    detect_every: int = 1  # Detect on every Nth sampled frame, track in between
+    sampling: str = "adaptive"  # adaptive (content-driven) or fixed (every sample_rate frames)
+    inference_backend: str = DEFAULT_BACKEND  # torch, onnx or onnx-int8 (CPU)
+    pitch_roi: bool = True  # Detect on the pitch region only, drop people off the pitch
 
 class VideoAnalysisResponse(BaseModel):
     analysis_id: str
@@ -43,19 +59,12 @@ class AnalysisResult(BaseModel):
     created_at: datetime
     completed_at: Optional[datetime] = None
 
-# Global detector instance (in production, consider using dependency injection)
-detector = None
-metrics_calculator = FootballMetricsCalculator()
+# Run uploads through the durable job queue (cv_worker.py) instead of
+# in-process threads; set CV_JOB_QUEUE=0 to keep the threaded behaviour
+CV_JOB_QUEUE = os.getenv("CV_JOB_QUEUE", "1") != "0"
 
-def get_detector():
-    """Get or initialize the football detector"""
-    global detector
-    if detector is None:
-        try:
-            detector = FootballDetector()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to initialize detector: {str(e)}")
-    return detector
+# Detectors come from the process-wide warm pool (computer_vision.model_server)
+metrics_calculator = FootballMetricsCalculator()
 
 @router.post("/upload-video", response_model=VideoAnalysisResponse)
 async def upload_video_for_analysis(
@@ -64,12 +73,51 @@ async def upload_video_for_analysis(
     analysis_type: str = Form("full"),
     confidence_threshold: float = Form(0.5),
     sample_rate: int = Form(1),
+    workers: int = Form(1),
+    detect_every: int = Form(1),
+    sampling: str = Form("adaptive"),
+    inference_backend: str = Form(DEFAULT_BACKEND),
+    pitch_roi: bool = Form(True),
     db: DatabaseConnection = Depends(get_db)
 ):
     """
     Upload video file and start computer vision analysis
+    
+    workers > 1 splits the video into time segments analysed by separate
+    processes (one detector each). Each segment starts its own adaptive
+    sampler and pitch mask, so with the defaults the frames sampled and
+    the detections near segment boundaries can differ slightly from a
+    serial run; sampling="fixed" with pitch_roi=False detects the same
+    frames as a serial run.
+    
+    Detections are tracked (persistent track ids). detect_every > 1 runs
+    the detector on every Nth sampled frame only and fills the frames in
+    between with the tracker's predictions (single-process runs).
+    
+    sampling="adaptive" (default) picks the frames to detect from the
+    video content: every sample_rate frames during fast play, sparser
+    during stoppages and crowd / replay shots. sampling="fixed" detects
+    every sample_rate frames (auto-raised for large files) and honours
+    detect_every.
+    
+    inference_backend selects the model runtime: torch (ultralytics) or
+    onnx / onnx-int8 (onnxruntime on CPU, for servers without a GPU).
+    
+    pitch_roi=True (default) runs the detector on the pitch region only
+    (grass mask, refreshed every second) and drops players / referees
+    detected in the stands.
     """
     
+    max_workers = os.cpu_count() or 1
+    if workers < 1 or workers > max_workers:
+        raise HTTPException(status_code=400, detail=f"workers must be between 1 and {max_workers}")
+    if detect_every < 1 or detect_every > 10:
+        raise HTTPException(status_code=400, detail="detect_every must be between 1 and 10")
+    if sampling not in SAMPLING_MODES:
+        raise HTTPException(status_code=400, detail=f"sampling must be one of {', '.join(SAMPLING_MODES)}")
+    if inference_backend not in INFERENCE_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"inference_backend must be one of {', '.join(INFERENCE_BACKENDS)}")
+    
     # Validate file type
     if not file.filename.lower().endswith(('.mp4', '.avi', '.mov', '.mkv', '.wmv')):
         raise HTTPException(status_code=400, detail="Unsupported video format. Use MP4, AVI, MOV, MKV, or WMV")
@@ -112,13 +160,31 @@ async def upload_video_for_analysis(
             video_path.unlink()
         raise HTTPException(status_code=500, detail=f"Failed to create analysis record: {str(e)}")
     
-    # Start background processing in a separate thread so it doesn't block the server
-    thread = threading.Thread(
-        target=process_video_analysis,
-        args=(analysis_id, str(video_path), analysis_type, confidence_threshold, sample_rate),
-        daemon=True
-    )
-    thread.start()
+    payload = {
+        'video_path': str(video_path),
+        'analysis_type': analysis_type,
+        'confidence_threshold': confidence_threshold,
+        'sample_rate': sample_rate,
+        'workers': workers,
+        'detect_every': detect_every,
+        'sampling': sampling,
+        'inference_backend': inference_backend,
+        'pitch_roi': pitch_roi,
+    }
+    if CV_JOB_QUEUE:
+        # Durable queue: picked up by the cv_worker.py pool
+        try:
+            JobQueue(db).enqueue(analysis_id, payload)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to queue analysis: {str(e)}")
+    else:
+        # Start background processing in a separate thread so it doesn't block the server
+        thread = threading.Thread(
+            target=process_video_analysis,
+            args=(analysis_id, str(video_path), analysis_type, confidence_threshold, sample_rate, workers, detect_every, sampling, inference_backend, pitch_roi),
+            daemon=True
+        )
+        thread.start()
     
     # Estimate processing time based on file size and analysis type
     file_size_mb = len(content) / (1024 * 1024)
@@ -127,7 +193,8 @@ async def upload_video_for_analysis(
     return VideoAnalysisResponse(
         analysis_id=analysis_id,
         status="queued",
-        message="Video uploaded successfully. Analysis started in background.",
+        message="Video uploaded successfully. Analysis queued for the CV workers." if CV_JOB_QUEUE
+                else "Video uploaded successfully. Analysis started in background.",
         estimated_processing_time=estimated_time
     )
 
@@ -330,8 +397,14 @@ def manually_process_analysis(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/analysis/{analysis_id}/export")
-async def export_analysis_data(analysis_id: str, db: DatabaseConnection = Depends(get_db)):
-    """Export analysis data as JSON file."""
+def export_analysis_data(analysis_id: str, include_detections: bool = False,
+                         db: DatabaseConnection = Depends(get_db)):
+    """
+    Export analysis data as JSON file.
+    
+    Per-frame detections live in video_detections and are only added when
+    include_detections=true (use /analysis/{id}/detections for paging).
+    """
     try:
         # Get analysis data
         analysis = db.query_to_dict("SELECT * FROM video_analysis WHERE analysis_id = %s", (analysis_id,))
@@ -350,6 +423,20 @@ async def export_analysis_data(analysis_id: str, db: DatabaseConnection = Depend
         elif results is None:
             results = {}
         
+        detection_results = results.get('detection_results')
+        if include_detections and isinstance(detection_results, dict) and 'frame_detections' not in detection_results:
+            frame_detections = {}
+            after_frame = -1
+            while after_frame is not None:
+                page = load_detection_frames(db, analysis_id, after_frame=after_frame, limit_frames=5000)
+                for frame in page['frames']:
+                    frame_detections[frame['frame_number']] = {
+                        'timestamp': frame['timestamp'],
+                        'detections': frame['detections']
+                    }
+                after_frame = page['next_after_frame']
+            detection_results['frame_detections'] = frame_detections
+        
         # Create export data structure with safe datetime handling
         export_data = {
             "analysis_id": analysis.get('analysis_id'),
@@ -380,6 +467,51 @@ async def export_analysis_data(analysis_id: str, db: DatabaseConnection = Depend
         logger.error(f"Error exporting analysis {analysis_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/analysis/{analysis_id}/detections")
+def get_analysis_detections(
+    analysis_id: str,
+    after_frame: int = -1,
+    limit_frames: int = 250,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    object_class: Optional[str] = None,
+    db: DatabaseConnection = Depends(get_db)
+):
+    """
+    Page through per-frame detections of an analysis.
+    
+    Frames are returned in order; pass next_after_frame back as after_frame
+    to get the following page. start_time/end_time (seconds) restrict the
+    page to a time range of the video.
+    """
+    if not 1 <= limit_frames <= 5000:
+        raise HTTPException(status_code=400, detail="limit_frames must be between 1 and 5000")
+    try:
+        analysis = db.query_to_dict(
+            "SELECT analysis_id FROM video_analysis WHERE analysis_id = %s", (analysis_id,)
+        )
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        
+        page = load_detection_frames(
+            db, analysis_id,
+            after_frame=after_frame,
+            limit_frames=limit_frames,
+            start_time=start_time,
+            end_time=end_time,
+            object_class=object_class
+        )
+        return {
+            "analysis_id": analysis_id,
+            "frames": page['frames'],
+            "next_after_frame": page['next_after_frame']
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading detections for {analysis_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/analysis/{analysis_id}")
 def delete_analysis(
     analysis_id: str,
@@ -434,9 +566,18 @@ def reset_stuck_analysis(
         "UPDATE video_analysis SET status = 'failed', error_message = 'Reset: stuck in processing' WHERE analysis_id = %s",
         (analysis_id,)
     )
+    JobQueue(db).cancel(analysis_id)
+    clear_checkpoint(analysis_id)
     
     return {"message": "Analysis reset to failed status", "analysis_id": analysis_id}
 
+@router.get("/jobs/stats")
+def get_job_queue_stats(db: DatabaseConnection = Depends(get_db)):
+    """
+    Job counts per status in the durable analysis queue
+    """
+    return {"queue_enabled": CV_JOB_QUEUE, "jobs": JobQueue(db).stats()}
+
 @router.get("/metrics/summary")
 def get_computer_vision_summary(
     session_id: Optional[int] = None,
@@ -465,22 +606,60 @@ def get_computer_vision_summary(
     
     return result[0] if result else {}
 
+SAMPLING_MODES = ("adaptive", "fixed")
+
+
+def adaptive_sampler_for(analysis_type: str, sample_rate: int) -> AdaptiveSampler:
+    """
+    Sampler for an analysis: sample_rate is the densest step (fast play);
+    stoppages and off-pitch shots drop to one detection per second
+    (two seconds for quick analyses).
+    """
+    if analysis_type == "quick":
+        return AdaptiveSampler(min_interval=max(sample_rate, 3), max_interval=50)
+    return AdaptiveSampler(min_interval=sample_rate, max_interval=25)
+
+
 def process_video_analysis(
     analysis_id: str, 
     video_path: str, 
     analysis_type: str,
     confidence_threshold: float,
-    sample_rate: int
+    sample_rate: int,
+    workers: int = 1,
+    detect_every: int = 1,
+    sampling: str = "fixed",
+    inference_backend: str = DEFAULT_BACKEND,
+    pitch_roi: bool = False,
+    resumable: bool = False,
+    on_checkpoint: Optional[callable] = None,
+    lease_lost: Optional[callable] = None
 ):
     """
     Background task to process video analysis.
     Creates its own database connection since the request's connection
     is closed by the time this task runs.
+    
+    resumable=True (job queue workers): frame detections are checkpointed
+    to disk and a rerun resumes after the last checkpoint; errors are
+    re-raised so the queue can retry instead of marking the analysis failed.
+    lease_lost() is polled from the progress / checkpoint callbacks and
+    before the results are stored; once it returns True the run stops with
+    LeaseLost and writes nothing more.
+    
+    sampling="adaptive" replaces the file-size sample_rate heuristics with
+    an AdaptiveSampler (see adaptive_sampler_for).
+    
+    pitch_roi=True crops detection to the pitch region (PitchROI).
     """
     
     db = DatabaseConnection()
     start_time = datetime.now()
     
+    def check_lease():
+        if lease_lost and lease_lost():
+            raise LeaseLost(f"Analysis {analysis_id}: job lease lost")
+    
     try:
         # Update status to processing
         update_query = """
@@ -492,12 +671,15 @@ def process_video_analysis(
         print(f"[CV] Analysis {analysis_id}: status -> processing")
         
         # Check video file size and auto-adjust sample rate for large files
+        # (fixed sampling only; the adaptive sampler scales with the content)
         file_size_mb = 0
         try:
             file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
             print(f"[CV] Analysis {analysis_id}: video size = {file_size_mb:.1f} MB")
             
-            if file_size_mb > 500:
+            if sampling == "adaptive":
+                pass
+            elif file_size_mb > 500:
                 sample_rate = max(sample_rate, 10)
                 print(f"[CV] Analysis {analysis_id}: large video detected, auto-adjusting sample_rate to {sample_rate}")
             elif file_size_mb > 200:
@@ -508,6 +690,7 @@ def process_video_analysis(
         
         # Progress callback to update DB
         def on_progress(processed_frames, total_frames, percentage):
+            check_lease()
             try:
                 db.execute_query(
                     "UPDATE video_analysis SET progress_percentage = %s WHERE analysis_id = %s",
@@ -516,27 +699,131 @@ def process_video_analysis(
             except Exception:
                 pass  # Don't let progress updates break processing
         
-        # Initialize detector
-        print(f"[CV] Analysis {analysis_id}: initializing detector...")
-        det = get_detector()
-        print(f"[CV] Analysis {analysis_id}: detector ready")
-        
         # Process video based on analysis type
-        if analysis_type == "quick":
+        sampler = None
+        if sampling == "adaptive":
+            sampler = adaptive_sampler_for(analysis_type, sample_rate)
+            detect_every = 1
+        elif analysis_type == "quick":
             sample_rate = max(sample_rate, 5)  # Process every 5th frame minimum for quick analysis
         
-        # Run detection
-        print(f"[CV] Analysis {analysis_id}: starting video processing (sample_rate={sample_rate})")
-        detection_results = det.process_video(
-            video_path, 
-            confidence=confidence_threshold,
-            sample_rate=sample_rate,
-            progress_callback=on_progress
-        )
+        roi = PitchROI() if pitch_roi else None
+        # Per-shot pixel -> pitch homography (video_info['camera']); without a
+        # keypoint model every shot gets the linear full-frame mapping
+        calibrator = CameraCalibrator()
+        
+        start_frame, resumed = load_checkpoint(analysis_id) if resumable else (0, {})
+        
+        def on_segment_progress(processed_frames, total_frames, percentage):
+            if resumed:
+                # Adaptive progress counts scanned frames, fixed counts detected ones
+                done = start_frame if sampler else len(resumed)
+                total = done + total_frames
+                processed_frames = done + processed_frames
+                percentage = min(99.0, processed_frames / max(1, total) * 100)
+            on_progress(processed_frames, total_frames, percentage)
+        
+        def checkpoint(next_frame, new_frame_detections):
+            check_lease()
+            save_checkpoint(analysis_id, next_frame, new_frame_detections)
+            if on_checkpoint:
+                on_checkpoint(next_frame)
+        
+        # Check out a warm detector (blocks while the pool is busy)
+        print(f"[CV] Analysis {analysis_id}: waiting for a detector...")
+        with get_detector_pool(inference_backend).acquire() as det:
+            print(f"[CV] Analysis {analysis_id}: detector ready")
+            # Raw detections of earlier runs on the same video / model / ROI
+            detection_cache = get_detection_cache()
+            cache = None
+            if detection_cache is not None:
+                try:
+                    cache = detection_cache.entry(video_path, det, variant={'pitch_roi': roi.config() if roi else None})
+                    print(f"[CV] Analysis {analysis_id}: detection cache has {len(cache.frames)} frames")
+                except OSError as cache_err:
+                    print(f"[CV] Analysis {analysis_id}: detection cache unavailable: {cache_err}")
+            # Run detection + tracking
+            print(f"[CV] Analysis {analysis_id}: starting video processing (sampling={sampling}, sample_rate={sample_rate}, workers={workers}, detect_every={detect_every}, backend={inference_backend}, pitch_roi={pitch_roi})")
+            try:
+                if resumable and (start_frame > 0 or workers <= 1):
+                    if start_frame:
+                        print(f"[CV] Analysis {analysis_id}: resuming from frame {start_frame} ({len(resumed)} frames checkpointed)")
+                    # Track ids of the resumed part stay unique
+                    next_track_id = 1 + max(
+                        (detection.get('track_id', 0) for frame in resumed.values() for detection in frame['detections']),
+                        default=0
+                    )
+                    detection_results = det.process_video_pipelined(
+                        video_path,
+                        confidence=confidence_threshold,
+                        sample_rate=sample_rate,
+                        progress_callback=on_segment_progress,
+                        start_frame=start_frame,
+                        checkpoint_callback=checkpoint,
+                        tracker=MultiObjectTracker(next_id=next_track_id),
+                        detect_every=detect_every,
+                        sampler=sampler,
+                        pitch_roi=roi,
+                        calibrator=calibrator,
+                        cache=cache
+                    )
+                    if resumed:
+                        frame_detections = {**resumed, **detection_results['frame_detections']}
+                        video_info = detection_results['video_info']
+                        video_info['processed_frames'] = len(frame_detections)
+                        detection_results['frame_detections'] = frame_detections
+                        detection_results['summary'] = det.calculate_video_summary(
+                            frame_detections, video_info['fps'], video_info['total_frames']
+                        )
+                elif workers > 1:
+                    detection_results = det.process_video_parallel(
+                        video_path,
+                        workers=workers,
+                        confidence=confidence_threshold,
+                        sample_rate=sample_rate,
+                        progress_callback=on_progress,
+                        track=True,
+                        sampler_config=sampler.config() if sampler else None,
+                        roi_config=roi.config() if roi else None,
+                        camera_config=calibrator.config(),
+                        cache=cache
+                    )
+                else:
+                    detection_results = det.process_video(
+                        video_path, 
+                        confidence=confidence_threshold,
+                        sample_rate=sample_rate,
+                        progress_callback=on_progress,
+                        pipelined=True,
+                        track=True,
+                        detect_every=detect_every,
+                        sampler=sampler,
+                        pitch_roi=roi,
+                        calibrator=calibrator,
+                        cache=cache
+                    )
+            finally:
+                # Also after a failure: a retried job skips the frames already detected
+                if cache is not None:
+                    try:
+                        cache.save()
+                        detection_cache.evict(keep=cache)
+                    except OSError as cache_err:
+                        print(f"[CV] Analysis {analysis_id}: could not save detection cache: {cache_err}")
         
         # Calculate metrics
         metrics = metrics_calculator.calculate_session_metrics(detection_results)
         
+        # Per-frame detections go to video_detections; the JSONB keeps summaries only
+        check_lease()
+        frame_detections = detection_results.pop('frame_detections', {})
+        stored = store_detections(db, analysis_id, frame_detections)
+        detection_results['detections_storage'] = {
+            'table': 'video_detections',
+            'frames': len(frame_detections),
+            'rows': stored
+        }
+        
         # Combine results
         final_results = {
             'detection_results': detection_results,
@@ -545,12 +832,18 @@ def process_video_analysis(
                 'analysis_type': analysis_type,
                 'confidence_threshold': confidence_threshold,
                 'sample_rate': sample_rate,
+                'workers': workers,
+                'detect_every': detect_every,
+                'sampling': sampling,
+                'inference_backend': inference_backend,
+                'pitch_roi': pitch_roi,
                 'video_size_mb': round(file_size_mb, 1),
                 'processing_time': (datetime.now() - start_time).total_seconds()
             }
         }
         
         # Update database with results
+        check_lease()
         processing_time = (datetime.now() - start_time).total_seconds()
         
         update_query = """
@@ -566,8 +859,13 @@ def process_video_analysis(
             analysis_id
         ))
         print(f"[CV] Analysis {analysis_id}: status -> completed ({processing_time:.1f}s)")
+        if resumable:
+            clear_checkpoint(analysis_id)
         
     except Exception as e:
+        if resumable:
+            raise
+
         # Update status to failed with error message
         processing_time = (datetime.now() - start_time).total_seconds()
         error_msg = f"{type(e).__name__}: {str(e)}"
@@ -601,12 +899,15 @@ def get_model_info():
     """
     
     try:
-        detector = get_detector()
+        pool = get_detector_pool()
+        with pool.acquire() as detector:
+            model_path, class_names = detector.model_path, detector.class_names
         return {
             'model_type': 'YOLOv8',
-            'model_path': detector.model_path,
-            'supported_classes': detector.class_names,
+            'model_path': model_path,
+            'supported_classes': class_names,
             'status': 'loaded',
+            'detector_pool': pool.stats(),
             'capabilities': [
                 'Player detection',
                 'Ball tracking', 
@@ -728,15 +1029,39 @@ def get_detailed_analysis_results(
         'status': 'completed'
     }
 
+def annotated_video_path(video_path: str, analysis_id: str,
+                         start_time: Optional[float] = None,
+                         end_time: Optional[float] = None) -> str:
+    """Output file of an annotated video (one file per clip range)"""
+    video_name = Path(video_path).stem
+    clip = ""
+    if start_time is not None or end_time is not None:
+        clip = f"_{start_time or 0:g}-{'end' if end_time is None else f'{end_time:g}'}s"
+    return f"uploads/processed/{video_name}_annotated_{analysis_id[:8]}{clip}.mp4"
+
+
+def validate_clip_range(start_time: Optional[float], end_time: Optional[float]):
+    if start_time is not None and start_time < 0:
+        raise HTTPException(status_code=400, detail="start_time must be >= 0")
+    if end_time is not None and end_time <= (start_time or 0):
+        raise HTTPException(status_code=400, detail="end_time must be greater than start_time")
+
+
 @router.post("/analysis/{analysis_id}/generate-annotated-video")
 def generate_annotated_video(
     analysis_id: str,
     background_tasks: BackgroundTasks,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
     db: DatabaseConnection = Depends(get_db)
 ):
     """
     Generate annotated video with detection overlays
+    
+    start_time/end_time (seconds) render only that clip, e.g. 20 seconds
+    around an event, instead of the whole match.
     """
+    validate_clip_range(start_time, end_time)
     
     # Check if analysis exists and is completed
     analysis_query = """
@@ -762,37 +1087,45 @@ def generate_annotated_video(
         raise HTTPException(status_code=404, detail="Original video file not found")
     
     # Check if annotated video already exists
-    video_name = Path(video_path).stem
-    output_path = f"uploads/processed/{video_name}_annotated_{analysis_id[:8]}.mp4"
+    output_path = annotated_video_path(video_path, analysis_id, start_time, end_time)
+    video_url = f"/api/computer-vision/annotated-video/{analysis_id}"
+    clip_params = [f"{name}={value:g}" for name, value in (('start_time', start_time), ('end_time', end_time))
+                   if value is not None]
+    if clip_params:
+        video_url += "?" + "&".join(clip_params)
     
     if os.path.exists(output_path):
         return {
             'status': 'exists',
             'message': 'Annotated video already exists',
             'video_path': output_path,
-            'video_url': f"/api/computer-vision/annotated-video/{analysis_id}"
+            'video_url': video_url
         }
     
     # Start background task to create annotated video
     background_tasks.add_task(
         create_annotated_video_task,
-        analysis_id, video_path, output_path, db
+        analysis_id, video_path, output_path, start_time, end_time
     )
     
     return {
         'status': 'generating',
         'message': 'Annotated video generation started',
         'analysis_id': analysis_id,
-        'estimated_time': 'A few minutes'
+        'video_url': video_url,
+        'estimated_time': 'A few seconds' if end_time is not None else 'A few minutes'
     }
 
 @router.get("/annotated-video/{analysis_id}")
 def get_annotated_video(
     analysis_id: str,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
     db: DatabaseConnection = Depends(get_db)
 ):
     """
-    Download or stream the annotated video
+    Download or stream the annotated video (or clip, same start_time/end_time
+    as when it was generated)
     """
     from fastapi.responses import FileResponse
     
@@ -809,8 +1142,7 @@ def get_annotated_video(
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     video_path = result[0]['video_path']
-    video_name = Path(video_path).stem
-    output_path = f"uploads/processed/{video_name}_annotated_{analysis_id[:8]}.mp4"
+    output_path = annotated_video_path(video_path, analysis_id, start_time, end_time)
     
     if not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Annotated video not found. Generate it first.")
@@ -818,7 +1150,7 @@ def get_annotated_video(
     return FileResponse(
         output_path,
         media_type='video/mp4',
-        filename=f"{video_name}_annotated.mp4"
+        filename=Path(output_path).name.replace(f"_{analysis_id[:8]}", "")
     )
 
 @router.get("/session/{session_id}/detailed-analyses")
@@ -993,116 +1325,25 @@ def get_player_coverage_assessment(avg_players):
     else:
         return 'Limited Coverage'
 
-async def create_annotated_video_task(analysis_id: str, video_path: str, output_path: str, db: DatabaseConnection):
+def create_annotated_video_task(analysis_id: str, video_path: str, output_path: str,
+                                start_time: Optional[float] = None,
+                                end_time: Optional[float] = None):
     """
     Background task to create annotated video
+    Creates its own database connection (the request's one is closed by
+    the time this task runs) and streams detections frame by frame.
     """
+    db = DatabaseConnection()
     try:
-        # Get all detections for this analysis
-        detections_query = """
-            SELECT 
-                frame_number,
-                timestamp_seconds,
-                object_class,
-                confidence,
-                bbox_x1, bbox_y1, bbox_x2, bbox_y2,
-                center_x, center_y
-            FROM video_detections 
-            WHERE analysis_id = %s
-            ORDER BY frame_number, object_class
-        """
-        
-        detections = db.query_to_dict(detections_query, (analysis_id,))
-        
-        if not detections:
-            print(f"No detections found for analysis {analysis_id}")
-            return
-        
-        # Group detections by frame
-        detections_by_frame = {}
-        for det in detections:
-            frame_num = det['frame_number']
-            if frame_num not in detections_by_frame:
-                detections_by_frame[frame_num] = []
-            detections_by_frame[frame_num].append(det)
-        
-        # Open video
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print(f"Could not open video: {video_path}")
-            return
-        
-        # Get video properties
-        fps = int(cap.get(cv2.CAP_PROP_FPS))
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
-        # Create output directory
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Setup video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-        
-        # Color map for different object classes
-        colors = {
-            'ball': (0, 255, 0),        # Green
-            'player': (255, 0, 0),      # Blue
-            'goalkeeper': (0, 0, 255),  # Red
-            'referee': (255, 255, 0)    # Cyan
-        }
-        
-        frame_count = 0
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Draw detections for this frame
-            if frame_count in detections_by_frame:
-                frame_detections = detections_by_frame[frame_count]
-                
-                for det in frame_detections:
-                    # Get bounding box coordinates
-                    x1, y1, x2, y2 = int(det['bbox_x1']), int(det['bbox_y1']), int(det['bbox_x2']), int(det['bbox_y2'])
-                    
-                    # Get color for this object class
-                    color = colors.get(det['object_class'], (128, 128, 128))
-                    
-                    # Draw bounding box
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                    
-                    # Draw label with confidence
-                    label = f"{det['object_class']}: {det['confidence']:.2f}"
-                    label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                    
-                    # Draw label background
-                    cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                                 (x1 + label_size[0], y1), color, -1)
-                    
-                    # Draw label text
-                    cv2.putText(frame, label, (x1, y1 - 5), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            # Add timestamp and frame info
-            timestamp = frame_count / fps
-            info_text = f"Frame: {frame_count} | Time: {timestamp:.1f}s | Detections: {len(detections_by_frame.get(frame_count, []))}"
-            cv2.putText(frame, info_text, (10, height - 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            # Write frame
-            out.write(frame)
-            frame_count += 1
-        
-        # Cleanup
-        cap.release()
-        out.release()
-        
-        print(f"Annotated video created: {output_path}")
+        result = render_annotated_video(db, analysis_id, video_path, output_path,
+                                        start_time=start_time, end_time=end_time)
+        if not result['annotated_frames']:
+            print(f"No detections found for analysis {analysis_id} in the requested range")
+        print(f"Annotated video created: {output_path} ({result['frames_written']} frames)")
         
     except Exception as e:
         print(f"Error creating annotated video: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        db.close()
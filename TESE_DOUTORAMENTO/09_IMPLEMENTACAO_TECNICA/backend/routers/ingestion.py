@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import pandas as pd
+import numpy as np
 import io
 from datetime import datetime, date
 import hashlib
 from database import get_db, DatabaseConnection
+from utils.athlete_resolver import athlete_resolver
+from utils.load_metrics_engine import LoadMetricsEngine, refresh_load_metrics
+from utils.dashboard_cache import dashboard_cache
 from PIL import Image
 import base64
 import tempfile
@@ -16,33 +20,226 @@ router = APIRouter()
 def match_player_name(csv_name: str, db: DatabaseConnection) -> int:
     """Match CSV player name to database athlete ID"""
     
-    clean_name = csv_name.strip().lower()
+    athlete_id = athlete_resolver.resolve(csv_name, db)
     
-    query = """
-        SELECT id, nome_completo, jogador_id
-        FROM atletas
-        WHERE LOWER(nome_completo) = %s OR LOWER(jogador_id) = %s
-        ORDER BY ativo DESC
-        LIMIT 1
-    """
-    result = db.query_to_dict(query, (clean_name, clean_name))
-    
-    if result:
-        return result[0]['id']
+    if athlete_id is None:
+        raise ValueError(f"Player not found: {csv_name}")
     
-    similarity_query = """
-        SELECT id, nome_completo
-        FROM atletas
-        WHERE similarity(LOWER(nome_completo), %s) > 0.6
-        ORDER BY similarity(LOWER(nome_completo), %s) DESC
-        LIMIT 1
+    return athlete_id
+
+
+# Catapult CSV column -> (dados_gps column, type)
+CATAPULT_GPS_COLUMNS = [
+    ('total_distance_m', 'distancia_total', float),
+    ('max_velocity_kmh', 'velocidade_max', float),
+    ('acc_b1_3_total_efforts', 'aceleracoes', int),
+    ('decel_b1_3_total_efforts', 'desaceleracoes', int),
+    ('efforts_over_19_8_kmh', 'effs_19_8_kmh', int),
+    ('distance_over_19_8_kmh', 'dist_19_8_kmh', float),
+    ('efforts_over_25_2_kmh', 'effs_25_2_kmh', int),
+]
+
+
+def resolve_athlete_ids(names: pd.Series, db: DatabaseConnection) -> Tuple[pd.Series, Dict[Any, str]]:
     """
-    similar = db.query_to_dict(similarity_query, (clean_name, clean_name))
-    
-    if similar:
-        return similar[0]['id']
-    
-    raise ValueError(f"Player not found: {csv_name}")
+    Resolve a column of CSV player names to athlete IDs
+
+    Distinct names go through the cached athlete resolver in one pass.
+    Returns the ID series (NaN where unresolved) and per-row errors.
+    """
+
+    clean = names.astype(str).str.strip().str.lower()
+    resolved = athlete_resolver.resolve_many(clean.unique(), db)
+    ids = clean.map(resolved)
+
+    errors = {idx: f"Player not found: {names.loc[idx]}" for idx in ids.index[ids.isna()]}
+    return ids, errors
+
+
+def parse_numeric_column(df: pd.DataFrame, csv_col: str) -> Tuple[pd.Series, Dict[Any, str]]:
+    """
+    Parse one CSV column as floats (NaN where missing)
+
+    Non-empty cells that do not parse are returned as per-row errors.
+    """
+
+    if csv_col not in df.columns:
+        return pd.Series(np.nan, index=df.index), {}
+
+    raw = df[csv_col]
+    values = pd.to_numeric(raw, errors='coerce')
+
+    invalid = values.isna() & raw.notna()
+    errors = {idx: f"Invalid value for {csv_col}: {raw.loc[idx]!r}" for idx in raw.index[invalid]}
+    return values.astype(float), errors
+
+
+def to_db_values(values: pd.Series, col_type: type = float) -> pd.Series:
+    """Convert a float series to Python int/float objects with None for NaN"""
+
+    if col_type is int:
+        return pd.Series(
+            [int(v) if v == v else None for v in np.trunc(values.to_numpy())],
+            index=values.index, dtype=object
+        )
+    return values.astype(object).where(values.notna(), None)
+
+
+def coerce_numeric_columns(df: pd.DataFrame, columns: List[Tuple[str, str, type]]) -> Tuple[pd.DataFrame, Dict[Any, str]]:
+    """
+    Vectorised numeric coercion of CSV columns into DB-ready values
+
+    Missing columns and empty cells become None. Non-empty cells that do not
+    parse are reported per row instead of aborting the whole file.
+    """
+
+    out = pd.DataFrame(index=df.index)
+    errors = {}
+
+    for csv_col, db_col, col_type in columns:
+        values, col_errors = parse_numeric_column(df, csv_col)
+        for idx, message in col_errors.items():
+            errors.setdefault(idx, message)
+        out[db_col] = to_db_values(values, col_type)
+
+    return out, errors
+
+
+def bulk_insert_catapult(
+    df: pd.DataFrame,
+    session_id: int,
+    session_time: datetime,
+    fonte: str,
+    db: DatabaseConnection
+) -> Tuple[int, List[str]]:
+    """
+    Insert a Catapult DataFrame into dados_gps with constant DB round trips
+
+    One name-map prefetch, vectorised coercion and a single multi-row
+    INSERT in one transaction. Rows with errors are skipped and reported.
+    """
+
+    athlete_ids, name_errors = resolve_athlete_ids(df['player'], db)
+    values_df, value_errors = coerce_numeric_columns(df, CATAPULT_GPS_COLUMNS)
+
+    row_errors = {**value_errors, **name_errors}
+    valid = ~df.index.isin(list(row_errors))
+
+    db_columns = [db_col for _, db_col, _ in CATAPULT_GPS_COLUMNS]
+    values = [
+        (session_time, int(athlete_id), session_id, *metrics, fonte)
+        for athlete_id, metrics in zip(
+            athlete_ids[valid],
+            values_df.loc[valid, db_columns].itertuples(index=False, name=None)
+        )
+    ]
+
+    insert_query = f"""
+        INSERT INTO dados_gps (
+            time, atleta_id, sessao_id,
+            {', '.join(db_columns)},
+            fonte, created_at
+        ) VALUES %s
+        ON CONFLICT DO NOTHING
+    """
+    template = "(" + ", ".join(["%s"] * (len(db_columns) + 4)) + ", NOW())"
+    inserted = db.execute_values_query(insert_query, values, template=template)
+
+    errors = [f"Row {idx}: {row_errors[idx]}" for idx in df.index if idx in row_errors]
+    return inserted, errors
+
+
+# PSE CSV column -> (default when empty, min, max); values are truncated to int
+PSE_SCALE_COLUMNS = {
+    'Sono': (3, 1, 5),
+    'Stress': (3, 1, 5),
+    'Fadiga': (3, 1, 5),
+    'DOMS': (2, 1, 5),
+    'DORES MUSCULARES': (2, 1, 5),
+    'Rpe': (5, 1, 10),
+}
+
+
+def build_pse_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[Any, str]]:
+    """
+    Validate and normalise a PSE upload for the whole DataFrame at once
+
+    Wellness scales are clamped to the dados_pse constraints, duration
+    defaults to 90 min and carga_total falls back to PSE x duration.
+    """
+
+    errors = {}
+
+    def column(csv_col):
+        values, col_errors = parse_numeric_column(df, csv_col)
+        for idx, message in col_errors.items():
+            errors.setdefault(idx, message)
+        return values
+
+    scales = {}
+    for csv_col, (default, low, high) in PSE_SCALE_COLUMNS.items():
+        scales[csv_col] = np.trunc(column(csv_col).fillna(default)).clip(low, high)
+
+    duracao = np.trunc(column('VOLUME')).fillna(90)
+    carga = np.trunc(column('CARGA')).fillna(duracao * scales['Rpe'])
+
+    out = pd.DataFrame({
+        'qualidade_sono': scales['Sono'],
+        'stress': scales['Stress'],
+        'fadiga': scales['Fadiga'],
+        'dor_muscular': scales['DORES MUSCULARES'],
+        'duracao_min': duracao,
+        'pse': scales['Rpe'],
+        'carga_total': carga,
+    }, index=df.index)
+    for col in out.columns:
+        out[col] = to_db_values(out[col], int)
+
+    return out, errors
+
+
+def bulk_insert_pse(
+    df: pd.DataFrame,
+    session_id: int,
+    session_time: datetime,
+    fonte: str,
+    db: DatabaseConnection
+) -> Tuple[int, List[str]]:
+    """
+    Insert a PSE DataFrame into dados_pse with constant DB round trips
+
+    Same pipeline as bulk_insert_catapult: one athlete prefetch, vectorised
+    validation and a single multi-row INSERT in one transaction.
+    """
+
+    athlete_ids, name_errors = resolve_athlete_ids(df['Nome'], db)
+    values_df, value_errors = build_pse_frame(df)
+
+    row_errors = {**value_errors, **name_errors}
+    valid = ~df.index.isin(list(row_errors))
+
+    db_columns = list(values_df.columns)
+    values = [
+        (session_time, int(athlete_id), session_id, *metrics, fonte)
+        for athlete_id, metrics in zip(
+            athlete_ids[valid],
+            values_df.loc[valid].itertuples(index=False, name=None)
+        )
+    ]
+
+    insert_query = f"""
+        INSERT INTO dados_pse (
+            time, atleta_id, sessao_id,
+            {', '.join(db_columns)},
+            fonte, created_at
+        ) VALUES %s
+        ON CONFLICT DO NOTHING
+    """
+    template = "(" + ", ".join(["%s"] * (len(db_columns) + 4)) + ", NOW())"
+    inserted = db.execute_values_query(insert_query, values, template=template)
+
+    errors = [f"Row {idx}: {row_errors[idx]}" for idx in df.index if idx in row_errors]
+    return inserted, errors
 
 
 async def handle_non_csv_upload(
@@ -244,11 +441,15 @@ async def ingest_catapult_csv(
     file: UploadFile = File(...),
     jornada: int = 1,
     session_date: str = None,
+    bulk: bool = True,
     db: DatabaseConnection = Depends(get_db)
 ):
     """
     Ingest Catapult CSV export
     Expected columns: player, total_distance_m, max_velocity_kmh, etc.
+    
+    With bulk=True (default) the whole file is written in one transaction;
+    bulk=False keeps the legacy row-by-row insert.
     """
     
     # Accept CSV, PDF, and image files
@@ -282,6 +483,24 @@ async def ingest_catapult_csv(
             parsed_date = date.today()
         
         session_id = create_or_get_session(jornada, parsed_date, db, file.filename)
+        session_time = datetime.combine(parsed_date, datetime.min.time())
+        
+        if bulk:
+            inserted_count, errors = bulk_insert_catapult(
+                df, session_id, session_time, f'catapult_csv_{file.filename}', db
+            )
+            dashboard_cache.invalidate()
+            return {
+                "status": "success",
+                "file": file.filename,
+                "file_hash": file_hash,
+                "jornada": jornada,
+                "session_id": session_id,
+                "session_date": str(parsed_date),
+                "total_rows": len(df),
+                "inserted": inserted_count,
+                "errors": errors
+            }
         
         inserted_count = 0
         errors = []
@@ -330,6 +549,7 @@ async def ingest_catapult_csv(
             except Exception as e:
                 errors.append(f"Row {idx}: Unexpected error - {str(e)}")
         
+        dashboard_cache.invalidate()
         return {
             "status": "success",
             "file": file.filename,
@@ -357,11 +577,15 @@ async def ingest_pse_csv(
     file: UploadFile = File(...),
     jornada: int = 1,
     session_date: str = None,
+    bulk: bool = True,
     db: DatabaseConnection = Depends(get_db)
 ):
     """
     Ingest PSE/Wellness CSV export
     Expected columns: Nome, Pos, Sono, Stress, Fadiga, DOMS, VOLUME, Rpe, CARGA
+    
+    With bulk=True (default) the whole file is written in one transaction;
+    bulk=False keeps the legacy row-by-row insert.
     """
     
     # Accept CSV, PDF, and image files
@@ -395,6 +619,25 @@ async def ingest_pse_csv(
             parsed_date = date.today()
         
         session_id = create_or_get_session(jornada, parsed_date, db, file.filename)
+        session_time = datetime.combine(parsed_date, datetime.min.time())
+        
+        if bulk:
+            inserted_count, errors = bulk_insert_pse(
+                df, session_id, session_time, file.filename, db
+            )
+            load_metrics = refresh_load_metrics(db, LoadMetricsEngine(db).touched_by_sessions([session_id]))
+            return {
+                "status": "success",
+                "file": file.filename,
+                "file_hash": file_hash,
+                "jornada": jornada,
+                "session_id": session_id,
+                "session_date": str(parsed_date),
+                "total_rows": len(df),
+                "inserted": inserted_count,
+                "errors": errors,
+                "load_metrics": load_metrics
+            }
         
         inserted_count = 0
         errors = []
@@ -461,6 +704,7 @@ async def ingest_pse_csv(
             except Exception as e:
                 errors.append(f"Row {idx}: Unexpected error - {str(e)}")
         
+        load_metrics = refresh_load_metrics(db, LoadMetricsEngine(db).touched_by_sessions([session_id]))
         return {
             "status": "success",
             "file": file.filename,
@@ -470,7 +714,8 @@ async def ingest_pse_csv(
             "session_date": str(parsed_date),
             "total_rows": len(df),
             "inserted": inserted_count,
-            "errors": errors
+            "errors": errors,
+            "load_metrics": load_metrics
         }
         
     except pd.errors.EmptyDataError:
@@ -769,10 +1014,14 @@ def delete_session(
         gps_count = db.query_to_dict(gps_count_query, (session_id,))[0]['count']
         pse_count = db.query_to_dict(pse_count_query, (session_id,))[0]['count']
         
+        # Athlete-weeks whose load metrics change once the PSE rows are gone
+        touched = LoadMetricsEngine(db).touched_by_sessions([session_id])
+        
         # Delete in correct order (foreign key constraints)
         db.execute_query("DELETE FROM dados_gps WHERE sessao_id = %s", (session_id,))
         db.execute_query("DELETE FROM dados_pse WHERE sessao_id = %s", (session_id,))
         db.execute_query("DELETE FROM sessoes WHERE id = %s", (session_id,))
+        load_metrics = refresh_load_metrics(db, touched)
         
         return {
             "status": "success",
@@ -785,7 +1034,8 @@ def delete_session(
             "deleted_records": {
                 "gps": gps_count,
                 "pse": pse_count
-            }
+            },
+            "load_metrics": load_metrics
         }
         
     except Exception as e:
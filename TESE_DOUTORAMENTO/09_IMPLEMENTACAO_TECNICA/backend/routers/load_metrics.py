@@ -6,7 +6,7 @@ API endpoints for advanced training load metrics (Monotony, Strain, ACWR, Z-Scor
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import Optional, List
 from datetime import datetime, date
-from database import get_db, DatabaseConnection
+from database import get_async_db, AsyncDatabaseConnection
 
 router = APIRouter(prefix="/api/load-metrics", tags=["Load Metrics"])
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/api/load-metrics", tags=["Load Metrics"])
 async def get_athlete_metrics(
     athlete_id: int,
     weeks: Optional[int] = Query(None, description="Number of recent weeks to return"),
-    db: DatabaseConnection = Depends(get_db)
+    db: AsyncDatabaseConnection = Depends(get_async_db)
 ):
     """
     Get weekly load metrics for a specific athlete
@@ -64,7 +64,7 @@ async def get_athlete_metrics(
         params.append(weeks)
     
     try:
-        results = db.query_to_dict(query, tuple(params))
+        results = await db.query_to_dict(query, tuple(params))
         
         if not results:
             raise HTTPException(status_code=404, detail=f"No metrics found for athlete {athlete_id}")
@@ -120,7 +120,7 @@ async def get_athlete_metrics(
 @router.get("/team/overview")
 async def get_team_overview(
     week_start: Optional[date] = Query(None, description="Specific week to analyze (defaults to most recent)"),
-    db: DatabaseConnection = Depends(get_db)
+    db: AsyncDatabaseConnection = Depends(get_async_db)
 ):
     """
     Get team-wide load metrics overview
@@ -171,7 +171,7 @@ async def get_team_overview(
     """
     
     try:
-        results = db.query_to_dict(query, params)
+        results = await db.query_to_dict(query, params)
         
         if not results:
             raise HTTPException(status_code=404, detail="No metrics found for the specified week")
@@ -234,7 +234,7 @@ async def get_team_overview(
 @router.get("/team/by-position")
 async def get_metrics_by_position(
     week_start: Optional[date] = Query(None, description="Specific week (defaults to most recent)"),
-    db: DatabaseConnection = Depends(get_db)
+    db: AsyncDatabaseConnection = Depends(get_async_db)
 ):
     """
     Get average metrics grouped by position
@@ -270,7 +270,7 @@ async def get_metrics_by_position(
     """
     
     try:
-        results = db.query_to_dict(query, params)
+        results = await db.query_to_dict(query, params)
         
         if not results:
             raise HTTPException(status_code=404, detail="No metrics found")
@@ -312,7 +312,7 @@ async def get_metrics_by_position(
 @router.get("/trends")
 async def get_team_trends(
     weeks: int = Query(5, description="Number of recent weeks to analyze"),
-    db: DatabaseConnection = Depends(get_db)
+    db: AsyncDatabaseConnection = Depends(get_async_db)
 ):
     """
     Get team-wide trends over time
@@ -338,7 +338,7 @@ async def get_team_trends(
     """
     
     try:
-        results = db.query_to_dict(query, (weeks,))
+        results = await db.query_to_dict(query, (weeks,))
         
         trends = []
         for row in results:
@@ -374,7 +374,7 @@ async def get_team_trends(
 async def get_calculation_details(
     athlete_id: int,
     week_start: date,
-    db: DatabaseConnection = Depends(get_db)
+    db: AsyncDatabaseConnection = Depends(get_async_db)
 ):
     """
     Get detailed calculation breakdown for a specific athlete and week
@@ -398,7 +398,7 @@ async def get_calculation_details(
             WHERE mc.atleta_id = %s AND mc.semana_inicio = %s
         """
         
-        metric_result = db.query_to_dict(metric_query, (athlete_id, week_start))
+        metric_result = await db.query_to_dict(metric_query, (athlete_id, week_start))
         
         if not metric_result:
             raise HTTPException(status_code=404, detail="No metrics found for this athlete/week")
@@ -413,25 +413,26 @@ async def get_calculation_details(
                 carga_total
             FROM dados_pse
             WHERE atleta_id = %s 
-            AND DATE(time) BETWEEN %s AND %s
+            AND time >= %s AND time < %s::date + 1
             ORDER BY time
         """
         
-        daily_loads = db.query_to_dict(daily_loads_query, (athlete_id, week_start, week_end))
+        daily_loads = await db.query_to_dict(daily_loads_query, (athlete_id, week_start, week_end))
         
-        # Get all workouts chronologically to find last 7 for monotony
-        all_workouts_query = """
+        # Last 7 workouts up to the end of the week for monotony (newest first, then reversed)
+        last_workouts_query = """
             SELECT 
                 DATE(time) as data,
                 carga_total
             FROM dados_pse
             WHERE atleta_id = %s 
-            AND DATE(time) <= %s
-            ORDER BY time
+            AND time < %s::date + 1
+            ORDER BY time DESC
+            LIMIT 7
         """
         
-        all_workouts = db.query_to_dict(all_workouts_query, (athlete_id, week_end))
-        last_7_workouts = all_workouts[-7:] if len(all_workouts) >= 7 else all_workouts
+        last_7_workouts = await db.query_to_dict(last_workouts_query, (athlete_id, week_end))
+        last_7_workouts.reverse()
         
         # Get team averages for Z-score context
         team_avg_query = """
@@ -448,7 +449,7 @@ async def get_calculation_details(
             WHERE semana_inicio = %s
         """
         
-        team_avg = db.query_to_dict(team_avg_query, (week_start,))
+        team_avg = await db.query_to_dict(team_avg_query, (week_start,))
         
         return {
             "athlete": {
@@ -532,8 +533,190 @@ async def get_calculation_details(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/team/rolling-load")
+async def get_team_rolling_load(
+    reference_date: Optional[date] = Query(None, description="Reference day (defaults to the latest day with PSE data)"),
+    db: AsyncDatabaseConnection = Depends(get_async_db)
+):
+    """
+    Get 7-day and 28-day rolling PSE load and ACWR for every active athlete
+    
+    Reads the ca_pse_diario_atleta continuous aggregate (one row per athlete
+    and training day) instead of scanning dados_pse
+    """
+    
+    query = """
+        WITH ref AS (
+            SELECT COALESCE(%s::date, (SELECT MAX(dia) FROM ca_pse_diario_atleta)::date) AS dia
+        ),
+        carga AS (
+            SELECT
+                ca.atleta_id,
+                SUM(ca.carga_total_sum) FILTER (WHERE ca.dia > ref.dia - 7) AS carga_7d,
+                SUM(ca.carga_total_sum) AS carga_28d,
+                SUM(ca.n_sessoes) FILTER (WHERE ca.dia > ref.dia - 7) AS sessoes_7d
+            FROM ca_pse_diario_atleta ca, ref
+            WHERE ca.dia > ref.dia - 28 AND ca.dia < ref.dia + 1
+            GROUP BY ca.atleta_id
+        )
+        SELECT
+            a.id as athlete_id,
+            a.nome_completo as name,
+            a.posicao as position,
+            ref.dia as reference_date,
+            COALESCE(c.carga_7d, 0) as carga_7d,
+            COALESCE(c.carga_28d, 0) as carga_28d,
+            COALESCE(c.sessoes_7d, 0) as sessoes_7d
+        FROM atletas a
+        CROSS JOIN ref
+        LEFT JOIN carga c ON c.atleta_id = a.id
+        WHERE a.ativo = TRUE
+        ORDER BY a.nome_completo
+    """
+    
+    try:
+        results = await db.query_to_dict(query, (reference_date,))
+        
+        if not results or results[0]['reference_date'] is None:
+            raise HTTPException(status_code=404, detail="No PSE data available")
+        
+        athletes = []
+        for row in results:
+            acute = float(row['carga_7d'])
+            chronic = float(row['carga_28d']) / 4
+            athletes.append({
+                "athlete_id": row['athlete_id'],
+                "name": row['name'],
+                "position": row['position'],
+                "load_7d": round(acute, 2),
+                "load_28d": round(float(row['carga_28d']), 2),
+                "sessions_7d": int(row['sessoes_7d']),
+                "acwr": round(acute / chronic, 2) if chronic > 0 else None
+            })
+        
+        return {
+            "reference_date": results[0]['reference_date'].isoformat(),
+            "athletes": athletes,
+            "total_athletes": len(athletes)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/athlete/{athlete_id}/rolling-load")
+async def get_athlete_rolling_load(
+    athlete_id: int,
+    days: int = Query(90, ge=1, le=730, description="Number of recent days to return"),
+    db: AsyncDatabaseConnection = Depends(get_async_db)
+):
+    """
+    Get the daily 7-day/28-day rolling PSE load and ACWR series of an athlete
+    
+    Reads the vw_carga_rolante_atleta view (window over ca_pse_diario_atleta)
+    """
+    
+    query = """
+        SELECT dia, carga_dia, carga_7d, carga_28d, sessoes_7d, acwr
+        FROM vw_carga_rolante_atleta
+        WHERE atleta_id = %s
+        AND dia > (SELECT MAX(dia) FROM ca_pse_diario_atleta WHERE atleta_id = %s) - %s * INTERVAL '1 day'
+        ORDER BY dia
+    """
+    
+    try:
+        results = await db.query_to_dict(query, (athlete_id, athlete_id, days))
+        
+        if not results:
+            raise HTTPException(status_code=404, detail=f"No PSE data found for athlete {athlete_id}")
+        
+        series = []
+        for row in results:
+            series.append({
+                "date": row['dia'].date().isoformat(),
+                "load": float(row['carga_dia']),
+                "load_7d": float(row['carga_7d']),
+                "load_28d": float(row['carga_28d']),
+                "sessions_7d": int(row['sessoes_7d']),
+                "acwr": round(float(row['acwr']), 2) if row['acwr'] is not None else None
+            })
+        
+        return {
+            "athlete_id": athlete_id,
+            "days": days,
+            "series": series
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/team/weekly-load")
+async def get_team_weekly_load(
+    weeks: int = Query(8, ge=1, le=104, description="Number of recent weeks to return"),
+    db: AsyncDatabaseConnection = Depends(get_async_db)
+):
+    """
+    Get weekly PSE load totals per athlete
+    
+    Reads the ca_pse_semanal_atleta continuous aggregate (Monday-Sunday
+    weeks, same as metricas_carga), so recent uploads show up before the
+    weekly metrics are recalculated
+    """
+    
+    query = """
+        SELECT
+            ca.semana,
+            ca.atleta_id,
+            a.nome_completo,
+            a.posicao,
+            ca.n_treinos,
+            ca.carga_total_sum,
+            ca.pse_avg,
+            ca.duracao_min_sum
+        FROM ca_pse_semanal_atleta ca
+        JOIN atletas a ON a.id = ca.atleta_id
+        WHERE ca.semana > (SELECT MAX(semana) FROM ca_pse_semanal_atleta) - %s * INTERVAL '7 days'
+        ORDER BY ca.semana, a.nome_completo
+    """
+    
+    try:
+        results = await db.query_to_dict(query, (weeks,))
+        
+        by_week = {}
+        for row in results:
+            week = row['semana'].date().isoformat()
+            by_week.setdefault(week, []).append({
+                "athlete_id": row['atleta_id'],
+                "name": row['nome_completo'],
+                "position": row['posicao'],
+                "workouts": int(row['n_treinos']),
+                "load": float(row['carga_total_sum']),
+                "avg_pse": round(float(row['pse_avg']), 2) if row['pse_avg'] is not None else None,
+                "duration_min": float(row['duracao_min_sum'])
+            })
+        
+        return {
+            "weeks_analyzed": len(by_week),
+            "weeks": [
+                {
+                    "week_start": week,
+                    "team_load": round(sum(a['load'] for a in athletes), 2),
+                    "athletes": athletes
+                } for week, athletes in by_week.items()
+            ]
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/weeks")
-async def get_available_weeks(db: DatabaseConnection = Depends(get_db)):
+async def get_available_weeks(db: AsyncDatabaseConnection = Depends(get_async_db)):
     """
     Get list of all available weeks with metrics data
     
@@ -551,7 +734,7 @@ async def get_available_weeks(db: DatabaseConnection = Depends(get_db)):
     """
     
     try:
-        results = db.query_to_dict(query)
+        results = await db.query_to_dict(query)
         
         weeks = []
         for row in results:
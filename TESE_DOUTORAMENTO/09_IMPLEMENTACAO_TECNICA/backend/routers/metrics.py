@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Dict, Any, List, Optional
 from datetime import date, datetime, timedelta
 from database import get_db, DatabaseConnection
+from utils.dashboard_cache import dashboard_cache
 import logging
 import numpy as np
 
@@ -21,103 +22,54 @@ def team_dashboard(
     1. Who is at risk?
     2. Why (in simple terms)?
     3. Is the situation getting worse or better?
-    """
     
-    # Get most recent week from metricas_carga
-    most_recent_week_query = """
+    Built by a single SQL statement and cached until metricas_carga,
+    risk_assessment or the roster change (or an upload invalidates it).
+    """
+    return dashboard_cache.get(db, build_team_dashboard)
+
+
+# Whole dashboard as one JSON document: z-scores use window aggregates over
+# the most recent week, so no separate team stats / week queries are needed
+TEAM_DASHBOARD_QUERY = """
+    WITH latest_week AS (
         SELECT MAX(semana_inicio) as week_start
         FROM metricas_carga
-    """
-    week_result = db.query_to_dict(most_recent_week_query)
-    most_recent_week = week_result[0]['week_start'] if week_result else None
-    
-    if not most_recent_week:
-        # Fallback to simple dashboard if no metrics calculated yet
-        simple_query = """
-            SELECT 
-                a.id as atleta_id,
-                a.nome_completo,
-                a.posicao,
-                a.ativo,
-                0 as weekly_load,
-                0 as monotony,
-                0 as strain,
-                0 as acwr,
-                'green' as risk_monotony,
-                'green' as risk_strain,
-                'green' as risk_acwr,
-                0 as training_days,
-                0 as num_sessoes,
-                0 as distancia_total_media,
-                0 as velocidade_max_media,
-                0 as aceleracoes_media,
-                'green' as risk_overall
-            FROM atletas a
-            WHERE a.ativo = TRUE
-            ORDER BY a.nome_completo
-        """
-        athletes = db.query_to_dict(simple_query)
-        return {
-            "week_analyzed": None,
-            "athletes_overview": athletes,
-            "top_load_athletes": [],
-            "at_risk_athletes": [],
-            "risk_summary": {"red": 0, "yellow": 0, "green": len(athletes)},
-            "team_context": {
-                "total_athletes": len(athletes),
-                "message": "No training data available. Add athletes and training sessions to see metrics."
-            }
-        }
-    
-    # Get team averages and std deviations for z-score calculation
-    team_stats_query = """
+    ),
+    latest_metrics AS (
         SELECT 
-            AVG(carga_total_semanal) as mean_load,
-            STDDEV(carga_total_semanal) as std_load,
-            AVG(monotonia) as mean_monotony,
-            STDDEV(monotonia) as std_monotony,
-            AVG(tensao) as mean_strain,
-            STDDEV(tensao) as std_strain,
-            AVG(acwr) as mean_acwr,
-            STDDEV(acwr) as std_acwr
-        FROM metricas_carga
-        WHERE semana_inicio = %s
-    """
-    team_stats = db.query_to_dict(team_stats_query, (most_recent_week,))[0]
-    
-    # Enhanced dashboard query with risk indicators
-    dashboard_query = """
-        WITH latest_metrics AS (
-            SELECT 
-                a.id as atleta_id,
-                a.nome_completo,
-                a.numero_camisola,
-                a.posicao,
-                a.ativo,
-                mc.carga_total_semanal as weekly_load,
-                mc.monotonia as monotony,
-                mc.tensao as strain,
-                mc.acwr,
-                mc.nivel_risco_monotonia as risk_monotony,
-                mc.nivel_risco_tensao as risk_strain,
-                mc.nivel_risco_acwr as risk_acwr,
-                mc.dias_treino as training_days
-            FROM atletas a
-            LEFT JOIN metricas_carga mc ON mc.atleta_id = a.id AND mc.semana_inicio = %s
-            WHERE a.ativo = TRUE
-        ),
-        gps_summary AS (
-            SELECT 
-                g.atleta_id,
-                COUNT(DISTINCT g.sessao_id) as num_sessoes,
-                ROUND(AVG(g.distancia_total)::numeric, 2) as distancia_total_media,
-                ROUND(AVG(g.velocidade_max)::numeric, 2) as velocidade_max_media,
-                ROUND(AVG(g.aceleracoes)::numeric, 2) as aceleracoes_media
-            FROM dados_gps g
-            JOIN sessoes s ON s.id = g.sessao_id
-            WHERE s.data >= %s AND s.data < %s + INTERVAL '7 days'
-            GROUP BY g.atleta_id
-        )
+            a.id as atleta_id,
+            a.nome_completo,
+            a.numero_camisola,
+            a.posicao,
+            a.ativo,
+            mc.carga_total_semanal as weekly_load,
+            mc.monotonia as monotony,
+            mc.tensao as strain,
+            mc.acwr,
+            mc.nivel_risco_monotonia as risk_monotony,
+            mc.nivel_risco_tensao as risk_strain,
+            mc.nivel_risco_acwr as risk_acwr,
+            mc.dias_treino as training_days
+        FROM atletas a
+        CROSS JOIN latest_week w
+        LEFT JOIN metricas_carga mc ON mc.atleta_id = a.id AND mc.semana_inicio = w.week_start
+        WHERE a.ativo = TRUE
+    ),
+    gps_summary AS (
+        -- Daily GPS continuous aggregate: a few rows per athlete instead of the hypertable
+        SELECT 
+            g.atleta_id,
+            SUM(g.n_sessoes) as num_sessoes,
+            ROUND((SUM(g.distancia_total_sum) / NULLIF(SUM(g.n_registos), 0))::numeric, 2) as distancia_total_media,
+            ROUND(AVG(g.velocidade_max_max)::numeric, 2) as velocidade_max_media,
+            ROUND((SUM(g.aceleracoes_sum) / NULLIF(SUM(g.n_registos), 0))::numeric, 2) as aceleracoes_media
+        FROM ca_gps_diario_atleta g
+        CROSS JOIN latest_week w
+        WHERE g.dia >= w.week_start AND g.dia < w.week_start + INTERVAL '7 days'
+        GROUP BY g.atleta_id
+    ),
+    team_stats AS (
         SELECT 
             lm.*,
             COALESCE(gs.num_sessoes, 0) as num_sessoes,
@@ -130,58 +82,39 @@ def team_dashboard(
                 WHEN lm.risk_monotony = 'yellow' OR lm.risk_strain = 'yellow' OR lm.risk_acwr = 'yellow' THEN 'yellow'
                 WHEN lm.risk_monotony = 'green' OR lm.risk_strain = 'green' OR lm.risk_acwr = 'green' THEN 'green'
                 ELSE 'unknown'
-            END as risk_overall
+            END as risk_overall,
+            AVG(lm.weekly_load) OVER () as mean_load,
+            STDDEV(lm.weekly_load) OVER () as std_load,
+            AVG(lm.monotony) OVER () as mean_monotony,
+            STDDEV(lm.monotony) OVER () as std_monotony,
+            AVG(lm.strain) OVER () as mean_strain,
+            STDDEV(lm.strain) OVER () as std_strain,
+            AVG(lm.acwr) OVER () as mean_acwr,
+            STDDEV(lm.acwr) OVER () as std_acwr
         FROM latest_metrics lm
         LEFT JOIN gps_summary gs ON gs.atleta_id = lm.atleta_id
-        ORDER BY 
-            CASE 
-                WHEN lm.risk_monotony = 'red' OR lm.risk_strain = 'red' OR lm.risk_acwr = 'red' THEN 1
-                WHEN lm.risk_monotony = 'yellow' OR lm.risk_strain = 'yellow' OR lm.risk_acwr = 'yellow' THEN 2
-                WHEN lm.risk_monotony = 'green' OR lm.risk_strain = 'green' OR lm.risk_acwr = 'green' THEN 3
-                ELSE 4
-            END,
-            lm.nome_completo
-    """
-    
-    athletes = db.query_to_dict(dashboard_query, (most_recent_week, most_recent_week, most_recent_week))
-    
-    # Calculate z-scores and enrich data
-    risk_counts = {"red": 0, "yellow": 0, "green": 0, "unknown": 0}
-    
-    for athlete in athletes:
-        # Calculate z-scores (standardized vs team)
-        if team_stats['std_load'] and team_stats['std_load'] > 0:
-            athlete['z_load'] = round((athlete['weekly_load'] - team_stats['mean_load']) / team_stats['std_load'], 2) if athlete['weekly_load'] else None
-        else:
-            athlete['z_load'] = None
-            
-        if team_stats['std_monotony'] and team_stats['std_monotony'] > 0:
-            athlete['z_monotony'] = round((athlete['monotony'] - team_stats['mean_monotony']) / team_stats['std_monotony'], 2) if athlete['monotony'] else None
-        else:
-            athlete['z_monotony'] = None
-            
-        if team_stats['std_strain'] and team_stats['std_strain'] > 0:
-            athlete['z_strain'] = round((athlete['strain'] - team_stats['mean_strain']) / team_stats['std_strain'], 2) if athlete['strain'] else None
-        else:
-            athlete['z_strain'] = None
-            
-        if team_stats['std_acwr'] and team_stats['std_acwr'] > 0:
-            athlete['z_acwr'] = round((athlete['acwr'] - team_stats['mean_acwr']) / team_stats['std_acwr'], 2) if athlete['acwr'] else None
-        else:
-            athlete['z_acwr'] = None
-        
-        # Count risk levels
-        risk_counts[athlete['risk_overall']] = risk_counts.get(athlete['risk_overall'], 0) + 1
-    
-    # Get top 5 athletes by load
-    top_load_athletes = sorted(
-        [a for a in athletes if a['weekly_load']],
-        key=lambda x: x['weekly_load'],
-        reverse=True
-    )[:5]
-    
-    # Get at-risk athletes from risk_assessment table with detailed explanations
-    risk_athletes_query = """
+    ),
+    overview AS (
+        SELECT 
+            ts.atleta_id, ts.nome_completo, ts.numero_camisola, ts.posicao, ts.ativo,
+            ts.weekly_load, ts.monotony, ts.strain, ts.acwr,
+            ts.risk_monotony, ts.risk_strain, ts.risk_acwr, ts.training_days,
+            ts.num_sessoes, ts.distancia_total_media, ts.velocidade_max_media, ts.aceleracoes_media,
+            ts.risk_overall,
+            -- Z-scores (standardized vs team); missing or zero values have none
+            CASE WHEN ts.std_load > 0 AND ts.weekly_load <> 0
+                 THEN ROUND(((ts.weekly_load - ts.mean_load) / ts.std_load)::numeric, 2) END as z_load,
+            CASE WHEN ts.std_monotony > 0 AND ts.monotony <> 0
+                 THEN ROUND(((ts.monotony - ts.mean_monotony) / ts.std_monotony)::numeric, 2) END as z_monotony,
+            CASE WHEN ts.std_strain > 0 AND ts.strain <> 0
+                 THEN ROUND(((ts.strain - ts.mean_strain) / ts.std_strain)::numeric, 2) END as z_strain,
+            CASE WHEN ts.std_acwr > 0 AND ts.acwr <> 0
+                 THEN ROUND(((ts.acwr - ts.mean_acwr) / ts.std_acwr)::numeric, 2) END as z_acwr,
+            CASE ts.risk_overall WHEN 'red' THEN 1 WHEN 'yellow' THEN 2 WHEN 'green' THEN 3 ELSE 4 END as risk_rank
+        FROM team_stats ts
+    ),
+    at_risk AS (
+        -- At-risk athletes from risk_assessment with detailed explanations
         SELECT DISTINCT
             a.id as atleta_id,
             a.nome_completo as nome,
@@ -221,23 +154,84 @@ def team_dashboard(
         JOIN atletas a ON r.atleta_id = a.id
         WHERE a.ativo = TRUE 
         AND (r.injury_risk_category = 'Alto' OR r.injury_risk_category = 'very_high')
-        ORDER BY a.nome_completo
-    """
-    at_risk_athletes = db.query_to_dict(risk_athletes_query)
+    )
+    SELECT json_build_object(
+        'week_analyzed', (SELECT week_start FROM latest_week),
+        'athletes_overview', COALESCE((
+            SELECT json_agg(to_jsonb(o) - 'risk_rank' ORDER BY o.risk_rank, o.nome_completo)
+            FROM overview o
+        ), '[]'),
+        'top_load_athletes', COALESCE((
+            SELECT json_agg(to_jsonb(t) - 'risk_rank' ORDER BY t.weekly_load DESC)
+            FROM (
+                SELECT * FROM overview
+                WHERE weekly_load <> 0
+                ORDER BY weekly_load DESC
+                LIMIT 5
+            ) t
+        ), '[]'),
+        'at_risk_athletes', COALESCE((
+            SELECT json_agg(r ORDER BY r.nome) FROM at_risk r
+        ), '[]'),
+        'risk_summary', (
+            SELECT json_build_object(
+                'red', COUNT(*) FILTER (WHERE risk_overall = 'red'),
+                'yellow', COUNT(*) FILTER (WHERE risk_overall = 'yellow'),
+                'green', COUNT(*) FILTER (WHERE risk_overall = 'green'),
+                'unknown', COUNT(*) FILTER (WHERE risk_overall = 'unknown')
+            )
+            FROM overview
+        ),
+        'team_context', (
+            SELECT json_build_object(
+                'mean_load', NULLIF(ROUND(MAX(mean_load)::numeric, 2), 0),
+                'mean_monotony', NULLIF(ROUND(MAX(mean_monotony)::numeric, 2), 0),
+                'mean_strain', NULLIF(ROUND(MAX(mean_strain)::numeric, 2), 0),
+                'mean_acwr', NULLIF(ROUND(MAX(mean_acwr)::numeric, 2), 0)
+            )
+            FROM team_stats
+        )
+    ) as dashboard
+"""
+
+
+def build_team_dashboard(db: DatabaseConnection) -> Dict[str, Any]:
+    """Run the dashboard statement (one round trip)"""
+    dashboard = db.query_to_dict(TEAM_DASHBOARD_QUERY)[0]['dashboard']
     
-    return {
-        "week_analyzed": most_recent_week.isoformat() if most_recent_week else None,
-        "athletes_overview": athletes,
-        "top_load_athletes": top_load_athletes,
-        "at_risk_athletes": at_risk_athletes,
-        "risk_summary": risk_counts,
-        "team_context": {
-            "mean_load": round(float(team_stats['mean_load']), 2) if team_stats['mean_load'] else None,
-            "mean_monotony": round(float(team_stats['mean_monotony']), 2) if team_stats['mean_monotony'] else None,
-            "mean_strain": round(float(team_stats['mean_strain']), 2) if team_stats['mean_strain'] else None,
-            "mean_acwr": round(float(team_stats['mean_acwr']), 2) if team_stats['mean_acwr'] else None
+    if not dashboard['week_analyzed']:
+        # Fallback to simple dashboard if no metrics calculated yet
+        athletes = [
+            {
+                **{key: athlete[key] for key in ('atleta_id', 'nome_completo', 'posicao', 'ativo')},
+                "weekly_load": 0,
+                "monotony": 0,
+                "strain": 0,
+                "acwr": 0,
+                "risk_monotony": 'green',
+                "risk_strain": 'green',
+                "risk_acwr": 'green',
+                "training_days": 0,
+                "num_sessoes": 0,
+                "distancia_total_media": 0,
+                "velocidade_max_media": 0,
+                "aceleracoes_media": 0,
+                "risk_overall": 'green'
+            } for athlete in sorted(dashboard['athletes_overview'], key=lambda a: a['nome_completo'])
+        ]
+        return {
+            "week_analyzed": None,
+            "athletes_overview": athletes,
+            "top_load_athletes": [],
+            "at_risk_athletes": [],
+            "risk_summary": {"red": 0, "yellow": 0, "green": len(athletes)},
+            "team_context": {
+                "total_athletes": len(athletes),
+                "message": "No training data available. Add athletes and training sessions to see metrics."
+            }
         }
-    }
+    
+    return dashboard
 
 
 @router.get("/team/summary")
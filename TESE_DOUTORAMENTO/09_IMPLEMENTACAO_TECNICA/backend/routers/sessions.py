@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import date
 from database import get_db, DatabaseConnection
+from utils.load_metrics_engine import LoadMetricsEngine, refresh_load_metrics
 
 router = APIRouter()
 
@@ -229,12 +230,16 @@ def delete_session(
     data_counts = db.query_to_dict(data_check_query, (session_id, session_id))[0]
     
     try:
+        # Athlete-weeks whose load metrics change once the PSE rows are gone
+        touched = LoadMetricsEngine(db).touched_by_sessions([session_id])
+        
         # Delete associated data first (foreign key constraints)
         db.execute_query("DELETE FROM dados_gps WHERE sessao_id = %s", (session_id,))
         db.execute_query("DELETE FROM dados_pse WHERE sessao_id = %s", (session_id,))
         
         # Delete the session
         db.execute_query("DELETE FROM sessoes WHERE id = %s", (session_id,))
+        load_metrics = refresh_load_metrics(db, touched)
         
         return {
             "status": "deleted",
@@ -249,7 +254,8 @@ def delete_session(
             "deleted_records": {
                 "gps": data_counts['gps_count'],
                 "pse": data_counts['pse_count']
-            }
+            },
+            "load_metrics": load_metrics
         }
         
     except Exception as e:
@@ -14,6 +14,8 @@ import json
 from pathlib import Path
 
 from database import DatabaseConnection
+from computer_vision.camera_model import CameraModels
+from computer_vision.detection_store import CLASS_NAMES, iter_frame_boxes
 from spatial_analysis.shapefile_generator import (
     TacticalShapefileGenerator, 
     SpatialPlayerPosition,
@@ -29,6 +31,7 @@ class ShapefileGenerationRequest(BaseModel):
     include_formation_lines: bool = True
     include_tactical_zones: bool = True
     output_format: str = "shapefile"  # "shapefile" or "geojson"
+    frame_number: Optional[int] = None  # Detected frame to map (default: demonstration line-up)
 
 class SpatialAnalysisResponse(BaseModel):
     status: str
@@ -42,7 +45,12 @@ async def generate_analysis_shapefiles(
     request: ShapefileGenerationRequest,
     background_tasks: BackgroundTasks
 ):
-    """Generate shapefiles from tactical analysis results"""
+    """
+    Generate shapefiles from tactical analysis results
+    
+    With request.frame_number the player points are the detections of that
+    frame, projected to pitch metres with the analysis camera model.
+    """
     
     try:
         db = DatabaseConnection()
@@ -69,11 +77,15 @@ async def generate_analysis_shapefiles(
         elif results is None:
             results = {}
         
+        players, ball_position = None, None
+        if request.frame_number is not None:
+            players, ball_position = detected_frame_positions(db, analysis_id, results, request.frame_number)
+        
         # Create temporary directory for shapefiles
         temp_dir = tempfile.mkdtemp(prefix=f"tactical_shapefiles_{analysis_id[:8]}_")
         
         # Generate shapefiles
-        output_files = generate_tactical_shapefiles_from_analysis(results, temp_dir)
+        output_files = generate_tactical_shapefiles_from_analysis(results, temp_dir, players, ball_position)
         
         if not output_files:
             raise HTTPException(status_code=500, detail="Failed to generate shapefiles")
@@ -109,6 +121,30 @@ async def generate_analysis_shapefiles(
     finally:
         db.close()
 
+def detected_frame_positions(db: DatabaseConnection, analysis_id: str, results: Dict[str, Any],
+                             frame_number: int):
+    """(players, ball_position) in pitch metres for one detected frame of an analysis"""
+    video_info = results.get('detection_results', {}).get('video_info', {})
+    camera = CameraModels.from_video_info(video_info).for_frame(frame_number)
+    
+    frame = next(iter_frame_boxes(db, analysis_id, frame_number, frame_number + 1), None)
+    if frame is None:
+        raise HTTPException(status_code=404, detail=f"No detections stored for frame {frame_number}")
+    _, boxes, class_ids, confidences = frame
+    class_names = [CLASS_NAMES.get(int(class_id), 'unknown') for class_id in class_ids]
+    
+    timestamp = frame_number / video_info['fps'] if video_info.get('fps') else 0.0
+    players = TacticalShapefileGenerator().players_from_detections(boxes, class_names, camera, timestamp=timestamp)
+    
+    ball_position = None
+    balls = [i for i, name in enumerate(class_names) if name == 'ball']
+    if balls:
+        best = max(balls, key=lambda i: confidences[i])
+        x1, y1, x2, y2 = boxes[best]
+        ball = camera.image_to_pitch([(x1 + x2) / 2, (y1 + y2) / 2])[0]
+        ball_position = (float(ball[0]), float(ball[1]))
+    return players, ball_position
+
 @router.get("/download/{analysis_id}")
 async def download_shapefiles(analysis_id: str):
     """Download generated shapefiles as ZIP"""
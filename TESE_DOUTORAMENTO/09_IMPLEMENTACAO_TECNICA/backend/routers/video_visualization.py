@@ -3,9 +3,9 @@ Video Visualization Router for Football Analysis
 Provides endpoints to generate annotated videos with tactical overlays
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, StreamingResponse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 import os
 import cv2
@@ -13,11 +13,12 @@ import json
 import uuid
 from pathlib import Path
 import numpy as np
-import tempfile
 import io
 
 from database import get_db, DatabaseConnection
 from computer_vision.tactical_analyzer import TacticalAnalyzer, VideoTacticalVisualizer, PlayerPosition
+from computer_vision.camera_model import CameraModel
+from computer_vision.render_engine import RenderEngine, RenderStatusStore
 
 router = APIRouter()
 
@@ -33,14 +34,13 @@ class VideoProcessingStatus(BaseModel):
     message: str
     video_url: Optional[str] = None
 
-# Global storage for processing status
-processing_status = {}
+# Overlay rendering runs in a shared process pool; status lives in video_visualizations
+render_engine = RenderEngine(DatabaseConnection)
 
 @router.post("/generate-visualization/{analysis_id}")
-async def generate_video_visualization(
+def generate_video_visualization(
     analysis_id: str,
-    request: VideoVisualizationRequest,
-    background_tasks: BackgroundTasks
+    request: VideoVisualizationRequest
 ):
     """Generate annotated video with tactical overlays"""
     
@@ -48,7 +48,7 @@ async def generate_video_visualization(
     try:
         # Get analysis data
         analysis = db.query_to_dict("""
-            SELECT analysis_id, video_path, results, status
+            SELECT analysis_id, video_path, status
             FROM video_analysis 
             WHERE analysis_id = %s AND status = 'completed'
         """, (analysis_id,))
@@ -60,22 +60,10 @@ async def generate_video_visualization(
         
         # Generate unique processing ID
         processing_id = str(uuid.uuid4())
-        processing_status[processing_id] = {
-            "status": "starting",
-            "progress": 0.0,
-            "message": "Initializing video processing..."
-        }
+        RenderStatusStore(db).create(processing_id, analysis_id, request.visualization_type)
         
-        # Start background processing (will handle missing video files gracefully)
-        background_tasks.add_task(
-            process_video_with_overlays,
-            processing_id,
-            analysis['video_path'],
-            analysis['results'],
-            request.visualization_type,
-            request.include_metrics,
-            request.frame_rate
-        )
+        submit_render(render_engine, processing_id, analysis['video_path'],
+                      request.visualization_type, request.frame_rate)
         
         return {
             "processing_id": processing_id,
@@ -83,28 +71,34 @@ async def generate_video_visualization(
             "message": "Video visualization generation started"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         db.close()
 
+def _get_render_status(processing_id: str) -> Dict[str, Any]:
+    db = DatabaseConnection()
+    try:
+        status = RenderStatusStore(db).get(processing_id)
+    finally:
+        db.close()
+    if status is None:
+        raise HTTPException(status_code=404, detail="Processing ID not found")
+    return status
+
 @router.get("/visualization-status/{processing_id}")
-async def get_visualization_status(processing_id: str):
+def get_visualization_status(processing_id: str):
     """Get status of video visualization processing"""
     
-    if processing_id not in processing_status:
-        raise HTTPException(status_code=404, detail="Processing ID not found")
-    
-    return processing_status[processing_id]
+    return _get_render_status(processing_id)
 
 @router.get("/download-visualization/{processing_id}")
-async def download_visualization(processing_id: str):
+def download_visualization(processing_id: str):
     """Download the generated visualization video"""
     
-    if processing_id not in processing_status:
-        raise HTTPException(status_code=404, detail="Processing ID not found")
-    
-    status = processing_status[processing_id]
+    status = _get_render_status(processing_id)
     if status["status"] != "completed":
         raise HTTPException(status_code=400, detail="Video processing not completed")
     
@@ -119,7 +113,7 @@ async def download_visualization(processing_id: str):
     )
 
 @router.get("/frame-preview/{analysis_id}")
-async def get_frame_preview(analysis_id: str, frame_number: int = 0):
+def get_frame_preview(analysis_id: str, frame_number: int = 0):
     """Get a preview frame with tactical overlays"""
     
     db = DatabaseConnection()
@@ -167,72 +161,79 @@ async def get_frame_preview(analysis_id: str, frame_number: int = 0):
     finally:
         db.close()
 
-async def process_video_with_overlays(
-    processing_id: str,
+def probe_video(video_path: Optional[str]) -> Tuple[bool, int, int, int]:
+    """
+    (use_synthetic, width, height, total_frames) for a video; missing,
+    tiny or unreadable files fall back to 10 synthetic seconds at 30fps
+    """
+    synthetic = (True, 1280, 720, 300)
+    if not video_path or not os.path.exists(video_path):
+        return synthetic
+    if os.path.getsize(video_path) < 1024:
+        return synthetic
+    
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return synthetic
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    
+    if total_frames <= 0:
+        return synthetic
+    return False, width, height, total_frames
+
+def submit_render(engine: RenderEngine, processing_id: str, video_path: Optional[str],
+                  visualization_type: str, frame_rate: int) -> str:
+    """Queue the overlay render of a video on the engine; returns the output path"""
+    # Missing or unreadable videos are rendered on a synthetic pitch
+    use_synthetic, width, height, total_frames = probe_video(video_path)
+    
+    return engine.submit(
+        processing_id,
+        render_overlay_segment,
+        total_frames,
+        frame_rate,
+        (width, height),
+        args=(video_path, use_synthetic, width, height, visualization_type, frame_rate)
+    )
+
+def render_overlay_segment(
+    start_frame: int,
+    end_frame: int,
+    segment_path: str,
+    progress,
+    progress_key: str,
     video_path: str,
-    results: Dict[str, Any],
+    use_synthetic: bool,
+    width: int,
+    height: int,
     visualization_type: str,
-    include_metrics: bool,
     frame_rate: int
-):
-    """Background task to process video with tactical overlays"""
+) -> int:
+    """
+    Render frames [start_frame, end_frame) with tactical overlays into
+    segment_path. Runs in a RenderEngine worker process; returns the
+    number of frames written.
+    """
+    analyzer = TacticalAnalyzer()
+    visualizer = VideoTacticalVisualizer(analyzer)
+    
+    cap = None
+    if not use_synthetic:
+        cap = cv2.VideoCapture(video_path)
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(segment_path, fourcc, frame_rate, (width, height))
     
+    frame_count = start_frame
     try:
-        # Update status
-        processing_status[processing_id]["status"] = "processing"
-        processing_status[processing_id]["message"] = "Loading video and initializing analysis..."
-        
-        # Initialize tactical analyzer
-        analyzer = TacticalAnalyzer()
-        visualizer = VideoTacticalVisualizer(analyzer)
-        
-        # Check if video file exists and is valid
-        use_synthetic = False
-        if not video_path or not os.path.exists(video_path):
-            use_synthetic = True
-            width, height = 1280, 720
-            total_frames = 300  # Generate 10 seconds at 30fps
-            fps = 30
-        else:
-            # Check file size
-            file_size = os.path.getsize(video_path)
-            if file_size < 1024:
-                use_synthetic = True
-                width, height = 1280, 720
-                total_frames = 300
-                fps = 30
-            else:
-                # Try to open video
-                cap = cv2.VideoCapture(video_path)
-                if not cap.isOpened():
-                    use_synthetic = True
-                    width, height = 1280, 720
-                    total_frames = 300
-                    fps = 30
-                else:
-                    # Get video properties
-                    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    
-                    # Validate frames
-                    if total_frames <= 0:
-                        use_synthetic = True
-                        cap.release()
-                        width, height = 1280, 720
-                        total_frames = 300
-                        fps = 30
-        
-        # Create output video
-        output_path = tempfile.mktemp(suffix='.mp4')
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, frame_rate, (width, height))
-        
-        processing_status[processing_id]["message"] = f"Processing {total_frames} frames..."
-        
-        frame_count = 0
-        while frame_count < total_frames:
+        while frame_count < end_frame:
             if use_synthetic:
                 # Generate synthetic frame
                 frame = generate_synthetic_background_frame(width, height)
@@ -264,26 +265,16 @@ async def process_video_with_overlays(
             # Write frame
             out.write(annotated_frame)
             
-            # Update progress
             frame_count += 1
-            progress = (frame_count / total_frames) * 100
-            processing_status[processing_id]["progress"] = progress
-            processing_status[processing_id]["message"] = f"Processing frame {frame_count}/{total_frames}"
-        
-        # Cleanup
-        if not use_synthetic and 'cap' in locals():
+            if (frame_count - start_frame) % 25 == 0:
+                progress[progress_key] = frame_count - start_frame
+    finally:
+        if cap is not None:
             cap.release()
         out.release()
-        
-        # Update final status
-        processing_status[processing_id]["status"] = "completed"
-        processing_status[processing_id]["progress"] = 100.0
-        processing_status[processing_id]["message"] = "Video processing completed successfully"
-        processing_status[processing_id]["video_url"] = output_path
-        
-    except Exception as e:
-        processing_status[processing_id]["status"] = "failed"
-        processing_status[processing_id]["message"] = f"Error: {str(e)}"
+    
+    progress[progress_key] = frame_count - start_frame
+    return frame_count - start_frame
 
 def generate_preview_frame(video_path: str, frame_number: int, results: Dict[str, Any]) -> np.ndarray:
     """Generate a single preview frame with overlays"""
@@ -372,14 +363,8 @@ def generate_synthetic_preview_frame(results: Dict[str, Any], frame_number: int)
 def generate_simulated_players(frame_number: int, width: int, height: int) -> list[PlayerPosition]:
     """Generate simulated player positions for demonstration"""
     
-    # Convert pixel coordinates to field coordinates (105m x 68m field)
-    def pixel_to_field(pixel_x, pixel_y):
-        field_x = (pixel_x / width) * 105
-        field_y = (pixel_y / height) * 68
-        return (field_x, field_y)
-    
-    # Simulate realistic player movements
-    players = []
+    # Simulated positions are in pixels of an uncalibrated frame (whole pitch in view)
+    camera = CameraModel.linear((width, height))
     
     # Home team (green) - simulate positions
     home_positions = [
@@ -413,33 +398,21 @@ def generate_simulated_players(frame_number: int, width: int, height: int) -> li
     
     # Add some movement based on frame number
     movement_offset = frame_number * 0.1
+    phases = np.concatenate([np.arange(11), np.arange(11) + 10]) + movement_offset
+    pixels = np.array(home_positions + away_positions, dtype=float)
+    pixels[:, 0] += np.sin(phases) * 10
+    pixels[:, 1] += np.cos(phases) * 5
+    field_positions = camera.image_to_pitch(pixels)
     
-    for i, (x, y) in enumerate(home_positions):
-        # Add slight movement
-        x += np.sin(movement_offset + i) * 10
-        y += np.cos(movement_offset + i) * 5
-        
-        field_pos = pixel_to_field(x, y)
+    players = []
+    for i, field_pos in enumerate(field_positions):
+        team_index = i % 11
         players.append(PlayerPosition(
             player_id=i + 1,
-            team='home',
-            position=field_pos,
-            jersey_number=i + 1,
-            role='defender' if i < 5 else 'midfielder' if i < 8 else 'forward'
-        ))
-    
-    for i, (x, y) in enumerate(away_positions):
-        # Add slight movement
-        x += np.sin(movement_offset + i + 10) * 10
-        y += np.cos(movement_offset + i + 10) * 5
-        
-        field_pos = pixel_to_field(x, y)
-        players.append(PlayerPosition(
-            player_id=i + 12,
-            team='away',
-            position=field_pos,
-            jersey_number=i + 1,
-            role='defender' if i < 5 else 'midfielder' if i < 8 else 'forward'
+            team='home' if i < 11 else 'away',
+            position=(float(field_pos[0]), float(field_pos[1])),
+            jersey_number=team_index + 1,
+            role='defender' if team_index < 5 else 'midfielder' if team_index < 8 else 'forward'
         ))
     
     return players
@@ -453,10 +426,9 @@ def generate_simulated_ball_position(frame_number: int, width: int, height: int)
     ball_y = height * (0.4 + 0.2 * np.cos(movement * 1.5))
     
     # Convert to field coordinates
-    field_x = (ball_x / width) * 105
-    field_y = (ball_y / height) * 68
+    field_x, field_y = CameraModel.linear((width, height)).image_to_pitch([ball_x, ball_y])[0]
     
-    return (field_x, field_y)
+    return (float(field_x), float(field_y))
 
 def draw_tactical_only(frame: np.ndarray, players: list[PlayerPosition], 
                       ball_position: tuple[float, float], metrics) -> np.ndarray:
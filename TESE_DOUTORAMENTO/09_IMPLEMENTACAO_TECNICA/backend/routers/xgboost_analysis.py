@@ -698,7 +698,10 @@ def get_substitution_recommendations(db: DatabaseConnection = Depends(get_db)):
 # ===================================================================
 
 @router.post("/pregame/train")
-def train_pregame_model(db: DatabaseConnection = Depends(get_db)):
+def train_pregame_model(
+    full_rebuild: bool = False,
+    db: DatabaseConnection = Depends(get_db)
+):
     """
     Train the pre-game performance drop prediction model.
 
@@ -708,12 +711,16 @@ def train_pregame_model(db: DatabaseConnection = Depends(get_db)):
     - Validation: temporal split (train on earlier games, test on later)
     - Model: XGBoost with class imbalance handling + SHAP explainability
 
+    Features come from the pregame_features store: only games whose
+    inputs changed since the last build are recomputed, unless
+    full_rebuild is set.
+
     Returns training report with AUC-PR, recall, precision, F1,
     balanced accuracy, feature importances, and SHAP summary.
     """
     try:
         pipeline = get_pregame_pipeline(db)
-        result = pipeline.run_full_pipeline()
+        result = pipeline.run_full_pipeline(full_rebuild=full_rebuild)
         return result
     except Exception as e:
         logger.error(f"Error training pre-game model: {e}")
@@ -746,9 +753,8 @@ def predict_pregame(
     try:
         pipeline = get_pregame_pipeline(db)
 
-        # Ensure data is loaded
-        if pipeline.sessions is None:
-            pipeline.load_data()
+        # Reload inputs only if new rows arrived since the last call
+        pipeline.refresh_data()
 
         # Try to load saved model if not trained in this session
         if not pipeline.predictor.is_trained:
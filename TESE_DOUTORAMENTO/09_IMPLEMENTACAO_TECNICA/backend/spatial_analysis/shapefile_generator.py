@@ -10,6 +10,8 @@ from dataclasses import dataclass
 import tempfile
 import os
 
+from computer_vision.camera_model import PITCH_LENGTH, PITCH_WIDTH, CameraModel
+
 try:
     import geopandas as gpd
     import shapely
@@ -46,9 +48,9 @@ class FootballFieldGeometry:
     """Standard football field geometry and coordinate system"""
     
     def __init__(self):
-        # FIFA standard field dimensions (meters)
-        self.field_length = 105.0  # Length (x-axis)
-        self.field_width = 68.0    # Width (y-axis)
+        # FIFA standard field dimensions (meters), shared with the camera model
+        self.field_length = PITCH_LENGTH  # Length (x-axis)
+        self.field_width = PITCH_WIDTH    # Width (y-axis)
         
         # Goal dimensions
         self.goal_width = 7.32
@@ -132,6 +134,31 @@ class TacticalShapefileGenerator:
     
     def __init__(self):
         self.field_geometry = FootballFieldGeometry()
+    
+    def players_from_detections(self, boxes: np.ndarray, class_names: List[str], camera: CameraModel,
+                                track_ids: List[int] = None, timestamp: float = 0.0) -> List[SpatialPlayerPosition]:
+        """
+        Spatial positions (metres) of detected people in one frame
+        
+        All boxes are projected through the camera model in one call (foot
+        point = bottom centre of the box). Teams are not classified by the
+        detector, so team is 'unknown' ('referee' for referees).
+        """
+        positions = camera.project_boxes(boxes)
+        players = []
+        for i, (class_name, position) in enumerate(zip(class_names, positions)):
+            if class_name not in ('player', 'goalkeeper', 'referee'):
+                continue
+            player_id = track_ids[i] if track_ids is not None and track_ids[i] is not None else i + 1
+            players.append(SpatialPlayerPosition(
+                player_id=int(player_id),
+                team='referee' if class_name == 'referee' else 'unknown',
+                position=(float(position[0]), float(position[1])),
+                jersey_number=0,
+                role=class_name,
+                timestamp=timestamp
+            ))
+        return players
         
     def create_player_points_shapefile(self, players: List[SpatialPlayerPosition]) -> Dict[str, Any]:
         """Create point shapefile for player positions"""
@@ -559,8 +586,16 @@ class TacticalShapefileGenerator:
         return output_path
 
 def generate_tactical_shapefiles_from_analysis(analysis_results: Dict[str, Any], 
-                                             output_dir: str) -> Dict[str, str]:
-    """Generate all tactical shapefiles from analysis results"""
+                                             output_dir: str,
+                                             players: List[SpatialPlayerPosition] = None,
+                                             ball_position: Tuple[float, float] = None) -> Dict[str, str]:
+    """
+    Generate all tactical shapefiles from analysis results
+    
+    players / ball_position: pitch positions of a detected frame (see
+    TacticalShapefileGenerator.players_from_detections); the demonstration
+    line-up is used without them.
+    """
     
     generator = TacticalShapefileGenerator()
     output_files = {}
@@ -569,15 +604,8 @@ def generate_tactical_shapefiles_from_analysis(analysis_results: Dict[str, Any],
     if not analysis_results:
         analysis_results = {}
     
-    # Extract player positions from analysis results
-    players = []
-    if 'player_tracking' in analysis_results:
-        # Convert analysis results to spatial player positions
-        # This would be populated from actual analysis data
-        pass
-    
     # Generate sample data for demonstration
-    sample_players = [
+    sample_players = players or [
         SpatialPlayerPosition(1, 'home', (20, 15), 1, 'defender'),
         SpatialPlayerPosition(2, 'home', (25, 25), 2, 'defender'),
         SpatialPlayerPosition(3, 'home', (25, 43), 3, 'defender'),
@@ -594,7 +622,8 @@ def generate_tactical_shapefiles_from_analysis(analysis_results: Dict[str, Any],
         SpatialPlayerPosition(13, 'away', (40, 34), 13, 'forward'),
     ]
     
-    ball_position = (52.5, 34)  # Center of field
+    if ball_position is None:
+        ball_position = (PITCH_LENGTH / 2, PITCH_WIDTH / 2)  # Center of field
     
     try:
         # Generate player positions shapefile
@@ -0,0 +1,102 @@
+"""
+Test for the pixel <-> pitch camera model
+
+A synthetic broadcast camera (known pitch -> image homography) provides
+the keypoints; the estimated model must recover pitch positions, and the
+per-shot models of an analysis must project each frame with its own shot.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from computer_vision.advanced_detector import PitchKeypoint
+from computer_vision.camera_model import (
+    PITCH_KEYPOINT_POSITIONS, CameraModel, CameraModels, pitch_tracks
+)
+
+# Pitch metres -> pixels of a 1280x720 frame seen from the side, in perspective
+PITCH_TO_IMAGE = np.array([[10.0, 2.0, 100.0], [0.5, 6.0, 50.0], [0.001, 0.004, 1.0]])
+
+
+def to_image(points):
+    projected = np.c_[points, np.ones(len(points))] @ PITCH_TO_IMAGE.T
+    return projected[:, :2] / projected[:, 2:]
+
+
+def synthetic_keypoints():
+    names = ['top_left_corner', 'top_right_corner', 'bottom_left_corner',
+             'bottom_right_corner', 'center_circle', 'left_penalty_spot']
+    return [
+        PitchKeypoint(name, tuple(to_image(np.array([PITCH_KEYPOINT_POSITIONS[name]]))[0]), 0.9)
+        for name in names
+    ]
+
+
+def test_keypoint_homography():
+    print("\n🔍 Homography from keypoints")
+    camera = CameraModel.from_keypoints(synthetic_keypoints(), (1280, 720))
+    assert camera is not None and camera.source == "keypoints"
+
+    rng = np.random.default_rng(3)
+    pitch = rng.uniform([0, 0], [105, 68], (500, 2))
+    recovered = camera.image_to_pitch(to_image(pitch))
+    error = np.abs(recovered - pitch).max()
+    assert error < 0.05, error
+    assert np.allclose(camera.pitch_to_image(recovered), to_image(pitch), atol=0.5)
+
+    restored = CameraModel.from_dict(camera.to_dict())
+    assert np.allclose(restored.image_to_pitch(to_image(pitch)), recovered)
+
+    # Too few / collinear keypoints: no calibration
+    assert CameraModel.from_keypoints(synthetic_keypoints()[:3], (1280, 720)) is None
+    print(f"   ✓ 500 points, max error {error * 100:.2f}cm, "
+          f"reprojection error {camera.reprojection_error:.3f}px")
+
+
+def test_shots_and_tracks():
+    print("\n🔍 Per-shot projection of tracked detections")
+    calibrated = CameraModel.from_keypoints(synthetic_keypoints(), (1280, 720), start_frame=0)
+    cameras = CameraModels([calibrated, CameraModel.linear((1280, 720), start_frame=100)])
+    assert cameras.for_frame(99) is calibrated and cameras.for_frame(100).source == "linear"
+
+    feet = to_image(np.array([[30.0, 20.0]]))[0]
+    frame_detections = {
+        10: {'detections': [
+            {'track_id': 4, 'class_name': 'player', 'confidence': 0.9,
+             'bbox': [feet[0] - 10, feet[1] - 50, feet[0] + 10, feet[1]]},
+            {'track_id': None, 'class_name': 'ball', 'confidence': 0.4, 'bbox': [0, 0, 4, 4]},
+        ]},
+        120: {'detections': [
+            {'track_id': 4, 'class_name': 'player', 'confidence': 0.9, 'bbox': [620, 300, 660, 360]},
+            {'track_id': 7, 'class_name': 'referee', 'confidence': 0.8, 'bbox': [0, 600, 20, 720]},
+        ]},
+    }
+    tracks = pitch_tracks(frame_detections, cameras)
+    assert list(tracks['track_ids']) == [4, 7]
+    assert tracks['positions'].shape == (2, 2, 2)
+    assert np.allclose(tracks['positions'][0, 0], [30.0, 20.0], atol=0.05)
+    assert np.allclose(tracks['positions'][1, 0], [52.5, 360 / 720 * 68])
+    assert np.allclose(tracks['positions'][1, 1], [10 / 1280 * 105, 68.0])
+    assert np.isnan(tracks['positions'][0, 1]).all() and np.isnan(tracks['ball_positions'][1]).all()
+    print("   ✓ Each frame projected with the camera of its shot")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing camera model")
+    print("=" * 60)
+    try:
+        test_keypoint_homography()
+        test_shots_and_tracks()
+        print("\n✓ All tests passed successfully!")
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,97 @@
+"""
+Test for the paginated detection reads
+
+Runs the SQL generated by load_detection_frames against an in-memory
+sqlite copy of video_detections (%s placeholders become ?) and compares
+every page, with and without time / class filters, with the same
+selection done in Python.
+"""
+
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from computer_vision.detection_store import load_detection_frames
+
+SCHEMA = """
+    CREATE TABLE video_detections (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        analysis_id TEXT, frame_number INTEGER, timestamp_seconds REAL,
+        object_class TEXT, confidence REAL,
+        bbox_x1 REAL, bbox_y1 REAL, bbox_x2 REAL, bbox_y2 REAL,
+        center_x REAL, center_y REAL, area REAL,
+        track_id INTEGER, predicted BOOLEAN NOT NULL DEFAULT 0
+    )
+"""
+
+
+class SqliteDB:
+    """query_to_dict over sqlite with psycopg2-style placeholders"""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(SCHEMA)
+
+    def query_to_dict(self, query, params=None):
+        rows = self.conn.execute(query.replace("%s", "?"), params or ())
+        return [dict(row) for row in rows]
+
+
+def fill(db, rng):
+    rows = []
+    for analysis_id in ("a", "b"):
+        for frame in range(0, 300, 3):
+            for _ in range(rng.randint(0, 4)):
+                rows.append((analysis_id, frame, frame / 30, rng.choice(["ball", "player", "referee"]),
+                             0.9, 1, 2, 3, 4, 2, 3, 4, rng.choice([None, 7]), rng.random() < 0.2))
+    db.conn.executemany("""
+        INSERT INTO video_detections (analysis_id, frame_number, timestamp_seconds, object_class,
+            confidence, bbox_x1, bbox_y1, bbox_x2, bbox_y2, center_x, center_y, area, track_id, predicted)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    return rows
+
+
+def test_pages_match_filters():
+    print("\n🔍 Detection pages vs Python selection")
+    db = SqliteDB()
+    rows = fill(db, random.Random(5))
+    cases = [{}, {"start_time": 2.0, "end_time": 7.5}, {"object_class": "ball"},
+             {"start_time": 1.0, "object_class": "player"}]
+    for filters in cases:
+        expected = [
+            (row[1], row[3]) for row in rows
+            if row[0] == "a"
+            and ("start_time" not in filters or row[2] >= filters["start_time"])
+            and ("end_time" not in filters or row[2] < filters["end_time"])
+            and ("object_class" not in filters or row[3] == filters["object_class"])
+        ]
+        got, after = [], -1
+        while after is not None:
+            page = load_detection_frames(db, "a", after_frame=after, limit_frames=7, **filters)
+            assert len(page["frames"]) <= 7
+            got += [(frame["frame_number"], det["class_name"])
+                    for frame in page["frames"] for det in frame["detections"]]
+            after = page["next_after_frame"]
+        assert got == expected, filters
+        print(f"   ✓ {filters or 'no filters'}: {len(got)} detections")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing detection store reads")
+    print("=" * 60)
+    try:
+        test_pages_match_filters()
+        print("\n✓ All tests passed successfully!")
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,117 @@
+"""
+Regression test for the incremental load metrics engine
+
+Compares athlete_weekly_metrics against the week-by-week loop of the old
+calculate_weekly_metrics script (calcular_metricas_semana), and checks that
+an incremental update after adding/removing sessions returns every
+athlete-week whose metrics changed.
+"""
+
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from utils.load_metrics_engine import METRIC_COLUMNS, athlete_weekly_metrics
+from utils.metrics_calculator import MetricsCalculator, calcular_metricas_semana
+
+
+def reference_metrics(sessions):
+    """Week-by-week loop of the old script: {semana_inicio: metrics}"""
+    calc = MetricsCalculator()
+    weeks = {}
+    for day, load in sessions:
+        weeks.setdefault(day - timedelta(days=day.weekday()), []).append(load)
+
+    weekly_loads, metrics = [], {}
+    for week in sorted(weeks):
+        week_end = week + timedelta(days=6)
+        total = sum(weeks[week])
+        weekly_loads.append({'data': week, 'carga_total': total})
+        last_7 = [load for day, load in sessions if day <= week_end][-7:]
+        metrics[week] = calcular_metricas_semana(
+            last_7, total,
+            calc.calcular_carga_rolante(weekly_loads, 7, week_end),
+            calc.calcular_carga_rolante(weekly_loads, 28, week_end),
+            weekly_loads[-2]['carga_total'] if len(weekly_loads) >= 2 else None
+        )
+    return metrics
+
+
+def engine_metrics(sessions, touched=None):
+    dates = np.array([day for day, _ in sessions], dtype='datetime64[D]')
+    loads = np.array([load for _, load in sessions], dtype=float)
+    if touched is not None:
+        touched = np.array(touched, dtype='datetime64[D]')
+    rows = athlete_weekly_metrics(1, dates, loads, touched)
+    return {row[1]: dict(zip(METRIC_COLUMNS, row)) for row in rows}
+
+
+def random_sessions(rng, count):
+    day, sessions = date(2025, 1, 6), []
+    for _ in range(count):
+        day += timedelta(days=rng.choice([0, 1, 1, 2, 3, 9, 20]))
+        sessions.append((day, rng.choice([5, 6, 7, 8]) * rng.choice([30, 60, 75, 90])))
+    return sessions
+
+
+def test_matches_weekly_loop():
+    print("\n🔍 Engine vs week-by-week loop")
+    rng = random.Random(7)
+    compared = 0
+    for _ in range(300):
+        sessions = random_sessions(rng, rng.randint(1, 60))
+        expected, got = reference_metrics(sessions), engine_metrics(sessions)
+        assert set(expected) == set(got)
+        for week, metrics in expected.items():
+            for key, value in metrics.items():
+                if isinstance(value, float) and got[week][key] is not None:
+                    assert abs(value - got[week][key]) < 1e-6, (week, key, value, got[week][key])
+                else:
+                    assert value == got[week][key], (week, key, value, got[week][key])
+            compared += 1
+    print(f"   ✓ {compared} athlete-weeks identical")
+
+
+def test_incremental_covers_changes():
+    print("\n🔍 Incremental update after adding/removing sessions")
+    rng = random.Random(11)
+    for _ in range(300):
+        sessions = random_sessions(rng, rng.randint(1, 60))
+        updated, touched = list(sessions), []
+        for _ in range(rng.randint(1, 3)):
+            if updated and rng.random() < 0.4:
+                touched.append(updated.pop(rng.randrange(len(updated)))[0])
+            else:
+                day = sessions[0][0] + timedelta(days=rng.randint(-10, 300))
+                updated.append((day, 400))
+                touched.append(day)
+        updated.sort(key=lambda s: s[0])
+
+        before, after = engine_metrics(sessions), engine_metrics(updated)
+        changed = {week for week in after if before.get(week) != after[week]}
+        incremental = engine_metrics(updated, touched)
+        assert changed <= set(incremental), sorted(changed - set(incremental))
+        assert all(incremental[week] == after[week] for week in incremental)
+    print("   ✓ Every changed athlete-week recomputed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing incremental load metrics engine")
+    print("=" * 60)
+    try:
+        test_matches_weekly_loop()
+        test_incremental_covers_changes()
+        print("\n✓ All tests passed successfully!")
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,249 @@
+"""
+Regression test for the vectorised pre-game pipeline
+
+Compares TargetBuilder.build against a verbatim copy of the original
+row-by-row implementation (and VectorizedFeatureEngineer against
+FeatureEngineer) on the mock datasets.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from ml_analysis.pregame_predictor import (
+    TargetBuilder, FeatureEngineer, VectorizedFeatureEngineer,
+    BASELINE_GAMES, HSR_BASELINE_PCT, SPRINT_ZSCORE_THRESH, DISTANCE_DROP_PCT,
+)
+
+DATA_DIR = backend_path.parent
+
+
+class ReferenceTargetBuilder:
+    """TargetBuilder.build as it was before vectorisation (unchanged copy)"""
+
+    @staticmethod
+    def build(gps: pd.DataFrame, sessions: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns DataFrame with columns:
+            atleta_id, sessao_id, data, target, rule_a, rule_b, rule_c,
+            hsr_per_min, sprint_per_min, dist_per_min,
+            baseline_hsr, baseline_sprint_mean, baseline_sprint_std,
+            baseline_dist
+        """
+        # Filter to game sessions only
+        game_ids = set(sessions.loc[sessions["is_game"], "id"])
+        game_gps = gps[gps["sessao_id"].isin(game_ids)].copy()
+
+        if game_gps.empty:
+            return pd.DataFrame()
+
+        game_gps = game_gps.sort_values(["atleta_id", "data"])
+
+        results = []
+        for aid, grp in game_gps.groupby("atleta_id"):
+            grp = grp.sort_values("data").reset_index(drop=True)
+            for i, row in grp.iterrows():
+                prev = grp.iloc[max(0, i - BASELINE_GAMES):i]
+                if len(prev) < 1:
+                    # First game — no baseline, skip or label 0
+                    results.append({
+                        "atleta_id": aid,
+                        "sessao_id": row["sessao_id"],
+                        "data": row["data"],
+                        "target": 0,
+                        "rule_a": False, "rule_b": False, "rule_c": False,
+                        "hsr_per_min": row["hsr_per_min"],
+                        "sprint_per_min": row["sprint_per_min"],
+                        "dist_per_min": row["dist_per_min"],
+                        "baseline_hsr": np.nan,
+                        "baseline_sprint_mean": np.nan,
+                        "baseline_sprint_std": np.nan,
+                        "baseline_dist": np.nan,
+                        "has_baseline": False,
+                    })
+                    continue
+
+                bl_hsr = prev["hsr_per_min"].mean()
+                bl_sprint_mean = prev["sprint_per_min"].mean()
+                bl_sprint_std = prev["sprint_per_min"].std()
+                bl_dist = prev["dist_per_min"].mean()
+
+                # Rule A: HSR/min < 85% of baseline
+                rule_a = (row["hsr_per_min"] < HSR_BASELINE_PCT * bl_hsr) if bl_hsr > 0 else False
+
+                # Rule B: sprint z-score < -1
+                if bl_sprint_std and bl_sprint_std > 0:
+                    z_sprint = (row["sprint_per_min"] - bl_sprint_mean) / bl_sprint_std
+                    rule_b = z_sprint < SPRINT_ZSCORE_THRESH
+                else:
+                    rule_b = False
+
+                # Rule C: distance drop > 20% vs baseline
+                rule_c = (row["dist_per_min"] < (1 - DISTANCE_DROP_PCT) * bl_dist) if bl_dist > 0 else False
+
+                target = int(rule_a or rule_b or rule_c)
+
+                results.append({
+                    "atleta_id": aid,
+                    "sessao_id": row["sessao_id"],
+                    "data": row["data"],
+                    "target": target,
+                    "rule_a": bool(rule_a),
+                    "rule_b": bool(rule_b),
+                    "rule_c": bool(rule_c),
+                    "hsr_per_min": row["hsr_per_min"],
+                    "sprint_per_min": row["sprint_per_min"],
+                    "dist_per_min": row["dist_per_min"],
+                    "baseline_hsr": bl_hsr,
+                    "baseline_sprint_mean": bl_sprint_mean,
+                    "baseline_sprint_std": bl_sprint_std,
+                    "baseline_dist": bl_dist,
+                    "has_baseline": True,
+                })
+
+        return pd.DataFrame(results)
+
+
+def load_mock_data(all_games=False, seed=None):
+    """
+    Build sessions / gps / pse frames shaped like DataLoader output
+
+    The mock GPS export has no Catapult zone columns: sprints stands in for
+    effs_25_2_kmh and, when seed is given, hsr_distance is drawn from a seeded
+    RNG (otherwise it is missing, as for sessions without zone data); the
+    seed also drives the wellness questionnaires (see mock_wellness).
+    all_games=True labels every session as a game to get longer baselines.
+    """
+    sessions = pd.read_csv(DATA_DIR / "mock_sessions.csv", parse_dates=["data"])
+    sessions["is_game"] = True if all_games else sessions["tipo"].str.lower() == "jogo"
+
+    session_cols = sessions[["id", "data", "tipo", "duracao_min"]].rename(columns={"id": "sessao_id"})
+
+    gps = pd.read_csv(DATA_DIR / "mock_gps_january_2025.csv").merge(session_cols, on="sessao_id")
+    gps["sprint_efforts"] = gps["sprints"].astype(float)
+    if seed is None:
+        gps["hsr_distance"] = np.nan
+    else:
+        rng = np.random.default_rng(seed)
+        gps["hsr_distance"] = rng.normal(400, 150, len(gps)).round(1)
+        gps.loc[rng.random(len(gps)) < 0.1, "hsr_distance"] = np.nan
+        gps.loc[rng.random(len(gps)) < 0.05, "distancia_total"] = np.nan
+    dur = gps["duracao_min"].replace(0, np.nan).fillna(90)
+    gps["dist_per_min"] = gps["distancia_total"] / dur
+    gps["hsr_per_min"] = gps["hsr_distance"].fillna(0) / dur
+    gps["sprint_per_min"] = gps["sprint_efforts"].fillna(0) / dur
+
+    pse = pd.read_csv(DATA_DIR / "mock_pse_january_2025.csv")
+    pse = pse.drop(columns=["duracao_min"]).merge(session_cols[["sessao_id", "data", "duracao_min"]], on="sessao_id")
+    pse = pse.rename(columns={"pse": "rpe", "carga_total": "srpe"})
+
+    wellness = mock_wellness(gps["atleta_id"].unique(), sessions["data"], seed)
+    return sessions, gps, pse, wellness
+
+
+WELLNESS_COLUMNS = [
+    "wellness_score", "fatigue_level", "muscle_soreness", "sleep_quality",
+    "sleep_hours", "stress_level", "mood", "readiness_score",
+]
+
+
+WELLNESS_FEATURES = [
+    "wellness_avg_3d", "wellness_avg_7d", "wellness_avg_28d", "wellness_delta_3_28",
+    "wellness_zscore_28d", "fatigue_avg_3d", "soreness_avg_3d", "sleep_avg_3d",
+    "stress_avg_3d", "fatigue_avg_7d", "soreness_avg_7d", "sleep_avg_7d",
+    "stress_avg_7d", "readiness_latest",
+]
+
+
+def mock_wellness(athletes, session_dates, seed=None):
+    """
+    Wellness questionnaires shaped like DataLoader.load_wellness
+
+    No wellness export exists in the mock data. Without a seed the frame is
+    empty. With a seed, each athlete answers on a random ~70% of the days
+    from four weeks before the first session to the last one, so some days
+    are missing. Some days get a second entry, and some values are NaN.
+    """
+    if seed is None:
+        return pd.DataFrame({
+            "atleta_id": pd.Series(dtype="int64"), "data": pd.Series(dtype="datetime64[ns]"),
+            **{col: pd.Series(dtype=float) for col in WELLNESS_COLUMNS},
+        })
+    rng = np.random.default_rng(seed + 100)
+    days = pd.date_range(session_dates.min() - pd.Timedelta(days=28), session_dates.max())
+    rows = []
+    for aid in sorted(athletes):
+        answered = days[rng.random(len(days)) < 0.7]
+        repeated = answered[rng.random(len(answered)) < 0.15]
+        for day in answered.append(repeated):
+            rows.append({"atleta_id": int(aid), "data": day,
+                         **{col: float(rng.integers(1, 11)) for col in WELLNESS_COLUMNS}})
+    wellness = pd.DataFrame(rows)
+    for col in WELLNESS_COLUMNS:
+        wellness.loc[rng.random(len(wellness)) < 0.05, col] = np.nan
+    return wellness
+
+
+def assert_frames_match(expected, actual, label):
+    assert list(expected.columns) == list(actual.columns), f"{label}: columns differ"
+    assert len(expected) == len(actual), f"{label}: {len(expected)} vs {len(actual)} rows"
+    for col in expected.columns:
+        a, b = expected[col], actual[col]
+        if pd.api.types.is_numeric_dtype(a) and not pd.api.types.is_bool_dtype(a):
+            ok = np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float),
+                             rtol=1e-9, atol=1e-9, equal_nan=True)
+        else:
+            ok = (a.to_numpy() == b.to_numpy()).all()
+        assert ok, f"{label}: column {col} differs"
+
+
+def test_targets_match_loop():
+    """Labels and baselines must be identical to the row-by-row loop"""
+    print("\n1. TargetBuilder.build vs the original row loop...")
+    cases = [("games only", False, None), ("all sessions", True, None)]
+    cases += [(f"all sessions, seed {seed}", True, seed) for seed in range(5)]
+    for label, all_games, seed in cases:
+        sessions, gps, _, _ = load_mock_data(all_games, seed)
+        expected = ReferenceTargetBuilder.build(gps, sessions)
+        actual = TargetBuilder.build(gps, sessions)
+        assert_frames_match(expected, actual, label)
+        for col in ["target", "rule_a", "rule_b", "rule_c", "has_baseline"]:
+            assert (expected[col].astype(int).to_numpy() == actual[col].astype(int).to_numpy()).all()
+        print(f"   ✓ {label}: {len(actual)} rows, {int(actual['target'].sum())} positive")
+
+
+def test_features_match_loop():
+    """Vectorised features must match FeatureEngineer on the same targets"""
+    print("\n2. VectorizedFeatureEngineer vs FeatureEngineer...")
+    for seed in range(3):
+        sessions, gps, pse, wellness = load_mock_data(all_games=True, seed=seed)
+        targets = TargetBuilder.build(gps, sessions)
+        expected = FeatureEngineer(gps, pse, wellness, sessions).build_features(targets)
+        actual = VectorizedFeatureEngineer(gps, pse, wellness, sessions).build_features(targets)
+        assert_frames_match(expected, actual, f"features, seed {seed}")
+        assert_frames_match(expected[WELLNESS_FEATURES], actual[WELLNESS_FEATURES],
+                            f"wellness features, seed {seed}")
+        assert (actual[WELLNESS_FEATURES] != 0).any().all(), "wellness features left at 0"
+        print(f"   ✓ seed {seed}: {len(wellness)} wellness rows, "
+              f"{actual.shape[0]} rows x {actual.shape[1]} columns")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing vectorised pre-game pipeline")
+    print("=" * 60)
+    try:
+        test_targets_match_loop()
+        test_features_match_loop()
+        print("\n✓ All tests passed successfully!")
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
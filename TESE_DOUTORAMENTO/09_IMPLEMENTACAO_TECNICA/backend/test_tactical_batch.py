@@ -0,0 +1,98 @@
+"""
+Regression test for TacticalAnalyzer.analyze_batch
+
+Checks the per-frame arrays of analyze_batch against generate_tactical_report
+run frame by frame on random 11 v 11 positions.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from computer_vision.tactical_analyzer import (
+    TacticalAnalyzer, PlayerPosition, SECTORS, CORRIDORS,
+)
+
+TEAMS = ['home'] * 11 + ['away'] * 11
+
+
+def random_clip(frames=120, seed=7):
+    """Random positions with extra players pushed into the defensive third"""
+    rng = np.random.default_rng(seed)
+    positions = np.stack([
+        rng.uniform(0, 105, (frames, len(TEAMS))),
+        rng.uniform(0, 68, (frames, len(TEAMS)))
+    ], axis=-1)
+    positions[..., 0][rng.random((frames, len(TEAMS))) < 0.3] *= 0.3
+    ball = np.column_stack([rng.uniform(0, 105, frames), rng.uniform(0, 68, frames)])
+    return positions, ball
+
+
+def test_batch_matches_per_frame():
+    print("\n🔍 Batch metrics vs generate_tactical_report")
+    analyzer = TacticalAnalyzer()
+    positions, ball = random_clip()
+    batch = analyzer.analyze_batch(positions, TEAMS, ball)
+
+    for f in range(len(positions)):
+        players = [
+            PlayerPosition(i + 1, team, tuple(positions[f, i]), i + 1, 'midfielder')
+            for i, team in enumerate(TEAMS)
+        ]
+        report = analyzer.generate_tactical_report(players, tuple(ball[f]))
+
+        for key in ('ball_pressure_intensity', 'home_team_pressure', 'away_team_pressure',
+                    'avg_distance_to_ball', 'min_distance_to_ball', 'avg_all_distances_to_ball'):
+            assert round(float(batch[key][f]), 2) == report.pressure_levels[key], (key, f)
+
+        if 'error' in report.formation_analysis:
+            assert np.isnan(batch['defensive_width'][f]), f
+        else:
+            for key in ('defensive_line_depth_avg', 'defensive_width', 'max_gap_between_defenders'):
+                assert round(float(batch[key][f]), 2) == report.formation_analysis[key], (key, f)
+
+        for key, value in report.alignment_scores.items():
+            assert np.isclose(batch[key][f], value), (key, f)
+
+        for zone, name in enumerate(SECTORS):
+            sector = report.sector_analysis[name]
+            assert tuple(batch['sector_counts'][f, zone]) == (sector['home'], sector['away'])
+        for zone, name in enumerate(CORRIDORS):
+            corridor = report.sector_analysis[name]
+            assert tuple(batch['corridor_counts'][f, zone]) == (corridor['home'], corridor['away'])
+
+    print(f"   ✓ {len(positions)} frames match")
+
+
+def test_missing_players():
+    print("\n🔍 Players missing from frames (NaN positions)")
+    analyzer = TacticalAnalyzer()
+    positions, ball = random_clip(frames=10)
+    positions[:5, :9] = np.nan  # only 2 home players left in the first 5 frames
+    batch = analyzer.analyze_batch(positions, TEAMS, ball)
+
+    assert np.isnan(batch['home_team_compactness'][:5]).all()
+    assert not np.isnan(batch['home_team_compactness'][5:]).any()
+    assert not np.isnan(batch['away_team_compactness']).any()
+    assert (batch['sector_counts'][:5, :, 0].sum(axis=1) == 2).all()
+    print("   ✓ absent players are ignored")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing batch tactical analysis")
+    print("=" * 60)
+    try:
+        test_batch_matches_per_frame()
+        test_missing_players()
+        print("\n✓ All tests passed successfully!")
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,212 @@
+"""
+Athlete Resolver: In-Process Name Resolution for CSV Ingestion
+
+Loads the roster (nome_completo, jogador_id) and learned aliases once and
+resolves CSV player names without per-row SQL:
+- Exact match on lowercase name / jogador_id (active athletes win)
+- Learned aliases (atletas_aliases table)
+- Fuzzy match with pg_trgm-compatible trigram similarity over an
+  in-memory trigram index
+
+Fuzzy hits are persisted as aliases so repeat uploads resolve in O(1).
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigram set as computed by pg_trgm
+
+    Each alphanumeric word is lowercased and padded with two leading and one
+    trailing space before splitting into trigrams.
+    """
+    result = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(a: Set[str], b: Set[str]) -> float:
+    """pg_trgm similarity(): shared trigrams / distinct trigrams"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class AthleteResolver:
+    """Cached athlete name -> ID resolution shared by the ingestion routes"""
+
+    SIMILARITY_THRESHOLD = 0.6
+
+    # Same as sql/01_criar_schema.sql, for databases created before the alias table
+    TABLES_DDL = """
+        CREATE TABLE IF NOT EXISTS atletas_aliases (
+            alias VARCHAR(200) PRIMARY KEY,
+            atleta_id INTEGER NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+            origem VARCHAR(50) DEFAULT 'fuzzy',
+            created_at TIMESTAMP DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_atletas_aliases_atleta ON atletas_aliases(atleta_id);
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._version = None
+        self._exact: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}
+        self._candidates: List[Tuple[int, Set[str], bool]] = []
+        self._trigram_index: Dict[str, Set[int]] = defaultdict(set)
+
+    def invalidate(self):
+        """Drop the cached roster; the next lookup reloads it"""
+        with self._lock:
+            self._version = None
+
+    def ensure_tables(self, db):
+        if not self._ready:
+            try:
+                db.execute_query(self.TABLES_DDL)
+                self._ready = True
+            except Exception as e:
+                logger.warning(f"⚠️ Não foi possível criar atletas_aliases: {e}")
+
+    def _roster_version(self, db) -> tuple:
+        """Cheap fingerprint so other worker processes notice roster changes"""
+        version = db.query_to_dict("""
+            SELECT COUNT(*) AS total, MAX(updated_at) AS updated_at
+            FROM atletas
+        """)[0]
+        try:
+            aliases = db.query_to_dict("SELECT COUNT(*) AS total FROM atletas_aliases")[0]['total']
+        except Exception:
+            aliases = None
+        return version['total'], version['updated_at'], aliases
+
+    def _load(self, db, version: tuple):
+        rows = db.query_to_dict("""
+            SELECT id, nome_completo, jogador_id, ativo
+            FROM atletas
+            ORDER BY ativo ASC NULLS FIRST, id DESC
+        """)
+
+        # Active athletes are applied last so they win name collisions
+        exact = {}
+        candidates = []
+        trigram_index = defaultdict(set)
+        for row in rows:
+            for key in (row['nome_completo'], row['jogador_id']):
+                if key:
+                    exact[key.strip().lower()] = row['id']
+            if row['nome_completo']:
+                grams = trigrams(row['nome_completo'])
+                for gram in grams:
+                    trigram_index[gram].add(len(candidates))
+                candidates.append((row['id'], grams, bool(row['ativo'])))
+
+        aliases = {}
+        try:
+            for row in db.query_to_dict("SELECT alias, atleta_id FROM atletas_aliases"):
+                aliases[row['alias']] = row['atleta_id']
+        except Exception as e:
+            logger.warning(f"⚠️ atletas_aliases indisponível, aliases ignorados: {e}")
+
+        self._exact = exact
+        self._aliases = aliases
+        self._candidates = candidates
+        self._trigram_index = trigram_index
+        self._version = version
+        logger.info(f"✅ Roster carregado: {len(candidates)} atletas, {len(aliases)} aliases")
+
+    def refresh(self, db):
+        """Reload the roster if it changed since the last load"""
+        self.ensure_tables(db)
+        version = self._roster_version(db)
+        with self._lock:
+            if version != self._version:
+                self._load(db, version)
+
+    def _fuzzy_match(self, clean_name: str) -> Optional[int]:
+        grams = trigrams(clean_name)
+        candidate_ids = set()
+        for gram in grams:
+            candidate_ids.update(self._trigram_index.get(gram, ()))
+
+        best = None
+        for pos in candidate_ids:
+            athlete_id, candidate_grams, ativo = self._candidates[pos]
+            score = trigram_similarity(grams, candidate_grams)
+            if score > self.SIMILARITY_THRESHOLD:
+                key = (score, ativo, -athlete_id)
+                if best is None or key > best[0]:
+                    best = (key, athlete_id)
+        return best[1] if best else None
+
+    def _lookup(self, clean_name: str) -> Tuple[Optional[int], bool]:
+        """Return (athlete_id, learned) where learned marks a new fuzzy hit"""
+        if clean_name in self._exact:
+            return self._exact[clean_name], False
+        if clean_name in self._aliases:
+            return self._aliases[clean_name], False
+        athlete_id = self._fuzzy_match(clean_name)
+        return athlete_id, athlete_id is not None
+
+    def resolve_many(self, names: Iterable[str], db) -> Dict[str, Optional[int]]:
+        """
+        Resolve distinct CSV names in one pass
+
+        Costs one version query, plus a reload and an alias write only when
+        needed. Returns {clean_name: athlete_id or None}.
+        """
+        self.refresh(db)
+
+        resolved = {}
+        learned = []
+        with self._lock:
+            for name in names:
+                clean_name = str(name).strip().lower()
+                if clean_name in resolved:
+                    continue
+                athlete_id, is_new = self._lookup(clean_name)
+                resolved[clean_name] = athlete_id
+                if is_new:
+                    self._aliases[clean_name] = athlete_id
+                    learned.append((clean_name, athlete_id))
+
+        if learned:
+            self._persist_aliases(learned, db)
+        return resolved
+
+    def resolve(self, name: str, db) -> Optional[int]:
+        """Resolve a single CSV name (None if no match)"""
+        return self.resolve_many([name], db)[str(name).strip().lower()]
+
+    def _persist_aliases(self, aliases: List[Tuple[str, int]], db):
+        try:
+            db.execute_values_query("""
+                INSERT INTO atletas_aliases (alias, atleta_id, origem)
+                VALUES %s
+                ON CONFLICT (alias) DO NOTHING
+            """, [(alias, athlete_id, 'fuzzy') for alias, athlete_id in aliases])
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível guardar aliases: {e}")
+            return
+
+        # Our own writes change the alias count; track it so they do not trigger a reload
+        with self._lock:
+            if self._version is not None:
+                total, updated_at, alias_count = self._version
+                if alias_count is not None:
+                    self._version = (total, updated_at, len(self._aliases))
+
+
+athlete_resolver = AthleteResolver()
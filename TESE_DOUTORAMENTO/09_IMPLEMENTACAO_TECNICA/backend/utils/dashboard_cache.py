@@ -0,0 +1,76 @@
+"""
+Dashboard Cache: In-Process Response Cache for the Team Dashboard
+
+The team dashboard is rebuilt only when its inputs change. Each request
+runs one fingerprint query made of indexed / small-table MAX lookups (no
+counts or scans of the GPS data):
+- metricas_carga: last update (upserts and the weekly metrics script set it)
+- risk_assessment: last insert
+- atletas: last update
+- dados_gps: last insert (idx_dados_gps_created_at), the source of the
+  GPS summary read from ca_gps_diario_atleta
+
+Ingestion and delete routes call invalidate() after writing GPS/PSE data;
+the fingerprint lets other worker processes notice changes made elsewhere
+(e.g. the calculate_weekly_metrics script). A delete that changes no
+load metrics moves none of these timestamps; other processes see it after
+the next write.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCache:
+    """Cached team dashboard response keyed by the data fingerprint"""
+
+    VERSION_QUERY = """
+        SELECT
+            (SELECT MAX(updated_at) FROM metricas_carga) AS metrics_updated_at,
+            (SELECT MAX(created_at) FROM risk_assessment) AS risk_created_at,
+            (SELECT MAX(updated_at) FROM atletas) AS athletes_updated_at,
+            (SELECT MAX(created_at) FROM dados_gps) AS gps_created_at
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._response: Optional[Dict[str, Any]] = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Drop the cached response; the next request rebuilds it"""
+        with self._lock:
+            self._generation += 1
+            self._version = None
+            self._response = None
+
+    def _data_version(self, db) -> tuple:
+        return tuple(db.query_to_dict(self.VERSION_QUERY)[0].values())
+
+    def get(self, db, build: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached response if the data did not change, else build(db) and cache it"""
+        version = self._data_version(db)
+        with self._lock:
+            if self._response is not None and version == self._version:
+                self.hits += 1
+                return self._response
+            generation = self._generation
+
+        response = build(db)
+        with self._lock:
+            self.misses += 1
+            # An invalidate() during the build may have made this response stale
+            if generation == self._generation:
+                self._version = version
+                self._response = response
+        logger.info(f"📊 Team dashboard rebuilt (week {response.get('week_analyzed')})")
+        return response
+
+
+dashboard_cache = DashboardCache()
@@ -0,0 +1,300 @@
+"""
+Incremental Weekly Load Metrics Engine
+
+Keeps metricas_carga up to date after each PSE upload instead of a
+DELETE-and-rebuild of the whole table. Same definitions as
+MetricsCalculator / scripts/calculate_weekly_metrics.py:
+- Weekly load: sum of PSE x duration of the athlete's sessions (Monday-Sunday)
+- Monotony: mean / std of the last 7 workouts up to the end of the week
+- Acute load: the week's load; chronic load: mean of the weeks with data
+  among the current and previous 3 calendar weeks
+- Variation %: against the previous week with data
+- Z-scores: relative to the team in the same week
+
+Per athlete, the sessions are kept in running sums (loads and squared
+loads per workout, loads per week), so every window is O(1) instead of a
+scan of the history. Only the athlete-weeks whose inputs changed are
+written:
+- weeks with new or deleted sessions
+- the 3 following calendar weeks (chronic window)
+- the next week with data (variation %)
+- weeks whose last-7-workout window reaches back to a changed session
+Rows are upserted in batches (ON CONFLICT (atleta_id, semana_inicio)) and
+athlete-weeks left without sessions are deleted.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.dashboard_cache import dashboard_cache
+from utils.metrics_calculator import MetricsCalculator
+
+logger = logging.getLogger(__name__)
+
+MONOTONY_WORKOUTS = 7
+CHRONIC_WEEKS = 4
+
+METRIC_COLUMNS = [
+    'atleta_id', 'semana_inicio', 'semana_fim',
+    'carga_total_semanal', 'media_carga', 'desvio_padrao', 'dias_treino',
+    'monotonia', 'tensao', 'variacao_percentual',
+    'carga_aguda', 'carga_cronica', 'acwr',
+    'nivel_risco_monotonia', 'nivel_risco_tensao', 'nivel_risco_acwr'
+]
+
+SESSIONS_QUERY = """
+    SELECT p.atleta_id, DATE(p.time) AS data, (p.pse * p.duracao_min) AS carga_total
+    FROM dados_pse p
+    JOIN sessoes s ON s.id = p.sessao_id
+    WHERE p.pse IS NOT NULL AND p.pse > 0
+      AND p.duracao_min IS NOT NULL AND p.duracao_min > 0
+      {athlete_filter}
+    ORDER BY p.atleta_id, p.time
+"""
+
+UPSERT_QUERY = f"""
+    INSERT INTO metricas_carga ({', '.join(METRIC_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (atleta_id, semana_inicio) DO UPDATE SET
+        {', '.join(f'{col} = EXCLUDED.{col}' for col in METRIC_COLUMNS[2:])},
+        updated_at = NOW()
+"""
+
+DELETE_QUERY = """
+    DELETE FROM metricas_carga m
+    USING (VALUES %s) AS t(atleta_id, semana_inicio)
+    WHERE m.atleta_id = t.atleta_id AND m.semana_inicio = t.semana_inicio
+"""
+
+# Same rules as calcular_media_desvio / calcular_z_score: zero values are
+# left out, fewer than 2 values (STDDEV_SAMP NULL) or no spread gives no z-score
+Z_SCORE_QUERY = """
+    WITH equipa AS (
+        SELECT semana_inicio,
+               ROUND(AVG(NULLIF(carga_total_semanal, 0)), 2) AS media_carga,
+               ROUND(STDDEV_SAMP(NULLIF(carga_total_semanal, 0)), 2) AS desvio_carga,
+               ROUND(AVG(NULLIF(monotonia, 0)), 2) AS media_monotonia,
+               ROUND(STDDEV_SAMP(NULLIF(monotonia, 0)), 2) AS desvio_monotonia,
+               ROUND(AVG(NULLIF(tensao, 0)), 2) AS media_tensao,
+               ROUND(STDDEV_SAMP(NULLIF(tensao, 0)), 2) AS desvio_tensao,
+               ROUND(AVG(NULLIF(acwr, 0)), 2) AS media_acwr,
+               ROUND(STDDEV_SAMP(NULLIF(acwr, 0)), 2) AS desvio_acwr
+        FROM metricas_carga
+        WHERE semana_inicio = ANY(%s)
+        GROUP BY semana_inicio
+    )
+    UPDATE metricas_carga mc SET
+        z_score_carga = ROUND((mc.carga_total_semanal - e.media_carga) / NULLIF(e.desvio_carga, 0), 4),
+        z_score_monotonia = ROUND((NULLIF(mc.monotonia, 0) - e.media_monotonia) / NULLIF(e.desvio_monotonia, 0), 4),
+        z_score_tensao = ROUND((NULLIF(mc.tensao, 0) - e.media_tensao) / NULLIF(e.desvio_tensao, 0), 4),
+        z_score_acwr = ROUND((NULLIF(mc.acwr, 0) - e.media_acwr) / NULLIF(e.desvio_acwr, 0), 4)
+    FROM equipa e
+    WHERE mc.semana_inicio = e.semana_inicio
+"""
+
+
+def week_start(dates: np.ndarray) -> np.ndarray:
+    """Monday of the week of each datetime64[D] (1970-01-01 was a Thursday)"""
+    days = dates.astype('datetime64[D]').astype(np.int64)
+    return (days - (days + 3) % 7).astype('datetime64[D]')
+
+
+def _count_between(sorted_values: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Number of sorted_values v with low <= v <= high, per (low, high) pair"""
+    return np.searchsorted(sorted_values, high, side='right') - np.searchsorted(sorted_values, low, side='left')
+
+
+def _optional(value: float, digits: int) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def athlete_weekly_metrics(atleta_id: int, dates: np.ndarray, loads: np.ndarray,
+                           touched: Optional[np.ndarray] = None) -> List[tuple]:
+    """
+    metricas_carga rows of one athlete
+
+    Args:
+        atleta_id: Athlete ID
+        dates: Session dates (datetime64[D]), in chronological order
+        loads: Session loads (PSE x duration)
+        touched: Dates of added/removed sessions; only the weeks they affect
+            are returned (None = every week)
+
+    Returns:
+        Tuples in METRIC_COLUMNS order
+    """
+    if len(dates) == 0:
+        return []
+    calc = MetricsCalculator()
+    dates = dates.astype('datetime64[D]')
+    loads = loads.astype(np.float64)
+
+    weeks, first = np.unique(week_start(dates), return_index=True)
+    last = np.r_[first[1:], len(dates)] - 1
+    week_ends = weeks + np.timedelta64(6, 'D')
+
+    # Running sums: any window of workouts or weeks is a difference of two entries
+    load_sums = np.r_[0.0, np.cumsum(loads)]
+    square_sums = np.r_[0.0, np.cumsum(loads * loads)]
+    weekly = load_sums[last + 1] - load_sums[first]
+    weekly_sums = np.r_[0.0, np.cumsum(weekly)]
+
+    # Last MONOTONY_WORKOUTS workouts up to the end of each week
+    window_start = np.maximum(0, last - (MONOTONY_WORKOUTS - 1))
+    n = last + 1 - window_start
+    window_sum = load_sums[last + 1] - load_sums[window_start]
+    window_square = square_sums[last + 1] - square_sums[window_start]
+    mean = window_sum / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # n * sum(x^2) - sum(x)^2 is exact for integer loads: no cancellation error
+        std = np.sqrt(np.maximum(n * window_square - window_sum * window_sum, 0.0) / (n * (n - 1)))
+
+    # Weeks with data among the current and previous CHRONIC_WEEKS - 1 calendar weeks
+    chronic_first = np.searchsorted(weeks, weeks - np.timedelta64(7 * (CHRONIC_WEEKS - 1), 'D'))
+    index = np.arange(len(weeks))
+    chronic = (weekly_sums[index + 1] - weekly_sums[chronic_first]) / (index + 1 - chronic_first)
+
+    selected = index
+    if touched is not None:
+        touched = np.unique(touched.astype('datetime64[D]'))
+        touched_weeks = np.unique(week_start(touched))
+        previous_weeks = np.r_[np.datetime64('0001-01-01', 'D'), weeks[:-1]]
+        # Latest changed date up to each week end: a removed workout was in
+        # the window if fewer than MONOTONY_WORKOUTS remain from that date on
+        latest = np.searchsorted(touched, week_ends, side='right') - 1
+        remaining = _count_between(dates, touched[np.maximum(latest, 0)], week_ends)
+        affected = (
+            (_count_between(touched_weeks, weeks - np.timedelta64(7 * (CHRONIC_WEEKS - 1), 'D'), weeks) > 0)
+            | (_count_between(touched_weeks, previous_weeks, weeks - np.timedelta64(1, 'D')) > 0)
+            | (_count_between(touched, dates[window_start], week_ends) > 0)
+            | ((latest >= 0) & (remaining < MONOTONY_WORKOUTS))
+        )
+        selected = index[affected]
+
+    rows = []
+    for i in selected:
+        carga_total = float(weekly[i])
+        has_spread = n[i] >= 2 and std[i] > 1e-9
+        monotonia = round(float(mean[i] / std[i]), 4) if has_spread else None
+        carga_aguda = round(carga_total, 2)
+        carga_cronica = round(float(chronic[i]), 2)
+        acwr = calc.calcular_acwr(carga_aguda, carga_cronica)
+        tensao = calc.calcular_tensao(carga_total, monotonia)
+        anterior = float(weekly[i - 1]) if i > 0 else None
+        variacao = calc.calcular_variacao_percentual(carga_total, anterior) if anterior else None
+        rows.append((
+            int(atleta_id), weeks[i].item(), week_ends[i].item(),
+            carga_total,
+            _optional(mean[i], 2) if n[i] >= 2 else None,
+            _optional(std[i], 2) if n[i] >= 2 else None,
+            int(n[i]),
+            monotonia, tensao, variacao,
+            carga_aguda, carga_cronica, acwr,
+            calc.determinar_nivel_risco_monotonia(monotonia),
+            calc.determinar_nivel_risco_tensao(tensao),
+            calc.determinar_nivel_risco_acwr(acwr)
+        ))
+    return rows
+
+
+class LoadMetricsEngine:
+    """Recompute metricas_carga for changed PSE sessions"""
+
+    def __init__(self, db, page_size: int = 500):
+        """
+        Args:
+            db: DatabaseConnection
+            page_size: Rows per upsert statement
+        """
+        self.db = db
+        self.page_size = page_size
+
+    def touched_by_sessions(self, session_ids: Iterable[int]) -> pd.DataFrame:
+        """(atleta_id, data) of the PSE rows of some sessions (call before deleting them)"""
+        return self.db.query_to_dataframe(
+            "SELECT DISTINCT atleta_id, DATE(time) AS data FROM dados_pse WHERE sessao_id = ANY(%s)",
+            (list(session_ids),)
+        )
+
+    def _load_sessions(self, athlete_ids: Optional[List[int]]) -> pd.DataFrame:
+        if athlete_ids is None:
+            return self.db.query_to_dataframe(SESSIONS_QUERY.format(athlete_filter=""))
+        return self.db.query_to_dataframe(
+            SESSIONS_QUERY.format(athlete_filter="AND p.atleta_id = ANY(%s)"), (athlete_ids,)
+        )
+
+    def update(self, touched: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Bring metricas_carga up to date
+
+        Args:
+            touched: (atleta_id, data) of inserted or deleted PSE rows;
+                None recomputes every athlete-week
+
+        Returns:
+            Counts of athletes, upserted and deleted rows and z-score weeks
+        """
+        if touched is not None and touched.empty:
+            return {'athletes': 0, 'upserted': 0, 'deleted': 0, 'weeks': 0}
+
+        athlete_ids = None
+        touched_by_athlete = {}
+        if touched is not None:
+            touched_dates = pd.to_datetime(touched['data']).values.astype('datetime64[D]')
+            for atleta_id, positions in touched.groupby('atleta_id').indices.items():
+                touched_by_athlete[int(atleta_id)] = touched_dates[positions]
+            athlete_ids = sorted(touched_by_athlete)
+
+        sessions = self._load_sessions(athlete_ids)
+        session_dates = pd.to_datetime(sessions['data']).values.astype('datetime64[D]')
+        session_loads = sessions['carga_total'].to_numpy(dtype=np.float64)
+
+        rows = []
+        computed = set()
+        for atleta_id, positions in sessions.groupby('atleta_id', sort=False).indices.items():
+            rows.extend(athlete_weekly_metrics(
+                atleta_id, session_dates[positions], session_loads[positions],
+                touched_by_athlete.get(int(atleta_id)) if touched is not None else None
+            ))
+            computed.update((int(atleta_id), w) for w in
+                            np.unique(week_start(session_dates[positions])).tolist())
+
+        # Athlete-weeks that no longer have sessions
+        if touched is None:
+            candidates = {(r['atleta_id'], r['semana_inicio']) for r in
+                          self.db.query_to_dict("SELECT atleta_id, semana_inicio FROM metricas_carga")}
+        else:
+            candidates = {(atleta_id, w) for atleta_id, dates in touched_by_athlete.items()
+                          for w in np.unique(week_start(dates)).tolist()}
+        stale = sorted(candidates - computed)
+
+        upserted = self.db.execute_values_query(UPSERT_QUERY, rows, page_size=self.page_size)
+        deleted = self.db.execute_values_query(DELETE_QUERY, stale, template="(%s, %s::date)",
+                                               page_size=self.page_size) if stale else 0
+
+        weeks = sorted({row[1] for row in rows} | {w for _, w in stale})
+        if weeks:
+            self.db.execute_query(Z_SCORE_QUERY, (weeks,))
+
+        stats = {'athletes': len(set(sessions['atleta_id'])), 'upserted': upserted,
+                 'deleted': deleted, 'weeks': len(weeks)}
+        logger.info(f"📈 Load metrics: {stats['upserted']} athlete-weeks upserted, "
+                    f"{stats['deleted']} deleted, z-scores for {stats['weeks']} weeks")
+        return stats
+
+    def rebuild(self) -> Dict:
+        """Recompute every athlete-week (upsert; no table-wide DELETE)"""
+        return self.update(None)
+
+
+def refresh_load_metrics(db, touched: pd.DataFrame) -> Dict:
+    """Update metricas_carga for changed PSE rows; a failure does not fail the request"""
+    dashboard_cache.invalidate()
+    try:
+        return LoadMetricsEngine(db).update(touched)
+    except Exception as e:
+        logger.warning(f"⚠️ Load metrics update failed: {e}")
+        return {"error": str(e)}
@@ -4,7 +4,9 @@ Classe para gerir conexões com a base de dados da tese
 """
 
 import os
-from typing import Optional, List, Dict, Any
+import threading
+import uuid
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor, execute_values
@@ -21,6 +23,36 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Pool thread-safe que espera por uma conexão livre
+
+    ThreadedConnectionPool lança PoolError quando as maxconn conexões estão
+    em uso; aqui getconn espera até timeout segundos (pedidos concorrentes
+    das threads do servidor partilham o mesmo pool).
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, timeout: float = 30.0, **kwargs):
+        self._livres = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._livres.acquire(timeout=self.timeout):
+            raise pool.PoolError(f"Nenhuma conexão livre após {self.timeout}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._livres.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._livres.release()
+
+
 class DatabaseConnection:
     """
     Classe para gerir conexões com PostgreSQL + TimescaleDB
@@ -29,6 +61,9 @@ class DatabaseConnection:
         db = DatabaseConnection()
         df = db.query_to_dataframe("SELECT * FROM atletas")
         db.close()
+    
+    Servidor (pool partilhado por todos os pedidos durante a vida da app):
+        db = DatabaseConnection(minconn=2, maxconn=20, partilhado=True)
     """
     
     def __init__(self, 
@@ -36,7 +71,10 @@ class DatabaseConnection:
                  port: Optional[int] = None,
                  database: Optional[str] = None,
                  user: Optional[str] = None,
-                 password: Optional[str] = None):
+                 password: Optional[str] = None,
+                 minconn: int = 1,
+                 maxconn: int = 10,
+                 partilhado: bool = False):
         """
         Inicializar conexão com a base de dados
         
@@ -46,6 +84,10 @@ class DatabaseConnection:
             database: Nome da base de dados (default: futebol_tese)
             user: Username (default: postgres)
             password: Password (default: variável ambiente DB_PASSWORD)
+            minconn: Conexões abertas no arranque
+            maxconn: Máximo de conexões do pool
+            partilhado: Pool thread-safe que espera por conexões livres
+                        (para uma instância usada por várias threads)
         """
         # Carregar variáveis de ambiente
         try:
@@ -61,10 +103,11 @@ class DatabaseConnection:
         self.password = password or os.getenv('DB_PASSWORD', '')
         
         # Connection pool (para melhor performance)
+        classe_pool = BlockingConnectionPool if partilhado else psycopg2.pool.SimpleConnectionPool
         try:
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
+            self.connection_pool = classe_pool(
+                minconn=minconn,
+                maxconn=maxconn,
                 host=self.host,
                 port=self.port,
                 database=self.database,
@@ -183,7 +226,105 @@ class DatabaseConnection:
             raise
         finally:
             self.return_connection(conn)
-    
+
+    def execute_values_query(self, query: str, values: List[tuple],
+                             template: Optional[str] = None,
+                             page_size: int = 1000,
+                             pre_statements: Optional[List[Tuple[str, Optional[tuple]]]] = None) -> int:
+        """
+        Executar INSERT multi-linha (execute_values) numa única transação
+
+        Args:
+            query: SQL query com um único placeholder VALUES %s
+            values: Lista de tuplos (uma linha cada)
+            template: Template de linha para execute_values (opcional)
+            page_size: Número de linhas por statement
+            pre_statements: (query, params) executadas antes na mesma
+                            transação, ex. DELETE das linhas a substituir
+
+        Returns:
+            Número de linhas afetadas (exclui conflitos ignorados)
+        """
+        if not values and not pre_statements:
+            return 0
+
+        conn = self.get_connection()
+        try:
+            affected = 0
+            with conn.cursor() as cursor:
+                for statement, params in pre_statements or []:
+                    cursor.execute(statement, params)
+                for start in range(0, len(values), page_size):
+                    execute_values(cursor, query, values[start:start + page_size],
+                                   template=template, page_size=page_size)
+                    affected += max(cursor.rowcount, 0)
+            conn.commit()
+            logger.info(f"✅ {affected}/{len(values)} linhas escritas: {query.strip()[:60]}...")
+            return affected
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Erro no insert em lote: {e}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def execute_returning(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """
+        Executar query de escrita com RETURNING e confirmar a transação
+
+        Args:
+            query: SQL query (INSERT/UPDATE/DELETE ... RETURNING)
+            params: Parâmetros da query (opcional)
+
+        Returns:
+            Lista de dicionários com as linhas devolvidas
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                results = cursor.fetchall()
+            conn.commit()
+            return [dict(row) for row in results]
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Erro ao executar query: {e}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def stream_query(self, query: str, params: Optional[tuple] = None,
+                     itersize: int = 5000) -> Iterator[tuple]:
+        """
+        Executar query SELECT com cursor do lado do servidor (named cursor)
+        e devolver as linhas (tuplos) à medida que são lidas
+
+        Apenas itersize linhas ficam em memória de cada vez. A conexão só
+        volta ao pool quando o gerador é esgotado ou fechado.
+
+        Args:
+            query: SQL query SELECT
+            params: Parâmetros da query (opcional)
+            itersize: Linhas pedidas ao servidor por ida
+
+        Yields:
+            Tuplos com as colunas de cada linha
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+                for row in cursor:
+                    yield row
+        except Exception as e:
+            logger.error(f"❌ Erro na query (stream): {e}")
+            raise
+        finally:
+            # Cursores com nome vivem numa transação; terminá-la antes de devolver
+            conn.rollback()
+            self.return_connection(conn)
+
     def verificar_timescaledb(self) -> bool:
         """
         Verificar se TimescaleDB está ativo
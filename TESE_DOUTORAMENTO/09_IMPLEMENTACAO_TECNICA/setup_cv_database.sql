@@ -38,7 +38,9 @@ CREATE TABLE IF NOT EXISTS video_detections (
     bbox_y2 FLOAT NOT NULL,
     center_x FLOAT NOT NULL,
     center_y FLOAT NOT NULL,
-    area FLOAT NOT NULL
+    area FLOAT NOT NULL,
+    track_id INTEGER, -- MultiObjectTracker id (NULL for untracked analyses)
+    predicted BOOLEAN NOT NULL DEFAULT FALSE -- box propagated by the tracker, not detected
 );
 
 -- Create indexes for efficient querying
@@ -46,6 +48,7 @@ CREATE INDEX IF NOT EXISTS idx_detections_analysis_id ON video_detections(analys
 CREATE INDEX IF NOT EXISTS idx_detections_frame ON video_detections(frame_number);
 CREATE INDEX IF NOT EXISTS idx_detections_class ON video_detections(object_class);
 CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON video_detections(timestamp_seconds);
+CREATE INDEX IF NOT EXISTS idx_video_detections_analysis_frame ON video_detections(analysis_id, frame_number);
 
 -- Table to store calculated metrics from video analysis
 CREATE TABLE IF NOT EXISTS video_metrics (
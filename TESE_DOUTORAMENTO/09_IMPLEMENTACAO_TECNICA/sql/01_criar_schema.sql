@@ -15,6 +15,7 @@ EXCEPTION WHEN others THEN
     NULL;
 END $$;
 CREATE EXTENSION IF NOT EXISTS btree_gist;          -- Índices avançados
+CREATE EXTENSION IF NOT EXISTS pg_trgm;             -- Similaridade de nomes (ingestão)
 
 -- ============================================================================
 -- TABELA: ATLETAS (Relacional)
@@ -49,6 +50,20 @@ CREATE INDEX idx_atletas_ativo ON atletas(ativo);
 COMMENT ON TABLE atletas IS 'Informação base dos atletas';
 COMMENT ON COLUMN atletas.posicao IS 'GR=Guarda-Redes, DC=Defesa Central, DL=Defesa Lateral, MC=Médio Centro, EX=Extremo, AV=Avançado';
 
+-- ============================================================================
+-- TABELA: ALIASES DE ATLETAS (Relacional)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS atletas_aliases (
+    alias VARCHAR(200) PRIMARY KEY,  -- nome em minúsculas tal como aparece nos CSV
+    atleta_id INTEGER NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    origem VARCHAR(50) DEFAULT 'fuzzy',  -- 'fuzzy', 'manual'
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_atletas_aliases_atleta ON atletas_aliases(atleta_id);
+
+COMMENT ON TABLE atletas_aliases IS 'Nomes alternativos aprendidos na ingestão (ex: "J. Silva" -> atleta)';
+
 -- ============================================================================
 -- TABELA: SESSOES (Relacional)
 -- ============================================================================
@@ -343,6 +358,37 @@ CREATE INDEX idx_alertas_nao_resolvidos ON alertas(atleta_id) WHERE resolvido =
 
 COMMENT ON TABLE alertas IS 'Alertas gerados pelo sistema (ML e regras)';
 
+-- ============================================================================
+-- TABELA: PREGAME_FEATURES (Feature store do preditor pré-jogo)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS pregame_features (
+    atleta_id INTEGER NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    sessao_id INTEGER NOT NULL REFERENCES sessoes(id) ON DELETE CASCADE,
+    data TIMESTAMP NOT NULL,
+    
+    -- Linha do TargetBuilder e features pré-jogo (JSON preserva a ordem das colunas)
+    target_row JSON NOT NULL,
+    features JSON NOT NULL,
+    
+    -- MAX(created_at) dos dados de origem usados no cálculo
+    input_watermark TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    
+    PRIMARY KEY (atleta_id, sessao_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pregame_features_atleta_data ON pregame_features(atleta_id, data);
+
+CREATE TABLE IF NOT EXISTS pregame_feature_builds (
+    id SERIAL PRIMARY KEY,
+    input_watermark TIMESTAMP NOT NULL,
+    modo VARCHAR(20) NOT NULL,  -- 'full', 'incremental'
+    n_jogos INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE pregame_features IS 'Targets e features pré-jogo por (atleta, jogo), recalculados incrementalmente';
+
 -- ============================================================================
 -- TRIGGERS PARA UPDATED_AT
 -- ============================================================================
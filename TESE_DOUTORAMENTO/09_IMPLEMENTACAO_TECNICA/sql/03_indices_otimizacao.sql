@@ -25,6 +25,9 @@ CREATE INDEX IF NOT EXISTS idx_dados_gps_sessao_time ON dados_gps(sessao_id, tim
 -- Cobrir consultas que agregam por atleta e sessão dentro de janelas
 CREATE INDEX IF NOT EXISTS idx_dados_gps_atleta_sessao_time ON dados_gps(atleta_id, sessao_id, time DESC);
 
+-- Watermark do feature store pré-jogo (MAX(created_at) / created_at > x)
+CREATE INDEX IF NOT EXISTS idx_dados_gps_created_at ON dados_gps(created_at DESC);
+
 -- ============================================================================
 -- 2. DADOS PSE (hypertable)
 -- Padrões de consulta típicos:
@@ -35,6 +38,7 @@ CREATE INDEX IF NOT EXISTS idx_dados_pse_time ON dados_pse(time DESC);
 CREATE INDEX IF NOT EXISTS idx_dados_pse_atleta ON dados_pse(atleta_id);
 CREATE INDEX IF NOT EXISTS idx_dados_pse_atleta_time ON dados_pse(atleta_id, time DESC);
 CREATE INDEX IF NOT EXISTS idx_dados_pse_sessao_time ON dados_pse(sessao_id, time DESC);
+CREATE INDEX IF NOT EXISTS idx_dados_pse_created_at ON dados_pse(created_at DESC);
 
 -- ============================================================================
 -- 3. CONTEXTO COMPETITIVO (hypertable)
@@ -63,7 +67,14 @@ CREATE INDEX IF NOT EXISTS idx_alertas_metricas_gin ON alertas USING GIN (metric
 CREATE INDEX IF NOT EXISTS idx_alertas_contexto_gin ON alertas USING GIN (contexto);
 
 -- ============================================================================
--- 5. Manutenção / estatísticas
+-- 5. ATLETAS (relacional)
+-- Fallback de similaridade por nome na ingestão de CSV
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_atletas_nome_trgm ON atletas USING GIN (LOWER(nome_completo) gin_trgm_ops);
+
+-- ============================================================================
+-- 6. Manutenção / estatísticas
 -- ============================================================================
 
 ANALYZE atletas;
@@ -126,6 +126,78 @@ WITH NO DATA;
 CREATE INDEX IF NOT EXISTS idx_ca_contexto_sessao_minuto
 ON ca_contexto_sessao_minuto (sessao_id, minuto_ts DESC);
 
+-- ============================================================================
+-- 5) PSE - Carga semanal por atleta (semanas segunda-domingo, como metricas_carga)
+-- time_bucket de 7 dias tem origem 2000-01-03 (segunda-feira)
+-- ============================================================================
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS ca_pse_semanal_atleta
+WITH (timescaledb.continuous, timescaledb.materialized_only = false)
+AS
+SELECT
+    time_bucket(INTERVAL '7 days', time) AS semana,
+    atleta_id,
+    COUNT(*) AS n_registos,
+    SUM(CASE WHEN carga_total > 0 THEN 1 ELSE 0 END) AS n_treinos,
+
+    SUM(COALESCE(carga_total, 0)) AS carga_total_sum,
+    SUM(carga_total * carga_total) AS carga_total_sq_sum,
+    MAX(carga_total) AS carga_total_max,
+    AVG(pse) AS pse_avg,
+    SUM(COALESCE(duracao_min, 0)) AS duracao_min_sum,
+
+    AVG(qualidade_sono) AS qualidade_sono_avg,
+    AVG(fadiga) AS fadiga_avg,
+    AVG(dor_muscular) AS dor_muscular_avg,
+    AVG(humor) AS humor_avg,
+    AVG(stress) AS stress_avg,
+    AVG(tqr) AS tqr_avg
+FROM dados_pse
+GROUP BY 1, 2
+WITH NO DATA;
+
+CREATE INDEX IF NOT EXISTS idx_ca_pse_semanal_atleta_semana_atleta
+ON ca_pse_semanal_atleta (semana DESC, atleta_id);
+
+-- Agregação em tempo real nas agregações diárias lidas pelo backend: dados
+-- ainda não materializados (upload recente) são lidos da hypertable só para
+-- o intervalo em falta
+DO $$
+BEGIN
+    ALTER MATERIALIZED VIEW ca_gps_diario_atleta SET (timescaledb.materialized_only = false);
+    ALTER MATERIALIZED VIEW ca_pse_diario_atleta SET (timescaledb.materialized_only = false);
+EXCEPTION WHEN others THEN
+    NULL;
+END $$;
+
+-- ============================================================================
+-- 6) PSE - Carga rolante 7/28 dias por atleta (sobre ca_pse_diario_atleta)
+-- Window functions não são permitidas em continuous aggregates: a view lê os
+-- agregados diários (1 linha por atleta e dia) em vez de dados_pse
+-- ============================================================================
+
+CREATE OR REPLACE VIEW vw_carga_rolante_atleta AS
+SELECT
+    dia,
+    atleta_id,
+    n_sessoes,
+    carga_total_sum AS carga_dia,
+    SUM(carga_total_sum) OVER w7 AS carga_7d,
+    SUM(carga_total_sum) OVER w28 AS carga_28d,
+    SUM(n_sessoes) OVER w7 AS sessoes_7d,
+    -- ACWR = carga 7d / média semanal dos 28d (como calcular_acwr)
+    CASE WHEN SUM(carga_total_sum) OVER w28 > 0
+         THEN SUM(carga_total_sum) OVER w7 / (SUM(carga_total_sum) OVER w28 / 4.0)
+    END AS acwr
+FROM ca_pse_diario_atleta
+WINDOW w7 AS (PARTITION BY atleta_id ORDER BY dia
+              RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW),
+       w28 AS (PARTITION BY atleta_id ORDER BY dia
+               RANGE BETWEEN INTERVAL '27 days' PRECEDING AND CURRENT ROW);
+
+COMMENT ON VIEW vw_carga_rolante_atleta IS 
+'Carga PSE rolante 7d/28d e ACWR por atleta e dia com treino (lê ca_pse_diario_atleta)';
+
 -- ============================================================================
 -- Policies de refresh (idempotente)
 -- Nota: se a versão do TimescaleDB não suportar estas funções, comenta este bloco.
@@ -167,6 +239,18 @@ EXCEPTION WHEN others THEN
     NULL;
 END $$;
 
+DO $$
+BEGIN
+    PERFORM add_continuous_aggregate_policy(
+        'ca_pse_semanal_atleta',
+        start_offset => INTERVAL '180 days',
+        end_offset   => INTERVAL '1 hour',
+        schedule_interval => INTERVAL '1 hour'
+    );
+EXCEPTION WHEN others THEN
+    NULL;
+END $$;
+
 DO $$
 BEGIN
     PERFORM add_continuous_aggregate_policy(
@@ -181,6 +265,8 @@ END $$;
 
 -- Inicializar materialização (opcional)
 -- CALL refresh_continuous_aggregate('ca_gps_diario_atleta', NULL, NULL);
+-- CALL refresh_continuous_aggregate('ca_pse_diario_atleta', NULL, NULL);
+-- CALL refresh_continuous_aggregate('ca_pse_semanal_atleta', NULL, NULL);
 
 \echo '✅ Continuous aggregates criadas com sucesso!'
 \echo '📌 Próximo passo: Executar 05_funcoes_auxiliares.sql'
@@ -272,7 +272,110 @@ END;
 $$ LANGUAGE plpgsql STABLE;
 
 -- ============================================================================
--- FUNÇÃO 9: Identificar Atletas em Risco
+-- FUNÇÃO 9: Métricas de Carga de Todos os Atletas (set-based)
+-- ============================================================================
+-- Equivalente às funções escalares acima (carga_acumulada_n_dias,
+-- calcular_acwr, media_movel_player_load, num_sessoes_n_dias,
+-- calcular_monotonia, calcular_strain) para todos os atletas ativos e
+-- várias datas de referência, numa só leitura de dados_gps:
+-- - cada data de referência entra como linha sem player_load no fluxo de
+--   registos do atleta
+-- - as janelas RANGE '7 days'/'28 days' PRECEDING dão, em cada linha, os
+--   mesmos intervalos que "time BETWEEN referência - N dias AND referência"
+-- - as funções escalares fazem 1 a 4 leituras da hypertable por atleta e por
+--   métrica (calcular_acwr soma duas vezes, calcular_strain recalcula a carga)
+-- COUNT(DISTINCT sessao_id) não existe como função de janela: as sessões
+-- na janela são as iniciadas até à referência menos as que terminaram há
+-- mais de 7 dias (evento no último registo + 7 dias).
+-- O mínimo de 3 registos de media_7d conta as linhas reais de dados_gps
+-- (registo_gps), também as sem player_load, como o COUNT(*) de
+-- media_movel_player_load.
+CREATE OR REPLACE FUNCTION metricas_carga_periodo(
+    p_data_inicio TIMESTAMP,
+    p_data_fim TIMESTAMP DEFAULT NULL,
+    p_passo INTERVAL DEFAULT INTERVAL '1 day'
+)
+RETURNS TABLE(
+    atleta_id INTEGER,
+    data_referencia TIMESTAMP,
+    carga_7d FLOAT,
+    carga_28d FLOAT,
+    acwr FLOAT,
+    media_7d FLOAT,
+    sessoes_7d INTEGER,
+    monotonia_7d FLOAT,
+    strain_7d FLOAT
+) AS $$
+    WITH referencias AS (
+        SELECT a.id AS atleta_id, r.time
+        FROM atletas a
+        CROSS JOIN generate_series(p_data_inicio, COALESCE(p_data_fim, p_data_inicio), p_passo) AS r(time)
+        WHERE a.ativo = TRUE
+    ),
+    gps AS (
+        SELECT g.atleta_id, g.sessao_id, g.time, g.player_load,
+               ROW_NUMBER() OVER (PARTITION BY g.atleta_id, g.sessao_id ORDER BY g.time) AS ordem,
+               ROW_NUMBER() OVER (PARTITION BY g.atleta_id, g.sessao_id ORDER BY g.time DESC) AS ordem_inversa
+        FROM dados_gps g
+        JOIN atletas a ON a.id = g.atleta_id AND a.ativo = TRUE
+        WHERE g.time BETWEEN p_data_inicio - INTERVAL '28 days'
+                         AND COALESCE(p_data_fim, p_data_inicio)
+    ),
+    registos AS (
+        SELECT atleta_id, time, player_load,
+               1 AS registo_gps,
+               CASE WHEN sessao_id IS NOT NULL AND ordem = 1 THEN 1 END AS inicio_sessao,
+               NULL::INTEGER AS sessao_expirada,
+               FALSE AS referencia
+        FROM gps
+        UNION ALL
+        SELECT atleta_id, time + INTERVAL '7 days', NULL, NULL, NULL, 1, FALSE
+        FROM gps
+        WHERE sessao_id IS NOT NULL AND ordem_inversa = 1
+        UNION ALL
+        SELECT atleta_id, time, NULL, NULL, NULL, NULL, TRUE
+        FROM referencias
+    ),
+    janelas AS (
+        SELECT atleta_id, time, referencia,
+               COALESCE(SUM(player_load) OVER w7, 0) AS carga_7d,
+               COALESCE(SUM(player_load) OVER w28, 0) AS carga_28d,
+               AVG(player_load) OVER w7 AS media_7d,
+               COUNT(registo_gps) OVER w7 AS registos_7d,
+               STDDEV_SAMP(player_load) OVER w7 AS desvio_7d,
+               COUNT(inicio_sessao) OVER ate_referencia - COUNT(sessao_expirada) OVER antes_referencia AS sessoes_7d
+        FROM registos
+        WINDOW w7 AS (PARTITION BY atleta_id ORDER BY time
+                      RANGE BETWEEN INTERVAL '7 days' PRECEDING AND CURRENT ROW),
+               w28 AS (PARTITION BY atleta_id ORDER BY time
+                       RANGE BETWEEN INTERVAL '28 days' PRECEDING AND CURRENT ROW),
+               ate_referencia AS (PARTITION BY atleta_id ORDER BY time
+                                  RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW),
+               antes_referencia AS (PARTITION BY atleta_id ORDER BY time
+                                    RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW EXCLUDE GROUP)
+    )
+    SELECT
+        j.atleta_id,
+        j.time,
+        j.carga_7d,
+        j.carga_28d,
+        CASE WHEN j.carga_28d > 0 THEN j.carga_7d / (j.carga_28d / 4.0) END,
+        CASE WHEN j.registos_7d >= 3 THEN j.media_7d END,
+        j.sessoes_7d::INTEGER,
+        CASE WHEN j.desvio_7d > 0 THEN j.media_7d / j.desvio_7d END,
+        CASE WHEN j.desvio_7d > 0 THEN j.carga_7d * j.media_7d / j.desvio_7d END
+    FROM janelas j
+    WHERE j.referencia;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION metricas_carga_periodo IS 
+'Carga 7d/28d, ACWR, média, sessões, monotonia e strain de todos os atletas ativos por data de referência (uma leitura de dados_gps)';
+
+-- Exemplo de uso (ACWR diário de todos os atletas no último mês):
+-- SELECT * FROM metricas_carga_periodo(NOW()::TIMESTAMP - INTERVAL '30 days', NOW()::TIMESTAMP);
+
+-- ============================================================================
+-- FUNÇÃO 10: Identificar Atletas em Risco
 -- ============================================================================
 CREATE OR REPLACE FUNCTION atletas_em_risco(
     p_data_referencia TIMESTAMP DEFAULT NOW(),
@@ -293,14 +396,14 @@ BEGIN
         a.id,
         a.nome_completo,
         a.posicao,
-        calcular_acwr(a.id, p_data_referencia) AS acwr_value,
-        classificar_acwr(calcular_acwr(a.id, p_data_referencia)),
-        carga_acumulada_n_dias(a.id, p_data_referencia, 7),
-        num_sessoes_n_dias(a.id, p_data_referencia, 7)
-    FROM atletas a
-    WHERE a.ativo = TRUE
-      AND calcular_acwr(a.id, p_data_referencia) > p_threshold_acwr
-    ORDER BY calcular_acwr(a.id, p_data_referencia) DESC;
+        m.acwr,
+        classificar_acwr(m.acwr),
+        m.carga_7d,
+        m.sessoes_7d
+    FROM metricas_carga_periodo(p_data_referencia) m
+    JOIN atletas a ON a.id = m.atleta_id
+    WHERE m.acwr > p_threshold_acwr
+    ORDER BY m.acwr DESC;
 END;
 $$ LANGUAGE plpgsql STABLE;
 
@@ -311,7 +414,7 @@ COMMENT ON FUNCTION atletas_em_risco IS
 -- SELECT * FROM atletas_em_risco(NOW(), 1.5);
 
 -- ============================================================================
--- FUNÇÃO 10: Calcular Z-Score por Posição
+-- FUNÇÃO 11: Calcular Z-Score por Posição
 -- ============================================================================
 CREATE OR REPLACE FUNCTION calcular_zscore_posicao(
     p_atleta_id INTEGER,
@@ -356,20 +459,22 @@ COMMENT ON FUNCTION calcular_zscore_posicao IS
 -- ============================================================================
 -- VIEW: Dashboard Principal
 -- ============================================================================
+-- Uma leitura de dados_gps para todos os atletas (metricas_carga_periodo)
+-- em vez de 5 funções escalares por atleta
 CREATE OR REPLACE VIEW dashboard_principal AS
 SELECT 
     a.id AS atleta_id,
     a.nome_completo,
     a.posicao,
-    calcular_acwr(a.id, NOW()) AS acwr_atual,
-    classificar_acwr(calcular_acwr(a.id, NOW())) AS status_acwr,
-    carga_acumulada_n_dias(a.id, NOW(), 7) AS carga_7d,
-    media_movel_player_load(a.id, NOW(), 7) AS media_7d,
-    num_sessoes_n_dias(a.id, NOW(), 7) AS sessoes_7d,
-    calcular_monotonia(a.id, NOW(), 7) AS monotonia_7d
-FROM atletas a
-WHERE a.ativo = TRUE
-ORDER BY calcular_acwr(a.id, NOW()) DESC NULLS LAST;
+    m.acwr AS acwr_atual,
+    classificar_acwr(m.acwr) AS status_acwr,
+    m.carga_7d,
+    m.media_7d,
+    m.sessoes_7d,
+    m.monotonia_7d
+FROM metricas_carga_periodo(NOW()::TIMESTAMP) m
+JOIN atletas a ON a.id = m.atleta_id
+ORDER BY m.acwr DESC NULLS LAST;
 
 COMMENT ON VIEW dashboard_principal IS 
 'View para dashboard com métricas principais de todos os atletas ativos';
@@ -391,6 +496,7 @@ COMMENT ON VIEW dashboard_principal IS
 \echo '  - calcular_monotonia(atleta_id, data, n_dias)'
 \echo '  - calcular_strain(atleta_id, data, n_dias)'
 \echo '  - resumo_atleta(atleta_id, data)'
+\echo '  - metricas_carga_periodo(data_inicio, data_fim, passo)'
 \echo '  - atletas_em_risco(data, threshold)'
 \echo '  - calcular_zscore_posicao(atleta_id, metrica, valor, periodo)'
 \echo ''
@@ -399,5 +505,6 @@ COMMENT ON VIEW dashboard_principal IS
 \echo ''
 \echo '💡 Exemplo de uso:'
 \echo '   SELECT * FROM resumo_atleta(1, NOW());'
+\echo '   SELECT * FROM metricas_carga_periodo(NOW()::TIMESTAMP - INTERVAL ''7 days'', NOW()::TIMESTAMP);'
 \echo '   SELECT * FROM atletas_em_risco();'
 \echo '   SELECT * FROM dashboard_principal;'
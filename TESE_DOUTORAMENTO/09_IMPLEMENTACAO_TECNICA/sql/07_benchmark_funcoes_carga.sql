@@ -0,0 +1,119 @@
+-- ============================================================================
+-- SCRIPT 7: BENCHMARK FUNÇÕES DE CARGA (escalares vs set-based)
+-- Descrição: Compara as funções escalares por atleta (script 5) com
+--            metricas_carga_periodo: resultados iguais e EXPLAIN ANALYZE
+-- Uso: psql -d <base_de_dados> -f sql/07_benchmark_funcoes_carga.sql
+--      (opcional: -v dias=90 para o período do benchmark diário)
+-- ============================================================================
+
+\echo '⏱️  Benchmark funções de carga: escalares vs set-based...'
+
+\if :{?dias}
+\else
+    \set dias 28
+\endif
+
+-- Referência fixa para todas as consultas (NOW() muda entre statements)
+SELECT NOW()::TIMESTAMP AS ref,
+       NOW()::TIMESTAMP - (:dias || ' days')::INTERVAL AS inicio
+\gset
+
+-- ============================================================================
+-- 1) VERIFICAÇÃO: mesmos valores para todos os atletas ativos
+-- ============================================================================
+\echo ''
+\echo '🔍 1) Diferenças entre versões (esperado: 0 linhas em ambas)'
+
+WITH escalar AS (
+    SELECT a.id AS atleta_id, r.time AS data_referencia,
+           carga_acumulada_n_dias(a.id, r.time, 7) AS carga_7d,
+           calcular_acwr(a.id, r.time) AS acwr,
+           media_movel_player_load(a.id, r.time, 7) AS media_7d,
+           num_sessoes_n_dias(a.id, r.time, 7) AS sessoes_7d,
+           calcular_monotonia(a.id, r.time, 7) AS monotonia_7d,
+           calcular_strain(a.id, r.time, 7) AS strain_7d
+    FROM atletas a
+    CROSS JOIN generate_series(:'inicio'::TIMESTAMP, :'ref'::TIMESTAMP, INTERVAL '1 day') AS r(time)
+    WHERE a.ativo = TRUE
+)
+SELECT 'diario' AS teste, COALESCE(e.atleta_id, m.atleta_id) AS atleta_id,
+       COALESCE(e.data_referencia, m.data_referencia) AS data_referencia
+FROM escalar e
+FULL JOIN metricas_carga_periodo(:'inicio'::TIMESTAMP, :'ref'::TIMESTAMP) m
+       ON m.atleta_id = e.atleta_id AND m.data_referencia = e.data_referencia
+WHERE e.atleta_id IS NULL OR m.atleta_id IS NULL
+   OR ABS(e.carga_7d - m.carga_7d) > 1e-6
+   OR (e.acwr IS NULL) <> (m.acwr IS NULL) OR ABS(e.acwr - m.acwr) > 1e-6
+   OR (e.media_7d IS NULL) <> (m.media_7d IS NULL) OR ABS(e.media_7d - m.media_7d) > 1e-6
+   OR e.sessoes_7d <> m.sessoes_7d
+   OR (e.monotonia_7d IS NULL) <> (m.monotonia_7d IS NULL) OR ABS(e.monotonia_7d - m.monotonia_7d) > 1e-6
+   OR (e.strain_7d IS NULL) <> (m.strain_7d IS NULL) OR ABS(e.strain_7d - m.strain_7d) > 1e-6;
+
+SELECT 'atletas_em_risco' AS teste, e.atleta_id
+FROM (
+    SELECT a.id AS atleta_id, calcular_acwr(a.id, :'ref'::TIMESTAMP) AS acwr
+    FROM atletas a
+    WHERE a.ativo = TRUE AND calcular_acwr(a.id, :'ref'::TIMESTAMP) > 1.5
+) e
+FULL JOIN atletas_em_risco(:'ref'::TIMESTAMP, 1.5) r ON r.atleta_id = e.atleta_id
+WHERE e.atleta_id IS NULL OR r.atleta_id IS NULL;
+
+-- ============================================================================
+-- 2) DASHBOARD: uma data de referência, todos os atletas
+-- ============================================================================
+\echo ''
+\echo '📊 2a) Dashboard com funções escalares (5 funções por atleta)'
+
+EXPLAIN (ANALYZE, BUFFERS, SUMMARY)
+SELECT
+    a.id AS atleta_id,
+    a.nome_completo,
+    a.posicao,
+    calcular_acwr(a.id, :'ref'::TIMESTAMP) AS acwr_atual,
+    classificar_acwr(calcular_acwr(a.id, :'ref'::TIMESTAMP)) AS status_acwr,
+    carga_acumulada_n_dias(a.id, :'ref'::TIMESTAMP, 7) AS carga_7d,
+    media_movel_player_load(a.id, :'ref'::TIMESTAMP, 7) AS media_7d,
+    num_sessoes_n_dias(a.id, :'ref'::TIMESTAMP, 7) AS sessoes_7d,
+    calcular_monotonia(a.id, :'ref'::TIMESTAMP, 7) AS monotonia_7d
+FROM atletas a
+WHERE a.ativo = TRUE
+ORDER BY calcular_acwr(a.id, :'ref'::TIMESTAMP) DESC NULLS LAST;
+
+\echo ''
+\echo '📊 2b) Dashboard set-based (view dashboard_principal)'
+
+EXPLAIN (ANALYZE, BUFFERS, SUMMARY)
+SELECT * FROM dashboard_principal;
+
+-- ============================================================================
+-- 3) SÉRIE DIÁRIA: :dias datas de referência, todos os atletas
+-- ============================================================================
+\echo ''
+\echo '📈 3a) Série diária com funções escalares'
+
+EXPLAIN (ANALYZE, BUFFERS, SUMMARY)
+SELECT a.id, r.time,
+       carga_acumulada_n_dias(a.id, r.time, 7),
+       calcular_acwr(a.id, r.time),
+       calcular_monotonia(a.id, r.time, 7),
+       calcular_strain(a.id, r.time, 7)
+FROM atletas a
+CROSS JOIN generate_series(:'inicio'::TIMESTAMP, :'ref'::TIMESTAMP, INTERVAL '1 day') AS r(time)
+WHERE a.ativo = TRUE;
+
+\echo ''
+\echo '📈 3b) Série diária set-based (metricas_carga_periodo)'
+
+EXPLAIN (ANALYZE, BUFFERS, SUMMARY)
+SELECT atleta_id, data_referencia, carga_7d, acwr, monotonia_7d, strain_7d
+FROM metricas_carga_periodo(:'inicio'::TIMESTAMP, :'ref'::TIMESTAMP);
+
+-- ============================================================================
+-- FIM DO SCRIPT 7
+-- ============================================================================
+
+\echo ''
+\echo '✅ Benchmark concluído'
+\echo '💡 Os planos das funções escalares escondem as leituras internas;'
+\echo '   comparar "Execution Time" e "Buffers" (ou ativar auto_explain com'
+\echo '   auto_explain.log_nested_statements = on para ver cada leitura).'